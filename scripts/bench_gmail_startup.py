@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure Gmail client first-call latency, cold vs warmed up.
+
+Cold: a fresh GmailClient handles its first call directly, paying for
+credentials, service construction and (with --live) the first HTTPS
+connection. Warm: GmailClient.warm_up() runs first, as the bot does in
+on_ready, and only the first call itself is timed.
+
+Usage:
+    python scripts/bench_gmail_startup.py          # offline, fake credentials
+    python scripts/bench_gmail_startup.py --live   # real Gmail (needs token.json)
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.oauth2.credentials import Credentials
+
+from src.config import Config, load_gmail_config
+from src.gmail_client import GmailClient
+
+
+def make_client(live: bool) -> GmailClient:
+    """Create a GmailClient, with fake credentials when offline."""
+    gmail_config = load_gmail_config()
+    config = Config(
+        discord_bot_token="unused",
+        discord_allowlisted_user_id=0,
+        gmail_credentials_path=gmail_config.gmail_credentials_path,
+        gmail_token_path=gmail_config.gmail_token_path,
+    )
+    client = GmailClient(config)
+    if not live:
+        offline_creds = Credentials(token="offline")
+        client.token_manager.get_credentials = lambda scopes=None: offline_creds  # type: ignore[method-assign]
+    return client
+
+
+def first_call(client: GmailClient, live: bool) -> float:
+    """Time the first list_messages-equivalent call on a client."""
+    start = time.perf_counter()
+    if live:
+        client.list_messages(max_results=1)
+    else:
+        client._ensure_connected()
+        client._service.users().messages().list(userId='me', maxResults=1)
+    return time.perf_counter() - start
+
+
+def import_cost() -> float:
+    """Time importing googleapiclient.discovery in a fresh interpreter."""
+    def run(code: str) -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        return time.perf_counter() - start
+
+    baseline = min(run("pass") for _ in range(3))
+    with_import = min(run("import googleapiclient.discovery") for _ in range(3))
+    return with_import - baseline
+
+
+def main() -> None:
+    """Run the startup benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call real Gmail")
+    parser.add_argument("--runs", type=int, default=5, help="runs per scenario")
+    args = parser.parse_args()
+
+    cold = []
+    warm = []
+    for _ in range(args.runs):
+        cold.append(first_call(make_client(args.live), args.live))
+
+        client = make_client(args.live)
+        client.warm_up(probe=args.live)
+        warm.append(first_call(client, args.live))
+
+    mode = "live" if args.live else "offline"
+    print(f"=== Gmail first-call latency ({mode}, {args.runs} runs) ===")
+    print(f"  import googleapiclient (new process): {import_cost() * 1000:8.1f} ms")
+    print(f"  cold first call (median):             {statistics.median(cold) * 1000:8.1f} ms")
+    print(f"  warm first call (median):             {statistics.median(warm) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Measure header triage throughput on synthetic metadata fetches.
+
+Generates header sets shaped like the 'triage' projection (personal mail,
+newsletters, mailing lists, notifications, bounces and flagged spam) and
+times TriageEngine.classify over all of them.
+
+Usage:
+    python scripts/bench_triage.py               # 100k messages
+    python scripts/bench_triage.py --count 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.allowlist import Allowlist
+from src.triage import TriageEngine
+
+
+def make_message(rng: random.Random, index: int) -> dict:
+    """Build one synthetic metadata-format message."""
+    domain = rng.choice(['bank.com', 'example.org', 'shop.example', 'lists.dev', 'mail.co'])
+    # Real mail comes from a limited set of senders
+    sender = rng.randrange(2000)
+    headers = [
+        {'name': 'From', 'value': f'Sender {sender} <user{sender}@{domain}>'},
+        {'name': 'Subject', 'value': f'Message {index}'},
+        {'name': 'Date', 'value': 'Mon, 1 Jan 2024 09:00:00 +0000'},
+        {'name': 'Return-Path', 'value': f'<bounce{index}@{domain}>'},
+    ]
+    kind = rng.random()
+    if kind < 0.25:
+        headers.append({'name': 'List-Unsubscribe', 'value': f'<https://{domain}/unsub/{index}>'})
+        headers.append({'name': 'Precedence', 'value': 'bulk'})
+    elif kind < 0.4:
+        headers.append({'name': 'List-Id', 'value': f'<dev.{domain}>'})
+        headers.append({'name': 'Precedence', 'value': 'list'})
+    elif kind < 0.5:
+        headers.append({'name': 'Auto-Submitted', 'value': 'auto-generated'})
+    elif kind < 0.53:
+        headers[3] = {'name': 'Return-Path', 'value': '<>'}
+    elif kind < 0.56:
+        headers.append({'name': 'X-Spam-Flag', 'value': 'YES'})
+    rng.shuffle(headers)
+    return {'id': f'{index:x}', 'labelIds': ['INBOX'], 'payload': {'headers': headers}}
+
+
+def main() -> None:
+    """Run the triage benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="messages to classify")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [make_message(rng, i) for i in range(args.count)]
+    engine = TriageEngine(allowlist=Allowlist.from_entries(['bank.com']))
+
+    times = []
+    verdicts: Counter[str] = Counter()
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        results = [engine.classify(message) for message in messages]
+        times.append(time.perf_counter() - start)
+    verdicts.update(verdict.name for verdict in results)
+
+    best = min(times)
+    print(f"=== Header triage ({args.count:,} messages, {args.runs} runs) ===")
+    print(f"  best:        {best * 1000:8.1f} ms  ({args.count / best:,.0f} msg/s)")
+    print(f"  median:      {statistics.median(times) * 1000:8.1f} ms")
+    print(f"  per message: {best / args.count * 1e6:8.2f} µs")
+    for name, count in verdicts.most_common():
+        print(f"  {name:<13}{count:>8,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Sender allowlist compiled into Gmail queries and a fast local matcher.
+
+Filtering allowlisted senders client-side means listing every inbox message
+just to drop most of them. Allowlist turns the sender and domain entries into
+Gmail `q` clauses instead, so Gmail only returns matching mail, and keeps a
+precompiled address set and domain index for checking fetched headers.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email.utils import parseaddr
+from typing import Any, Iterable
+
+from src.gmail_client import GmailClient
+
+# Gmail queries travel in the request URL; stay well under practical limits
+MAX_QUERY_LENGTH = 1500
+
+
+@dataclass(frozen=True)
+class Allowlist:
+    """Allowlisted sender addresses and domains.
+
+    Domain entries match the domain itself and any subdomain, so "bank.com"
+    covers both alerts@bank.com and statements@mail.bank.com.
+    """
+
+    addresses: frozenset[str] = frozenset()
+    domains: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[str]) -> Allowlist:
+        """Build an allowlist from entries like "a@x.com", "@bank.com" or "bank.com".
+
+        Args:
+            entries: Sender addresses and domains (case-insensitive)
+
+        Returns:
+            Allowlist with normalized addresses and domains
+        """
+        addresses = set()
+        domains = set()
+        for entry in entries:
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            local, _, domain = entry.rpartition('@')
+            if local:
+                addresses.add(entry)
+            else:
+                domains.add(domain.lstrip('.'))
+        return cls(frozenset(addresses), frozenset(domains))
+
+    def __bool__(self) -> bool:
+        return bool(self.addresses or self.domains)
+
+    def matches(self, from_header: str) -> bool:
+        """Check whether a From header belongs to an allowlisted sender.
+
+        Exact addresses are one set lookup; domains are checked suffix by
+        suffix (mail.bank.com, bank.com, com), so the cost depends on the
+        number of labels in the sender's domain, not the allowlist size.
+
+        Args:
+            from_header: Raw From header, e.g. "Bank <alerts@bank.com>"
+
+        Returns:
+            True if the sender address or one of its parent domains is allowlisted
+        """
+        address = parseaddr(from_header)[1].lower()
+        if address in self.addresses:
+            return True
+
+        domain = address.rpartition('@')[2]
+        while domain:
+            if domain in self.domains:
+                return True
+            domain = domain.partition('.')[2]
+        return False
+
+    def compile_queries(self, base_query: str = '', max_length: int = MAX_QUERY_LENGTH) -> list[str]:
+        """Compile the allowlist into Gmail search queries.
+
+        Terms are packed greedily into `from:(a OR b ...)` clauses; when one
+        query would exceed max_length the rest spill into further queries.
+
+        Args:
+            base_query: Extra query ANDed onto every clause (e.g. "in:inbox")
+            max_length: Maximum length of each query string
+
+        Returns:
+            Queries whose results together cover the whole allowlist (empty
+            list if the allowlist is empty)
+        """
+        terms = sorted(self.addresses) + sorted(self.domains)
+        prefix = f"{base_query} from:(" if base_query else "from:("
+        queries: list[str] = []
+        current: list[str] = []
+        length = len(prefix) + 1
+
+        for term in terms:
+            added = len(term) + (4 if current else 0)  # " OR "
+            if current and length + added > max_length:
+                queries.append(prefix + " OR ".join(current) + ")")
+                current = []
+                length = len(prefix) + 1
+                added = len(term)
+            current.append(term)
+            length += added
+
+        if current:
+            queries.append(prefix + " OR ".join(current) + ")")
+        return queries
+
+
+def list_allowlisted_messages(
+    gmail_client: GmailClient,
+    allowlist: Allowlist,
+    max_results: int = 10,
+    base_query: str = '',
+) -> list[dict[str, Any]]:
+    """List messages from allowlisted senders only.
+
+    Runs each compiled query and merges the results, newest first. A single
+    query keeps Gmail's order; results from several queries are ordered by
+    internalDate, fetched in one minimal batch.
+
+    Args:
+        gmail_client: Client used for Gmail API calls
+        allowlist: Senders to include
+        max_results: Maximum number of messages to return
+        base_query: Extra query ANDed onto every clause (e.g. "in:inbox")
+
+    Returns:
+        De-duplicated message metadata dicts with 'id' and 'threadId'
+
+    Raises:
+        HttpError: If Gmail API call fails
+    """
+    queries = allowlist.compile_queries(base_query)
+    merged: dict[str, dict[str, Any]] = {}
+    for query in queries:
+        for message in gmail_client.list_messages(max_results=max_results, query=query):
+            merged.setdefault(message['id'], message)
+    if len(queries) <= 1:
+        return list(merged.values())[:max_results]
+
+    # Message IDs are not a clock; order by the date Gmail received each one
+    dates = {
+        message['id']: int(message.get('internalDate', 0))
+        for message in gmail_client.get_messages_batch(
+            list(merged), format='minimal', fields='id,internalDate',
+        )
+    }
+    ordered = sorted(merged.values(), key=lambda message: dates.get(message['id'], 0), reverse=True)
+    return ordered[:max_results]
@@ -0,0 +1,183 @@
+"""Async wrapper around GmailClient for use inside the Discord event loop.
+
+googleapiclient calls are blocking. Running them directly in a py-cord command
+handler stalls the gateway heartbeat for the whole HTTP round trip, which can
+get the bot disconnected. AsyncGmailClient runs every call on a small worker
+pool instead, so command handlers can simply await it.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from src.config import Config
+from src.gmail_client import COUNTERS_TTL_SECONDS, LIST_PAGE_LIMIT, GmailClient, InboxCounters
+
+T = TypeVar('T')
+
+
+class AsyncGmailClient:
+    """Awaitable Gmail client with bounded concurrency and per-call timeouts.
+
+    Features:
+    - Same surface as GmailClient, but every method is a coroutine
+    - Blocking I/O runs on a dedicated thread pool, never on the event loop
+    - At most max_concurrency Gmail calls in flight at once
+    - Cancellation and timeouts release the caller immediately
+
+    A call cancelled while waiting for a free slot never reaches Gmail. A call
+    cancelled mid-request frees the awaiting coroutine at once; the worker
+    thread finishes the HTTP request in the background and its result is
+    dropped.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        max_concurrency: int = 4,
+        timeout: float | None = 30.0,
+        client: GmailClient | None = None,
+    ) -> None:
+        """Initialize async Gmail client.
+
+        Args:
+            config: Application configuration with Gmail paths
+            max_concurrency: Maximum Gmail calls running at once; keep it at
+                             or below the client's HTTP pool size (default: 4)
+            timeout: Default per-call timeout in seconds (None = no timeout)
+            client: Existing GmailClient to wrap (default: create one)
+        """
+        self.config = config
+        self.client = client if client is not None else GmailClient(config)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='gmail',
+        )
+
+    async def _run(self, func: Callable[..., T], *args: Any, timeout: float | None = None, **kwargs: Any) -> T:
+        """Run a blocking GmailClient call on the worker pool.
+
+        Args:
+            func: Blocking callable to run
+            timeout: Override for the default per-call timeout
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            asyncio.TimeoutError: If the call takes longer than the timeout
+            asyncio.CancelledError: If the awaiting task is cancelled
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+
+        async with self._semaphore:
+            future = loop.run_in_executor(self._executor, call)
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+
+    async def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run another blocking Gmail-bound callable on the same worker pool.
+
+        Used for helpers built on the wrapped GmailClient (e.g. SyncEngine),
+        so their calls share its concurrency limit and timeout.
+        """
+        return await self._run(func, *args, **kwargs)
+
+    def is_connected(self) -> bool:
+        """Check whether the Gmail service has been initialized."""
+        return self.client.is_connected()
+
+    async def warm_up(self, probe: bool = True) -> None:
+        """Connect ahead of the first command (see GmailClient.warm_up)."""
+        await self._run(self.client.warm_up, probe=probe)
+
+    async def list_messages(
+        self,
+        max_results: int = 10,
+        query: str = '',
+        fields: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """List messages from Gmail inbox (see GmailClient.list_messages)."""
+        return await self._run(self.client.list_messages, max_results=max_results, query=query, fields=fields)
+
+    async def iter_messages(self, query: str = '', page_size: int = 100) -> AsyncIterator[dict[str, Any]]:
+        """Yield every message matching query (see GmailClient.iter_messages).
+
+        The next page is requested as soon as the current one arrives, so it
+        is usually ready by the time the caller gets to it. Leaving the loop
+        early cancels the outstanding request.
+        """
+        page_size = min(page_size, LIST_PAGE_LIMIT)
+
+        def fetch(page_token: str | None) -> asyncio.Future[dict[str, Any]]:
+            return asyncio.ensure_future(
+                self._run(self.client.list_messages_page, query, page_size, page_token)
+            )
+
+        pending: asyncio.Future[dict[str, Any]] | None = fetch(None)
+        try:
+            while pending is not None:
+                page = await pending
+                page_token = page.get('nextPageToken')
+                pending = fetch(page_token) if page_token else None
+                for message in page.get('messages', []):
+                    yield message
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def get_message(
+        self,
+        message_id: str,
+        format: str = 'full',
+        projection: str | None = None,
+    ) -> dict[str, Any]:
+        """Get message details from Gmail (see GmailClient.get_message)."""
+        if projection is None:
+            return await self._run(self.client.get_message, message_id, format=format)
+        return await self._run(self.client.get_message, message_id, projection=projection)
+
+    async def get_thread(self, thread_id: str, projection: str = 'thread') -> dict[str, Any]:
+        """Get a whole conversation (see GmailClient.get_thread)."""
+        return await self._run(self.client.get_thread, thread_id, projection=projection)
+
+    async def get_messages_batch(
+        self,
+        message_ids: list[str],
+        format: str = 'metadata',
+        metadata_headers: list[str] | None = None,
+        projection: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get several messages in batch (see GmailClient.get_messages_batch)."""
+        return await self._run(
+            self.client.get_messages_batch,
+            message_ids,
+            format=format,
+            metadata_headers=metadata_headers,
+            projection=projection,
+        )
+
+    async def get_inbox_summary(self) -> dict[str, Any]:
+        """Get inbox summary (see GmailClient.get_inbox_summary)."""
+        return await self._run(self.client.get_inbox_summary)
+
+    async def get_inbox_counters(self, max_age: float = COUNTERS_TTL_SECONDS) -> InboxCounters:
+        """Get inbox totals (see GmailClient.get_inbox_counters)."""
+        return await self._run(self.client.get_inbox_counters, max_age=max_age)
+
+    async def get_message_count(self) -> int:
+        """Get the number of messages in the inbox.
+
+        Returns:
+            Inbox message total from the counters snapshot
+        """
+        counters = await self.get_inbox_counters()
+        return counters.messages_total
+
+    def close(self) -> None:
+        """Stop the worker pool, dropping calls that have not started yet."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
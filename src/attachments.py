@@ -0,0 +1,195 @@
+"""On-demand attachment storage for Gmail messages.
+
+Statements arrive as multi-megabyte PDFs. Messages only record attachment
+metadata (AttachmentInfo); bytes are fetched when something asks for them,
+decoded in fixed-size chunks straight into a file on the data volume, and
+stored under their SHA-256 so the same statement forwarded twice is kept
+once. Readers get a read-only mmap, so file contents are paged in by the OS
+rather than copied into the Python heap.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from src.gmail_client import GmailClient
+
+# Encoded characters decoded per write; a multiple of 4 so chunks decode alone
+DECODE_CHUNK_CHARS = 64 * 1024
+
+
+@dataclass(frozen=True)
+class AttachmentInfo:
+    """Metadata for one attachment, as found in a message payload.
+
+    part_id identifies the attachment stably; Gmail may hand out a different
+    attachment_id each time the message is fetched.
+    """
+
+    message_id: str
+    part_id: str
+    attachment_id: str
+    filename: str
+    mime_type: str
+    size: int
+
+
+def list_attachments(message: dict[str, Any]) -> list[AttachmentInfo]:
+    """Collect attachment metadata from a message without fetching any bytes.
+
+    Args:
+        message: Message from a format='full' fetch
+
+    Returns:
+        Attachments in document order
+    """
+    attachments = []
+    stack = [message.get('payload', {})]
+    while stack:
+        part = stack.pop()
+        stack.extend(reversed(part.get('parts', [])))
+        body = part.get('body', {})
+        if part.get('filename') and body.get('attachmentId'):
+            attachments.append(AttachmentInfo(
+                message_id=message['id'],
+                part_id=part.get('partId', ''),
+                attachment_id=body['attachmentId'],
+                filename=part['filename'],
+                mime_type=part.get('mimeType', 'application/octet-stream'),
+                size=body.get('size', 0),
+            ))
+    return attachments
+
+
+class AttachmentStore:
+    """Content-addressed attachment files, fetched from Gmail on first use.
+
+    Features:
+    - Bytes fetched lazily via messages.attachments.get
+    - Chunked base64url decode into a temp file, hashed on the way through
+    - Files named by SHA-256, so duplicates share one copy
+    - (message, part) → hash index persisted next to the files
+    - Read access through mmap
+    """
+
+    def __init__(self, gmail_client: GmailClient, root_dir: str | Path = "attachments") -> None:
+        """Initialize store.
+
+        Args:
+            gmail_client: Client used to download attachment bytes
+            root_dir: Directory holding the files and index.json
+        """
+        self.gmail_client = gmail_client
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root_dir / 'index.json'
+        self._lock = threading.Lock()
+        self._index: dict[str, str] = self._load_index()
+
+    def _load_index(self) -> dict[str, str]:
+        """Read the index, starting empty if missing or corrupt."""
+        try:
+            return json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        """Persist the index atomically. Caller holds the lock."""
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self._index))
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _key(info: AttachmentInfo) -> str:
+        return f"{info.message_id}:{info.part_id}"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root_dir / digest[:2] / digest
+
+    def path_for(self, info: AttachmentInfo) -> Path | None:
+        """Local file for an attachment, or None if not downloaded yet."""
+        digest = self._index.get(self._key(info))
+        if digest is None:
+            return None
+        path = self._blob_path(digest)
+        return path if path.exists() else None
+
+    def fetch(self, info: AttachmentInfo) -> Path:
+        """Download an attachment unless it is already stored.
+
+        Args:
+            info: Attachment to fetch
+
+        Returns:
+            Path of the stored file
+
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        path = self.path_for(info)
+        if path is not None:
+            return path
+
+        response = self.gmail_client.get_attachment(info.message_id, info.attachment_id)
+        data = response.get('data', '')
+        del response
+
+        digest, tmp_path = self._decode_to_file(data)
+        del data
+
+        path = self._blob_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        if path.exists():
+            # Same content already stored for another message
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index[self._key(info)] = digest
+            self._save_index()
+        print(f"Stored attachment {info.filename} ({info.size} bytes) as {digest[:12]}")
+        return path
+
+    def _decode_to_file(self, data: str) -> tuple[str, Path]:
+        """Decode base64url data into a temp file in chunks, hashing as it goes."""
+        sha256 = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for start in range(0, len(data), DECODE_CHUNK_CHARS):
+                    chunk = data[start:start + DECODE_CHUNK_CHARS]
+                    # Gmail strips padding; only the last chunk can be short
+                    decoded = base64.urlsafe_b64decode(chunk + '=' * (-len(chunk) % 4))
+                    sha256.update(decoded)
+                    file.write(decoded)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return sha256.hexdigest(), Path(tmp_name)
+
+    @contextmanager
+    def open(self, info: AttachmentInfo) -> Iterator[mmap.mmap | bytes]:
+        """Read an attachment, fetching it first if needed.
+
+        Yields:
+            Read-only mmap of the file (b'' for empty attachments). Slices
+            copy only the requested range.
+        """
+        path = self.fetch(info)
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
@@ -4,11 +4,14 @@ This module enforces single-user access control by validating Discord user IDs
 against the allowlisted user ID from configuration. The allowlist check is
 designed to be used as a global bot check decorator, ensuring all commands
 require authorization.
+
+The allowlisted ID comes from the cached config snapshot, so each check is an
+in-memory integer comparison rather than a .env re-read.
 """
 
 from discord.ext import commands
 
-from src.config import load_config
+from src.config import get_config
 
 
 def check_allowlisted_user(ctx: commands.Context) -> bool:
@@ -25,7 +28,7 @@ def check_allowlisted_user(ctx: commands.Context) -> bool:
     Returns:
         True if ctx.author.id matches allowlisted user ID, False otherwise
     """
-    config = load_config()
+    config = get_config()
     
     # Check if user ID matches allowlisted user
     if ctx.author.id != config.discord_allowlisted_user_id:
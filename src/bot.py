@@ -2,36 +2,170 @@
 Discord Bot for Personal-Claw
 
 This bot provides:
-- User allowlist enforcement via global @bot.check decorator
+- User allowlist enforcement via a global bot check (bot.add_check)
 - Commands for inbox checking and status
+- Background inbox monitoring with an adaptive poll schedule
+- Urgent mail delivered at once, other mail batched into digests
 - Integration with PersonalClaw orchestrator (when available)
 - Gmail client integration
 
 All commands protected by single-user allowlist check.
 """
 
+import asyncio
+import time
+
 import discord
 from discord.ext import commands
+from src.allowlist import Allowlist
+from src.async_gmail_client import AsyncGmailClient
 from src.auth import check_allowlisted_user
-from src.config import load_config
+from src.claw import PersonalClaw
+from src.config import config_service, get_config
+from src.digest_scheduler import DigestScheduler, Urgency
+from src.discord_outbox import Outbox
 from src.gmail_client import GmailClient
-from src.token_manager import TokenManager
+from src.message_cache import MessageCache
+from src.message_store import MessageStore
+from src.poll_scheduler import AdaptivePoller
+from src.sender_index import SenderIndex
+from src.sync_engine import SyncEngine
+from src.transcription import AUDIO_CHUNK_BYTES, TranscriptCache, Transcriber, make_backend
+from src.triage import TriageEngine
 
-# Load configuration
-config = load_config()
+# Load configuration (startup snapshot; auth reads the live one via get_config)
+config = get_config()
 
 # Create bot instance
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
 
-# Create Gmail client instance
-token_manager = TokenManager(
-    credentials_path=config.gmail_credentials_path,
-    token_path=config.gmail_token_path
+class ClawBot(commands.Bot):
+    """Bot that stops its background timers when it shuts down."""
+
+    async def close(self) -> None:
+        await claw.stop()
+        await super().close()
+
+
+bot = ClawBot(command_prefix="!", intents=intents)
+# Every command requires the allowlisted user
+bot.add_check(check_allowlisted_user)
+
+# Every reply goes through the outbox (chunking, coalescing, rate limits)
+outbox = Outbox()
+
+# Create Gmail client instance (runs Gmail I/O off the event loop)
+message_store = MessageStore(config.message_store_path)
+message_cache = MessageCache(
+    config.message_cache_bytes,
+    disk_dir=config.message_cache_dir,
+    max_disk_bytes=config.message_cache_disk_bytes,
+)
+gmail_client = AsyncGmailClient(
+    config,
+    max_concurrency=config.gmail_pool_size,
+    client=GmailClient(config, store=message_store, cache=message_cache),
+)
+allowlist = Allowlist.from_entries(config.allowlisted_senders)
+triage = TriageEngine(allowlist=allowlist)
+sender_index = SenderIndex(config.sender_index_path)
+# Added messages are fetched with the triage headers once; triage reuses them from the cache
+sync_engine = SyncEngine(
+    gmail_client.client,
+    state_path=config.sync_state_path,
+    store=message_store,
+    projection='triage',
+    senders=sender_index,
+)
+# Sent mail never reaches the inbox engine; this one counts the user's replies
+sent_sync_engine = SyncEngine(
+    gmail_client.client,
+    state_path=config.sent_sync_state_path,
+    label_id='SENT',
+    projection='triage',
+    senders=sender_index,
 )
-gmail_client = GmailClient(token_manager)
+
+
+async def poll_inbox() -> list[dict]:
+    """Sync mailbox changes and return newly arrived messages."""
+    try:
+        await gmail_client.call(sent_sync_engine.sync)
+    except Exception as error:
+        # Reply counts can catch up next poll; new mail matters more
+        print(f"Sent mail sync failed: {error}")
+    result = await gmail_client.call(sync_engine.sync)
+    if result.full_resync or not result.added:
+        # First sync (or expired history): existing mail is not news
+        return []
+    # Drop spam, bulk mail and mailing lists from headers alone
+    fetched = await gmail_client.get_messages_batch(result.added, projection='triage')
+    wanted = [message['id'] for message in fetched if triage.keep(message)]
+    messages = message_store.get_messages(wanted)
+    if allowlist:
+        # Only allowlisted senders are worth a notification
+        messages = [msg for msg in messages if allowlist.matches(msg['from'])]
+    return messages
+
+
+async def queue_new_mail(messages: list[dict]) -> None:
+    """Hand newly arrived messages to the digest scheduler."""
+    digest.add_many(messages)
+
+
+async def deliver_mail(tier: Urgency, messages: list[dict]) -> None:
+    """DM the allowlisted user: urgent mail directly, the rest as a digest.
+
+    Each line carries the message ID for !summarize and !snooze, and
+    delivered mail starts being tracked as NEW.
+    """
+    user = await bot.fetch_user(get_config().discord_allowlisted_user_id)
+    if tier == Urgency.URGENT:
+        lines = [f"🚨 New mail from {msg['from']}: {msg['subject']} ({msg['id']})" for msg in messages]
+    else:
+        lines = [f"📬 Mail digest ({len(messages)} messages):"]
+        lines += [f"• {msg['from']}: {msg['subject']} ({msg['id']})" for msg in messages]
+    await outbox.send(user, "\n".join(lines))
+    poller.stats.record_delivery(messages)
+    claw.status.track(msg['id'] for msg in messages)
+
+
+async def notify_user(text: str) -> None:
+    """DM the allowlisted user."""
+    user = await bot.fetch_user(get_config().discord_allowlisted_user_id)
+    await outbox.send(user, text)
+
+
+# Email status timers: overdue reminders and snooze wake-ups
+claw = PersonalClaw(config, sync_engine=sync_engine, notify=notify_user, gmail=gmail_client)
+digest = DigestScheduler(
+    deliver_mail,
+    db_path=config.digest_db_path,
+    windows={
+        Urgency.NORMAL: config.digest_window_seconds,
+        Urgency.LOW: config.digest_low_window_seconds,
+    },
+)
+poller = AdaptivePoller(
+    poll_inbox,
+    notify=queue_new_mail,
+    min_interval=config.poll_min_seconds,
+    max_interval=config.poll_max_seconds,
+    quiet_hours=config.quiet_hours,
+)
+config_watcher: asyncio.Task | None = None
+
+# Voice notes are transcribed in worker processes, never on the event loop.
+# make_backend fails here, at startup, if the backend's package is missing.
+transcriber = Transcriber(
+    make_backend(config.transcription_backend),
+    TranscriptCache(config.transcript_cache_path),
+    max_workers=config.transcription_workers,
+) if config.transcription_backend else None
+# Voice message ID -> its transcription job, so deleting the note cancels it
+voice_jobs: dict[int, asyncio.Task] = {}
 
 
 @bot.event
@@ -41,66 +175,48 @@ async def on_ready():
     print("✅ Gmail connected")
     print("🎯 Bot is online and ready!")
     print(f"📬 Status: Responding to commands from {bot.user.name} only")
+    if config.gmail_warm_up and not gmail_client.is_connected():
+        try:
+            await gmail_client.warm_up()
+        except Exception as error:
+            print(f"Gmail warm-up failed (will connect on first command): {error}")
+    poller.start()
+    digest.start()
+    await claw.start()
+    
+    # Hot-reload config on SIGHUP or when .env changes
+    global config_watcher
+    if config_watcher is None:
+        loop = asyncio.get_running_loop()
+        config_service.install_sighup_handler(loop)
+        config_watcher = loop.create_task(config_service.watch())
 
 
-@bot.check(check_allowlisted_user)
-async def ping(ctx):
-    """Ping command - bot health check with allowlist enforcement."""
-    await ctx.send("Pong! You're authorized. 🎯")
+@bot.before_invoke
+async def on_command_activity(ctx):
+    """Any command counts as user activity: poll quickly for a while."""
+    poller.note_activity()
 
 
-@bot.check(check_allowlisted_user)
-async def status(ctx):
-    """Get bot status - check Gmail connection, inbox count."""
-    # Try to get message count (may fail if Gmail not configured yet)
-    try:
-        count = await gmail_client.get_message_count()
-    except Exception:
-        count = 0
-    
-    # Format response
-    response = "📬 Status:\n"
-    response += f"📬 Messages: {count}\n"
-    
-    # Connection status
-    if gmail_client.is_connected():
-        response += f"📬 Gmail: {'✅ Connected'}\n"
-    else:
-        response += f"📬 Gmail: {'❌ Disconnected'}\n"
-    
-    # Bot status
-    if bot.is_ready():
-        response += f"📬 Discord: {'✅ Connected'}\n"
-    else:
-        response += f"📬 Discord: {'❌ Disconnected'}\n"
-    
-    response += "📬 All systems operational"
-    
-    await ctx.send(response)
-
-
-@bot.check(check_allowlisted_user)
-async def check_inbox(ctx):
-    """Check inbox - fetch Gmail summary."""
-    # Get inbox summary from Gmail client
-    summary = await gmail_client.get_inbox_summary()
-    
-    # Send summary
-    await ctx.send(f"📬 Inbox Summary:\n{summary}")
+@bot.command(name="ping", description="Check the bot is up and you're authorized")
+async def cmd_ping(ctx):
+    """Command: /ping - Bot health check with allowlist enforcement."""
+    await outbox.send(ctx.channel, "Pong! You're authorized. 🎯")
 
 
 @bot.command(name="status", description="Check bot and inbox status")
 async def cmd_status(ctx):
     """Command: /status - Get bot and Gmail status."""
-    # Get message count
+    # Inbox counters (one labels.get call, or none while the snapshot is fresh)
     try:
-        count = await gmail_client.get_message_count()
+        counters = await gmail_client.get_inbox_counters()
+        total, unread = counters.messages_total, counters.messages_unread
     except Exception:
-        count = 0
+        total, unread = 0, 0
     
     # Format response
     response = "📬 Status:\n"
-    response += f"📬 Messages: {count}\n"
+    response += f"📬 Messages: {total} ({unread} unread)\n"
     
     # Connection status
     if gmail_client.is_connected():
@@ -116,7 +232,7 @@ async def cmd_status(ctx):
     
     response += "📬 All systems operational"
     
-    await ctx.send(response)
+    await outbox.send(ctx.channel, response)
 
 
 @bot.command(name="check-inbox", description="Check your Gmail inbox")
@@ -126,14 +242,81 @@ async def cmd_check_inbox(ctx):
     summary = await gmail_client.get_inbox_summary()
     
     # Send summary
-    await ctx.send(f"📬 Inbox Summary:\n{summary}")
+    await outbox.send(ctx.channel, f"📬 Inbox Summary:\n{summary}")
+
+
+@bot.command(name="summarize", description="Summarize an email (starts its 24h reply clock)")
+async def cmd_summarize(ctx, message_id: str):
+    """Command: /summarize <message_id> - Summarize one email."""
+    await outbox.send(ctx.channel, await claw.summarize_message(message_id))
+
+
+@bot.command(name="snooze", description="Snooze an email for some hours")
+async def cmd_snooze(ctx, message_id: str, hours: float = 24.0):
+    """Command: /snooze <message_id> [hours] - Bring an email back later."""
+    await outbox.send(ctx.channel, claw.snooze_message(message_id, time.time() + hours * 3600))
+
+
+@bot.command(name="poll", description="Check Gmail for new mail right now")
+async def cmd_poll(ctx):
+    """Command: /poll - Trigger an immediate inbox poll."""
+    poller.trigger()
+    stats = poller.stats
+    await outbox.send(
+        ctx.channel,
+        f"🔄 Checking Gmail now "
+        f"(avg poll {stats.average_poll_seconds:.2f}s, "
+        f"avg delivery latency {stats.average_latency:.0f}s)"
+    )
+
+
+@bot.listen("on_message")
+async def on_voice_message(message):
+    """Transcribe voice messages from the allowlisted user."""
+    if message.author.bot or not message.flags.is_voice_message or not message.attachments:
+        return
+    if not check_allowlisted_user(message):
+        return
+    if transcriber is None:
+        await outbox.send(message.channel, "❌ Voice transcription is off (set TRANSCRIPTION_BACKEND=whisper).")
+        return
+    
+    # A newer voice note from the user supersedes one still being transcribed
+    job = transcriber.submit(message.author.id, message.attachments[0].read_chunked(AUDIO_CHUNK_BYTES))
+    voice_jobs[message.id] = job
+    try:
+        text = await job
+    except asyncio.CancelledError:
+        if job.cancelled():
+            return
+        raise
+    except Exception as error:
+        print(f"Transcription failed: {error}")
+        await outbox.send(message.channel, "❌ Sorry, I couldn't transcribe that voice message.")
+        return
+    finally:
+        voice_jobs.pop(message.id, None)
+    
+    await outbox.send(message.channel, f"🎙️ {text}" if text else "🎙️ (no speech heard)")
+
+
+@bot.listen("on_message_delete")
+async def on_voice_message_delete(message):
+    """Stop transcribing a voice message the user deleted."""
+    job = voice_jobs.pop(message.id, None)
+    if job is not None:
+        job.cancel()
 
 
 def main():
     """Main entry point: load config, create bot, start it."""
     print(f"Starting bot with allowlisted user ID: {config.discord_allowlisted_user_id}")
     
-    bot.run(config.discord_bot_token)
+    try:
+        bot.run(config.discord_bot_token)
+    finally:
+        if transcriber is not None:
+            transcriber.shutdown()
 
 
 if __name__ == "__main__":
@@ -12,11 +12,23 @@ Clean separation of concerns:
 
 from __future__ import annotations
 
+from typing import Awaitable, Callable
 
 from googleapiclient.errors import HttpError
 
+from src.async_gmail_client import AsyncGmailClient
+from src.attachments import AttachmentStore
 from src.config import Config
+from src.email_status import EmailStatus, EmailStatusStore, InvalidTransition
 from src.gmail_client import GmailClient
+from src.message_cache import MessageCache
+from src.message_store import MessageStore
+from src.request_scheduler import DeadlineExceeded
+from src.summaries import LeadSummarizer, SummaryCache, SummaryService, Summarizer
+from src.sync_engine import SyncEngine
+
+# Sends a text to the user (e.g. a Discord DM)
+NotifyFunc = Callable[[str], Awaitable[None]]
 
 
 class PersonalClaw:
@@ -26,16 +38,92 @@ class PersonalClaw:
     Provides high-level methods that Discord bot can call.
     """
     
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        summarizer: Summarizer | None = None,
+        sync_engine: SyncEngine | None = None,
+        notify: NotifyFunc | None = None,
+        gmail: AsyncGmailClient | None = None,
+    ) -> None:
         """Initialize PersonalClaw with configuration.
         
         Args:
             config: Application configuration
+            summarizer: Summarizer to use (default: LeadSummarizer)
+            sync_engine: Engine keeping the message store fresh (default: one
+                         of our own; pass the host's engine when it already
+                         syncs the same store)
+            notify: Coroutine sending the user a text; used to report overdue
+                    emails and bring snoozed ones back (timers run once
+                    start() is called)
+            gmail: The host's Gmail client (default: one of our own); its
+                   GmailClient, message store and cache are shared, so
+                   there is one token refresher, worker pool and cache
         """
         self.config = config
-        self.gmail_client = GmailClient(config)
+        if gmail is not None:
+            self.gmail = gmail
+            self.gmail_client = gmail.client
+            self.store = self.gmail_client.store or MessageStore(config.message_store_path)
+            self.cache = self.gmail_client.cache
+        else:
+            self.store = MessageStore(config.message_store_path)
+            self.cache = MessageCache(
+                config.message_cache_bytes,
+                disk_dir=config.message_cache_dir,
+                max_disk_bytes=config.message_cache_disk_bytes,
+            )
+            self.gmail_client = GmailClient(config, store=self.store, cache=self.cache)
+            # Runs Gmail I/O off the event loop
+            self.gmail = AsyncGmailClient(config, client=self.gmail_client)
+        self.sync_engine = sync_engine or SyncEngine(
+            self.gmail_client,
+            state_path=config.sync_state_path,
+            store=self.store,
+        )
+        self.attachments = AttachmentStore(self.gmail_client, config.attachment_dir)
+        self.summaries = SummaryService(
+            summarizer or LeadSummarizer(),
+            SummaryCache(config.summary_cache_path),
+        )
+        self.notify = notify
+        self.status = EmailStatusStore(
+            config.status_db_path,
+            on_overdue=self._on_overdue,
+            on_wake=self._on_wake,
+        )
         print("PersonalClaw initialized")
     
+    async def start(self) -> None:
+        """Start the email status timers (response deadlines, snoozes)."""
+        self.status.start()
+    
+    async def stop(self) -> None:
+        """Stop the email status timers."""
+        await self.status.stop()
+    
+    async def _on_overdue(self, message_ids: list[str]) -> None:
+        """Remind the user of emails left unanswered past the deadline."""
+        hours = self.status.response_deadline / 3600
+        await self._send_mail_list(f"⏰ Still waiting on you after {hours:.0f}h:", message_ids)
+    
+    async def _on_wake(self, message_ids: list[str]) -> None:
+        """Bring snoozed emails back to the user."""
+        await self._send_mail_list("⏰ Back from snooze:", message_ids)
+    
+    async def _send_mail_list(self, heading: str, message_ids: list[str]) -> None:
+        """Notify the user with a heading and one line per email."""
+        if self.notify is None:
+            return
+        rows = {row['id']: row for row in self.store.get_messages(message_ids)}
+        lines = [heading]
+        for message_id in message_ids:
+            row = rows.get(message_id)
+            # Not in the store (e.g. left the inbox): the ID is all we have
+            lines.append(f"• {row['from']}: {row['subject']} ({message_id})" if row else f"• Email {message_id}")
+        await self.notify("\n".join(lines))
+    
     async def check_inbox(self) -> str:
         """Check Gmail inbox and return formatted summary.
         
@@ -43,10 +131,13 @@ class PersonalClaw:
             User-friendly string with inbox summary
             Format: "📬 You have X messages in your inbox"
             
+        The store is brought up to date with one incremental sync (a
+        history.list call, plus a batch fetch of new mail) and the summary
+        is read from it; if Gmail is down the last synced state is shown.
         Handles Gmail API errors gracefully with user-friendly messages.
         """
         try:
-            summary = self.gmail_client.get_inbox_summary()
+            summary = await self.gmail.call(self._synced_inbox_summary)
             message_count = summary['message_count']
             
             if message_count == 0:
@@ -64,18 +155,100 @@ class PersonalClaw:
             print(f"Unexpected error in check_inbox: {error}")
             return "❌ Something went wrong. Let me know if this keeps happening."
     
+    def _synced_inbox_summary(self) -> dict:
+        """Sync the store, then summarize the inbox from it (blocking)."""
+        try:
+            self.sync_engine.sync()
+        except (HttpError, DeadlineExceeded) as error:
+            print(f"Sync failed, inbox summary may be stale: {error}")
+        return self.gmail_client.get_inbox_summary(cached=True)
+    
     def get_message_count(self) -> int:
         """Get count of messages in inbox.
         
         Returns:
             Number of messages (0 if error)
             
-        Used for quick status checks without full summary.
+        Used for quick status checks without full summary. Reads Gmail's
+        INBOX counters (one cheap call, none while the snapshot is fresh).
         """
         try:
-            summary = self.gmail_client.get_inbox_summary()
-            return summary['message_count']
+            return self.gmail_client.get_inbox_counters().messages_total
         
         except Exception as error:
             print(f"Error getting message count: {error}")
             return 0
+    
+    async def summarize_message(self, message_id: str) -> str:
+        """Summarize one email.
+        
+        Returns:
+            Summary text, or a user-friendly error message. A message whose
+            body was summarized before is answered from the summary cache.
+            The Gmail fetch and summarizer run on the Gmail worker pool.
+        """
+        try:
+            summary = await self.gmail.call(self._summarize_message, message_id)
+        
+        except (HttpError, DeadlineExceeded) as error:
+            print(f"Gmail API error in summarize_message: {error}")
+            return "❌ Sorry, I couldn't reach Gmail right now. Try again in a moment?"
+        
+        except Exception as error:
+            print(f"Unexpected error in summarize_message: {error}")
+            return "❌ Something went wrong. Let me know if this keeps happening."
+        
+        # The user now owes this email a response (starts the 24h clock)
+        if self.status.get(message_id) in (None, EmailStatus.NEW):
+            self.status.transition(message_id, EmailStatus.SUMMARIZED)
+        return summary
+    
+    def _summarize_message(self, message_id: str) -> str:
+        """Fetch and summarize one email (blocking)."""
+        return self.summaries.summarize_message(self.gmail_client.get_message_text(message_id))
+    
+    def snooze_message(self, message_id: str, until: float) -> str:
+        """Snooze an email until a time.
+        
+        Args:
+            message_id: Gmail message ID
+            until: Epoch seconds to bring the email back at
+        
+        Returns:
+            User-friendly confirmation or error message
+        """
+        try:
+            self.status.snooze(message_id, until)
+        except InvalidTransition as error:
+            print(f"Cannot snooze {message_id}: {error}")
+            return "❌ That email is already dealt with, nothing to snooze."
+        return "😴 Snoozed. I'll bring it back later."
+    
+    async def summarize_thread(self, thread_id: str) -> str:
+        """Summarize an email thread.
+        
+        Args:
+            thread_id: Gmail thread ID
+        
+        Returns:
+            Summary text, or a user-friendly error message. The thread's
+            message list comes from one threads.get call; only messages
+            added since the last summary of this thread are fetched and
+            summarized. The work runs on the Gmail worker pool.
+        """
+        try:
+            return await self.gmail.call(self._summarize_thread, thread_id)
+        
+        except (HttpError, DeadlineExceeded) as error:
+            print(f"Gmail API error in summarize_thread: {error}")
+            return "❌ Sorry, I couldn't reach Gmail right now. Try again in a moment?"
+        
+        except Exception as error:
+            print(f"Unexpected error in summarize_thread: {error}")
+            return "❌ Something went wrong. Let me know if this keeps happening."
+    
+    def _summarize_thread(self, thread_id: str) -> str:
+        """Fetch a thread's new messages and summarize it (blocking)."""
+        thread = self.gmail_client.get_thread(thread_id)
+        message_ids = [message['id'] for message in thread.get('messages', [])]
+        return self.summaries.summarize_thread(thread_id, message_ids, self.gmail_client.get_message_text)
@@ -1,12 +1,16 @@
 """Configuration management for Personal-Claw."""
 
+import asyncio
 import os
+import signal
+import threading
 from dataclasses import dataclass
+from pathlib import Path
 
-from dotenv import load_dotenv
+from dotenv import find_dotenv, load_dotenv
 
 
-@dataclass
+@dataclass(frozen=True)
 class Config:
     """Application configuration loaded from environment variables."""
     
@@ -14,9 +18,46 @@ class Config:
     discord_allowlisted_user_id: int
     gmail_credentials_path: str = "credentials.json"
     gmail_token_path: str = "token.json"
+    token_refresh_margin: float = 300.0
+    gmail_warm_up: bool = True
+    gmail_pool_size: int = 4
+    gmail_quota_units_per_second: float = 250.0
+    sync_state_path: str = "sync_state.json"
+    sent_sync_state_path: str = "sent_sync_state.json"
+    message_store_path: str = "messages.db"
+    message_cache_bytes: int = 32 * 1024 * 1024
+    message_cache_dir: str | None = None
+    message_cache_disk_bytes: int = 256 * 1024 * 1024
+    attachment_dir: str = "attachments"
+    summary_cache_path: str = "summaries.db"
+    digest_db_path: str = "digest.db"
+    sender_index_path: str = "senders.db"
+    status_db_path: str = "status.db"
+    transcription_backend: str = ""
+    transcription_workers: int = 1
+    transcript_cache_path: str = "transcripts.db"
+    digest_window_seconds: float = 3600.0
+    digest_low_window_seconds: float = 86400.0
+    poll_min_seconds: float = 30.0
+    poll_max_seconds: float = 900.0
+    quiet_hours: tuple[int, int] | None = None
+    allowlisted_senders: tuple[str, ...] = ()
+
+
+def _parse_quiet_hours(value: str) -> tuple[int, int] | None:
+    """Parse QUIET_HOURS like "22-7" into (start_hour, end_hour)."""
+    if not value:
+        return None
+    try:
+        start, end = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise ValueError(f"QUIET_HOURS must look like 22-7, got: {value}")
+    if not (0 <= start < 24 and 0 <= end < 24):
+        raise ValueError(f"QUIET_HOURS hours must be between 0 and 23, got: {value}")
+    return start, end
 
 
-def load_config() -> Config:
+def load_config(env_path: str | None = None, override: bool = False) -> Config:
     """
     Load configuration from environment variables.
     
@@ -24,6 +65,11 @@ def load_config() -> Config:
     values are set. Fails fast with clear error messages if required
     variables are missing.
     
+    Args:
+        env_path: .env file to load (default: search upwards for .env)
+        override: Let .env values replace variables already in the
+                  environment (used when reloading a changed .env)
+    
     Returns:
         Config: Configuration instance with all values loaded
         
@@ -31,7 +77,7 @@ def load_config() -> Config:
         ValueError: If required environment variables are missing or invalid
     """
     # Load .env file if it exists
-    load_dotenv()
+    load_dotenv(env_path, override=override)
     
     # Required variables
     discord_token = os.getenv("DISCORD_BOT_TOKEN")
@@ -65,15 +111,171 @@ def load_config() -> Config:
     # Optional variables with defaults
     gmail_creds = os.getenv("GMAIL_CREDENTIALS_PATH", "credentials.json")
     gmail_token = os.getenv("GMAIL_TOKEN_PATH", "token.json")
+    gmail_warm_up = os.getenv("GMAIL_WARM_UP", "true").lower() in ("1", "true", "yes")
+    sync_state = os.getenv("SYNC_STATE_PATH", "sync_state.json")
+    sent_sync_state = os.getenv("SENT_SYNC_STATE_PATH", "sent_sync_state.json")
+    message_store = os.getenv("MESSAGE_STORE_PATH", "messages.db")
+    message_cache_dir = os.getenv("MESSAGE_CACHE_DIR") or None
+    attachment_dir = os.getenv("ATTACHMENT_DIR", "attachments")
+    summary_cache = os.getenv("SUMMARY_CACHE_PATH", "summaries.db")
+    digest_db = os.getenv("DIGEST_DB_PATH", "digest.db")
+    sender_index = os.getenv("SENDER_INDEX_PATH", "senders.db")
+    status_db = os.getenv("STATUS_DB_PATH", "status.db")
+    transcription_backend = os.getenv("TRANSCRIPTION_BACKEND", "")
+    transcript_cache = os.getenv("TRANSCRIPT_CACHE_PATH", "transcripts.db")
+    quiet_hours = _parse_quiet_hours(os.getenv("QUIET_HOURS", ""))
+    allowlisted_senders = tuple(
+        entry.strip()
+        for entry in os.getenv("ALLOWLISTED_SENDERS", "").split(",")
+        if entry.strip()
+    )
+    try:
+        poll_min = float(os.getenv("POLL_MIN_SECONDS", "30"))
+        poll_max = float(os.getenv("POLL_MAX_SECONDS", "900"))
+        refresh_margin = float(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+        pool_size = int(os.getenv("GMAIL_POOL_SIZE", "4"))
+        quota_rate = float(os.getenv("GMAIL_QUOTA_UNITS_PER_SECOND", "250"))
+        cache_bytes = int(os.getenv("MESSAGE_CACHE_BYTES", str(32 * 1024 * 1024)))
+        cache_disk_bytes = int(os.getenv("MESSAGE_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+        digest_window = float(os.getenv("DIGEST_WINDOW_SECONDS", "3600"))
+        digest_low_window = float(os.getenv("DIGEST_LOW_WINDOW_SECONDS", "86400"))
+        transcription_workers = int(os.getenv("TRANSCRIPTION_WORKERS", "1"))
+    except ValueError:
+        raise ValueError(
+            "POLL_MIN_SECONDS, POLL_MAX_SECONDS, TOKEN_REFRESH_MARGIN_SECONDS, "
+            "GMAIL_POOL_SIZE, GMAIL_QUOTA_UNITS_PER_SECOND, MESSAGE_CACHE_BYTES, "
+            "MESSAGE_CACHE_DISK_BYTES, "
+            "DIGEST_WINDOW_SECONDS, DIGEST_LOW_WINDOW_SECONDS and "
+            "TRANSCRIPTION_WORKERS must be numbers"
+        )
     
     return Config(
         discord_bot_token=discord_token,
         discord_allowlisted_user_id=user_id,
         gmail_credentials_path=gmail_creds,
         gmail_token_path=gmail_token,
+        token_refresh_margin=refresh_margin,
+        gmail_warm_up=gmail_warm_up,
+        gmail_pool_size=pool_size,
+        gmail_quota_units_per_second=quota_rate,
+        sync_state_path=sync_state,
+        sent_sync_state_path=sent_sync_state,
+        message_store_path=message_store,
+        message_cache_bytes=cache_bytes,
+        message_cache_dir=message_cache_dir,
+        message_cache_disk_bytes=cache_disk_bytes,
+        attachment_dir=attachment_dir,
+        summary_cache_path=summary_cache,
+        digest_db_path=digest_db,
+        sender_index_path=sender_index,
+        status_db_path=status_db,
+        transcription_backend=transcription_backend,
+        transcription_workers=transcription_workers,
+        transcript_cache_path=transcript_cache,
+        digest_window_seconds=digest_window,
+        digest_low_window_seconds=digest_low_window,
+        poll_min_seconds=poll_min,
+        poll_max_seconds=poll_max,
+        quiet_hours=quiet_hours,
+        allowlisted_senders=allowlisted_senders,
     )
 
 
+class ConfigService:
+    """Owns the current Config snapshot and swaps it atomically on reload.
+    
+    Readers call get(), which returns the cached immutable snapshot without
+    touching the filesystem. A new snapshot is only built on SIGHUP or when
+    a watcher sees the .env modification time change; if the new values are
+    invalid the previous snapshot stays in place.
+    """
+    
+    def __init__(self, env_path: str | None = None) -> None:
+        """Initialize config service.
+        
+        Args:
+            env_path: .env file to load and watch (default: search upwards)
+        """
+        self.env_path = env_path or find_dotenv() or ".env"
+        self._config: Config | None = None
+        self._mtime: float | None = None
+        self._lock = threading.Lock()
+    
+    def get(self) -> Config:
+        """Get the current config snapshot (loaded on first use).
+        
+        Raises:
+            ValueError: If the first load finds invalid configuration
+        """
+        config = self._config
+        if config is None:
+            with self._lock:
+                if self._config is None:
+                    self._mtime = self._env_mtime()
+                    self._config = load_config(self.env_path)
+                config = self._config
+        return config
+    
+    def reload(self) -> bool:
+        """Rebuild the snapshot from .env and the environment.
+        
+        Returns:
+            True if the new snapshot was installed, False if it was invalid
+        """
+        with self._lock:
+            self._mtime = self._env_mtime()
+            try:
+                config = load_config(self.env_path, override=True)
+            except ValueError as error:
+                print(f"Config reload failed, keeping previous config: {error}")
+                return False
+            self._config = config
+        print("Config reloaded")
+        return True
+    
+    def reload_if_changed(self) -> bool:
+        """Reload if the .env modification time changed since the last load.
+        
+        Returns:
+            True if a new snapshot was installed
+        """
+        if self._config is None or self._env_mtime() == self._mtime:
+            return False
+        return self.reload()
+    
+    def install_sighup_handler(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Reload config when the process receives SIGHUP.
+        
+        Args:
+            loop: Event loop to register with (default: plain signal handler)
+        """
+        if loop is not None:
+            loop.add_signal_handler(signal.SIGHUP, self.reload)
+        else:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload())
+    
+    async def watch(self, interval: float = 5.0) -> None:
+        """Poll the .env modification time and reload on change (runs forever)."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+    
+    def _env_mtime(self) -> float | None:
+        """Modification time of the .env file, or None if it doesn't exist."""
+        try:
+            return Path(self.env_path).stat().st_mtime
+        except OSError:
+            return None
+
+
+config_service = ConfigService()
+
+
+def get_config() -> Config:
+    """Get the current config snapshot from the shared ConfigService."""
+    return config_service.get()
+
+
 @dataclass
 class GmailConfig:
     """Gmail-only configuration for OAuth tooling."""
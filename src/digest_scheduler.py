@@ -0,0 +1,249 @@
+"""Urgency-tiered delivery of new-mail notifications.
+
+Urgent mail should reach the user right away; the rest is better as one
+digest per window than as a ping per message. DigestScheduler classifies
+each new message into an Urgency tier and queues it in a min-heap keyed by
+due time. Non-urgent due times are aligned to window boundaries, so
+everything that arrives within a window comes due together and goes out as
+a single digest. Pending items live in SQLite as well, so a restart delivers
+them instead of losing them. The delivery task sleeps until the earliest due
+time (or indefinitely when nothing is pending), so an idle queue costs no
+wake-ups.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    due REAL NOT NULL,
+    tier INTEGER NOT NULL,
+    item TEXT NOT NULL
+);
+"""
+
+# Subject words that make a message urgent regardless of labels
+URGENT_WORDS = ('urgent', 'overdue', 'action required', 'due today', 'final notice', 'fraud', 'declined')
+
+# Gmail categories that can wait for the slow digest
+LOW_PRIORITY_LABELS = {'CATEGORY_PROMOTIONS', 'CATEGORY_SOCIAL', 'CATEGORY_FORUMS', 'CATEGORY_UPDATES'}
+
+# Seconds before retrying a digest whose delivery failed
+RETRY_DELAY = 60.0
+
+
+class Urgency(IntEnum):
+    """Delivery tier; lower values are delivered first."""
+
+    URGENT = 0
+    NORMAL = 1
+    LOW = 2
+
+
+def classify_urgency(message: dict[str, Any]) -> Urgency:
+    """Pick a delivery tier for a stored message row.
+
+    STARRED mail and subjects with URGENT_WORDS are urgent; Gmail's
+    promotions/social/forums/updates categories are low priority. IMPORTANT
+    alone is not urgent: Gmail puts it on most personal and financial mail.
+    """
+    labels = set(message.get('labels', []))
+    subject = message.get('subject', '').lower()
+    if 'STARRED' in labels or any(word in subject for word in URGENT_WORDS):
+        return Urgency.URGENT
+    if labels & LOW_PRIORITY_LABELS:
+        return Urgency.LOW
+    return Urgency.NORMAL
+
+
+DeliverFunc = Callable[[Urgency, list[dict[str, Any]]], Awaitable[None]]
+ClassifyFunc = Callable[[dict[str, Any]], Urgency]
+
+# Heap entry: (due, seq, tier, item); seq breaks ties in arrival order
+_Entry = tuple[float, int, int, dict[str, Any]]
+
+
+class DigestScheduler:
+    """Priority queue of pending notifications with coalesced digests.
+
+    Features:
+    - O(log n) enqueue and dequeue (heapq), one SQLite row per item
+    - Urgent items due immediately; others due at the end of their window
+    - One deliver() call per tier per window
+    - Pending items survive restarts; failed deliveries are retried
+    - Sleeps until the next due time instead of ticking
+    """
+
+    def __init__(
+        self,
+        deliver: DeliverFunc,
+        db_path: str = "digest.db",
+        windows: dict[Urgency, float] | None = None,
+        classify: ClassifyFunc = classify_urgency,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize scheduler and reload pending items.
+
+        Args:
+            deliver: Coroutine sending one tier's due items to the user
+            db_path: SQLite file for pending items (":memory:" = no persistence)
+            windows: Digest window per non-urgent tier, in seconds
+                     (default: NORMAL hourly, LOW daily)
+            classify: Picks the tier for each new item
+            clock: Wall clock in epoch seconds (overridable for tests)
+        """
+        self.deliver = deliver
+        self.windows = windows or {Urgency.NORMAL: 3600.0, Urgency.LOW: 86400.0}
+        self.classify = classify
+        self.clock = clock
+
+        if db_path != ":memory:" and Path(db_path).parent != Path("."):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+        self._heap: list[_Entry] = [
+            (due, seq, tier, json.loads(item))
+            for seq, due, tier, item in self._conn.execute("SELECT seq, due, tier, item FROM pending")
+        ]
+        heapq.heapify(self._heap)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        """Number of pending items."""
+        return len(self._heap)
+
+    def due_time(self, tier: Urgency, now: float) -> float:
+        """When an item of this tier arriving now should be delivered."""
+        window = self.windows.get(tier)
+        if tier == Urgency.URGENT or not window:
+            return now
+        # End of the current window, so a window's items share one due time
+        return (now // window + 1) * window
+
+    def add(self, item: dict[str, Any]) -> Urgency:
+        """Queue one item for delivery.
+
+        Returns:
+            The tier it was classified into
+        """
+        return self.add_many([item])[0]
+
+    def add_many(self, items: Iterable[dict[str, Any]]) -> list[Urgency]:
+        """Queue several items in a single database transaction.
+
+        Returns:
+            The tier of each item, in input order
+        """
+        now = self.clock()
+        earliest = self.next_due()
+        tiers = []
+        with self._lock, self._conn:
+            for item in items:
+                tier = self.classify(item)
+                due = self.due_time(tier, now)
+                cursor = self._conn.execute(
+                    "INSERT INTO pending (due, tier, item) VALUES (?, ?, ?)",
+                    (due, int(tier), json.dumps(item)),
+                )
+                heapq.heappush(self._heap, (due, cursor.lastrowid, int(tier), item))
+                tiers.append(tier)
+
+        if self._heap and (earliest is None or self._heap[0][0] < earliest):
+            # Earliest due time moved forward: reschedule the sleeper
+            self._wake.set()
+        return tiers
+
+    def next_due(self) -> float | None:
+        """Epoch seconds of the earliest pending item, or None if empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float | None = None) -> list[_Entry]:
+        """Take every entry due by now off the heap (still kept in SQLite)."""
+        now = self.clock() if now is None else now
+        due: list[_Entry] = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def deliver_due(self) -> int:
+        """Deliver everything due now, one call per tier.
+
+        Returns:
+            Number of items delivered
+        """
+        entries = self.pop_due()
+        by_tier: dict[int, list[_Entry]] = {}
+        for entry in entries:
+            by_tier.setdefault(entry[2], []).append(entry)
+
+        delivered = 0
+        for tier in sorted(by_tier):
+            batch = by_tier[tier]
+            try:
+                await self.deliver(Urgency(tier), [entry[3] for entry in batch])
+            except Exception as error:
+                print(f"Digest delivery failed, retrying in {RETRY_DELAY:.0f}s: {error}")
+                self._reschedule(batch, self.clock() + RETRY_DELAY)
+                continue
+            self._forget(batch)
+            delivered += len(batch)
+        return delivered
+
+    def _forget(self, entries: list[_Entry]) -> None:
+        """Drop delivered entries from the database."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM pending WHERE seq = ?", [(entry[1],) for entry in entries])
+
+    def _reschedule(self, entries: list[_Entry], due: float) -> None:
+        """Put entries back on the heap with a new due time."""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE pending SET due = ? WHERE seq = ?", [(due, entry[1]) for entry in entries])
+        for _, seq, tier, item in entries:
+            heapq.heappush(self._heap, (due, seq, tier, item))
+
+    def start(self) -> asyncio.Task[None]:
+        """Start the delivery task on the running loop (no-op if running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name='digest-scheduler')
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the delivery task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Delivery loop: sleep until the earliest due time or a wake-up."""
+        while True:
+            next_due = self.next_due()
+            timeout = None if next_due is None else max(0.0, next_due - self.clock())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.deliver_due()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
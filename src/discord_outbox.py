@@ -0,0 +1,200 @@
+"""Outbound Discord message pipeline.
+
+Discord rejects messages over 2000 characters and rate-limits each channel
+(about 5 messages per 5 seconds). Sending straight from command handlers
+means long summaries fail outright and notification bursts run into 429s,
+which py-cord then retries one by one. Outbox sits in front of every send:
+text is split on line boundaries, messages queued for the same channel are
+merged while an earlier send is in flight or waiting for the rate limit,
+and a per-channel token bucket keeps us under Discord's limit instead of
+reacting to 429s. A backlog therefore turns into fewer, fuller messages
+rather than a growing queue of tiny ones.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+# Discord's maximum message length, in characters
+DISCORD_MESSAGE_LIMIT = 2000
+
+# Per-channel send budget: a burst of 5, refilled at one per second
+CHANNEL_BURST = 5
+CHANNEL_RATE = 1.0
+
+
+def split_message(text: str, limit: int = DISCORD_MESSAGE_LIMIT) -> list[str]:
+    """Split text into chunks of at most limit characters.
+
+    Splits between lines where possible; a single over-long line is split
+    at its last space before the limit, or hard at the limit.
+    """
+    chunks: list[str] = []
+    current = ''
+    for line in text.split('\n'):
+        while len(line) > limit:
+            cut = line.rfind(' ', 0, limit + 1)
+            if cut <= 0:
+                cut = limit
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(line[:cut])
+            line = line[cut:].lstrip(' ')
+
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = line
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+class _ChannelBucket:
+    """Token bucket for one channel; reserve() never blocks."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Take one send slot; returns seconds to wait before using it."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+@dataclass
+class _Pending:
+    """Text waiting to be sent, and the future its sender awaits."""
+
+    text: str
+    future: asyncio.Future[None]
+
+
+class Outbox:
+    """Per-channel send queues with chunking, coalescing and rate limiting.
+
+    Features:
+    - Messages never exceed Discord's 2000-character limit
+    - Texts queued for a channel while it is busy go out merged
+    - Per-channel token bucket applied before sending, not after a 429
+    - Order preserved within a channel; channels don't block each other
+    """
+
+    def __init__(
+        self,
+        limit: int = DISCORD_MESSAGE_LIMIT,
+        rate: float = CHANNEL_RATE,
+        burst: int = CHANNEL_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        """Initialize outbox.
+
+        Args:
+            limit: Maximum characters per Discord message
+            rate: Sends per second allowed per channel, sustained
+            burst: Sends allowed back to back per channel
+            clock: Monotonic clock (overridable for tests)
+            sleep: Async sleep (overridable for tests)
+        """
+        self.limit = limit
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.messages_sent = 0
+        self._queues: dict[Any, deque[_Pending]] = {}
+        self._buckets: dict[Any, _ChannelBucket] = {}
+        self._tasks: dict[Any, asyncio.Task[None]] = {}
+
+    async def send(self, channel: Any, text: str, wait: bool = True) -> None:
+        """Queue text for a channel (anything with an async send(str)).
+
+        Args:
+            channel: Discord channel, user or context to send to; users
+                     are resolved to their DM channel, so DMs to a user
+                     and replies in that DM share one queue
+            text: Message text of any length
+            wait: Return only once the text has been sent (errors are
+                  raised here); False returns right after queueing
+
+        Raises:
+            discord.HTTPException: If sending fails (only when wait=True)
+        """
+        if hasattr(channel, 'create_dm'):
+            # User or Member: its id is not the DM channel's id
+            channel = channel.dm_channel or await channel.create_dm()
+        key = getattr(channel, 'id', None) or id(channel)
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(_Pending(text, future))
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._drain(key, channel))
+
+        if wait:
+            await future
+        else:
+            # Nobody awaits this future; log instead of "exception never retrieved"
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def pending(self) -> int:
+        """Number of texts queued but not yet sent."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def _drain(self, key: Any, channel: Any) -> None:
+        """Send everything queued for one channel, merging as it goes."""
+        queue = self._queues[key]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _ChannelBucket(self.rate, self.burst, self.clock)
+
+        batch: list[_Pending] = []
+        try:
+            # Let sends issued in the same loop iteration join this batch
+            await asyncio.sleep(0)
+            while queue:
+                delay = bucket.reserve()
+                if delay:
+                    await self.sleep(delay)
+
+                # Everything queued by now goes out together
+                batch = list(queue)
+                queue.clear()
+                chunks = split_message("\n".join(p.text for p in batch), self.limit)
+                try:
+                    for index, chunk in enumerate(chunks):
+                        if index:
+                            delay = bucket.reserve()
+                            if delay:
+                                await self.sleep(delay)
+                        await channel.send(chunk)
+                        self.messages_sent += 1
+                except Exception as error:
+                    print(f"Discord send failed: {error}")
+                    for pending in batch:
+                        if not pending.future.done():
+                            pending.future.set_exception(error)
+                    continue
+
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_result(None)
+        finally:
+            # Cancelled (e.g. shutdown): don't leave senders waiting forever
+            for pending in [*batch, *queue]:
+                if not pending.future.done():
+                    pending.future.cancel()
+            del self._queues[key]
+            del self._tasks[key]
@@ -0,0 +1,401 @@
+"""Durable per-email status tracking with deadlines and snoozes.
+
+Each email the bot handles moves through new → summarized → drafted →
+awaiting_approval → sent, and can be snoozed along the way. EmailStatusStore
+enforces those transitions, keeps the current status per message in SQLite
+(indexed on status and update time) and logs every transition.
+
+Two things are time-driven. A message that waits on the user (summarized or
+awaiting approval) gets a response deadline, 24 hours by default, and a
+snoozed message has a wake-up time. Both sit in one in-memory min-heap, so
+"what has gone unanswered for a day" is a look at the top of the heap rather
+than a table scan, and a timer task sleeps until the earliest one instead
+of polling.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import sqlite3
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_status (
+    message_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    deadline REAL,
+    snooze_until REAL,
+    resume_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_email_status_status ON email_status(status, updated_at);
+CREATE TABLE IF NOT EXISTS status_transitions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    message_id TEXT NOT NULL,
+    from_status TEXT,
+    to_status TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_status_transitions_message ON status_transitions(message_id, seq);
+"""
+
+# How long a summary or draft may wait on the user before it counts as avoided
+RESPONSE_DEADLINE = 24 * 3600.0
+
+
+class EmailStatus(str, Enum):
+    """Where an email is in the bot's workflow."""
+
+    NEW = 'new'
+    SUMMARIZED = 'summarized'
+    DRAFTED = 'drafted'
+    AWAITING_APPROVAL = 'awaiting_approval'
+    SENT = 'sent'
+    SNOOZED = 'snoozed'
+
+
+# Allowed moves; SENT is final
+TRANSITIONS: dict[EmailStatus, frozenset[EmailStatus]] = {
+    EmailStatus.NEW: frozenset({
+        EmailStatus.SUMMARIZED, EmailStatus.DRAFTED, EmailStatus.SNOOZED, EmailStatus.SENT,
+    }),
+    EmailStatus.SUMMARIZED: frozenset({EmailStatus.DRAFTED, EmailStatus.SNOOZED, EmailStatus.SENT}),
+    EmailStatus.DRAFTED: frozenset({EmailStatus.AWAITING_APPROVAL, EmailStatus.SNOOZED}),
+    EmailStatus.AWAITING_APPROVAL: frozenset({EmailStatus.SENT, EmailStatus.DRAFTED, EmailStatus.SNOOZED}),
+    EmailStatus.SNOOZED: frozenset({
+        EmailStatus.NEW, EmailStatus.SUMMARIZED, EmailStatus.DRAFTED,
+        EmailStatus.AWAITING_APPROVAL, EmailStatus.SENT, EmailStatus.SNOOZED,
+    }),
+    EmailStatus.SENT: frozenset(),
+}
+
+# Statuses in which the user owes a response
+WAITING_STATUSES = frozenset({EmailStatus.SUMMARIZED, EmailStatus.AWAITING_APPROVAL})
+
+
+class InvalidTransition(ValueError):
+    """Raised when a status change is not allowed from the current status."""
+
+
+TimerFunc = Callable[[list[str]], Awaitable[None]]
+
+# Heap entry: (due, kind, message_id); kind is 'deadline' or 'snooze'
+_Timer = tuple[float, str, str]
+
+
+class EmailStatusStore:
+    """SQLite-backed email status state machine with deadline and snooze timers.
+
+    Features:
+    - Transitions validated against TRANSITIONS and logged
+    - WAL mode, index on (status, updated_at) for status listings
+    - Response deadlines and snooze wake-ups in one min-heap
+    - Timer task sleeps until the next due time; each timer fires once
+    - Snoozed messages wake up in the status they were snoozed from
+    """
+
+    def __init__(
+        self,
+        db_path: str = "status.db",
+        response_deadline: float = RESPONSE_DEADLINE,
+        on_overdue: TimerFunc | None = None,
+        on_wake: TimerFunc | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open (or create) the store and rebuild the timer heap.
+
+        Args:
+            db_path: SQLite database file (":memory:" for a throwaway store)
+            response_deadline: Seconds a waiting message may sit before it
+                               is reported as overdue
+            on_overdue: Coroutine called with message IDs whose response
+                        deadline passed
+            on_wake: Coroutine called with message IDs whose snooze ended
+            clock: Wall clock in epoch seconds (overridable for tests)
+        """
+        self.response_deadline = response_deadline
+        self.on_overdue = on_overdue
+        self.on_wake = on_wake
+        self.clock = clock
+
+        if db_path != ":memory:" and Path(db_path).parent != Path("."):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        # Live due time per (kind, message_id); heap entries not matching it are stale
+        self._timers: dict[tuple[str, str], float] = {}
+        self._heap: list[_Timer] = []
+        for row in self._conn.execute(
+            "SELECT message_id, deadline, snooze_until FROM email_status "
+            "WHERE deadline IS NOT NULL OR snooze_until IS NOT NULL"
+        ):
+            if row['deadline'] is not None:
+                self._timers[('deadline', row['message_id'])] = row['deadline']
+                self._heap.append((row['deadline'], 'deadline', row['message_id']))
+            if row['snooze_until'] is not None:
+                self._timers[('snooze', row['message_id'])] = row['snooze_until']
+                self._heap.append((row['snooze_until'], 'snooze', row['message_id']))
+        heapq.heapify(self._heap)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        # Loop running the timer task; transitions may come from other threads
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self, message_id: str) -> EmailStatus | None:
+        """Current status of a message, or None if not tracked."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM email_status WHERE message_id = ?", (message_id,)
+            ).fetchone()
+        return EmailStatus(row['status']) if row else None
+
+    def track(self, message_ids: Iterable[str]) -> int:
+        """Start tracking messages as NEW (already tracked ones are left alone).
+
+        Returns:
+            Number of messages newly tracked
+        """
+        now = self.clock()
+        added = 0
+        with self._lock, self._conn:
+            for message_id in message_ids:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO email_status (message_id, status, updated_at) VALUES (?, ?, ?)",
+                    (message_id, EmailStatus.NEW.value, now),
+                )
+                if cursor.rowcount:
+                    self._log(message_id, None, EmailStatus.NEW, now)
+                    added += 1
+        return added
+
+    def transition(self, message_id: str, status: EmailStatus) -> EmailStatus | None:
+        """Move a message to a new status.
+
+        Untracked messages are treated as NEW. Entering a waiting status
+        starts a response deadline; leaving it cancels the deadline.
+
+        Args:
+            message_id: Gmail message ID
+            status: Status to move to (use snooze() for SNOOZED)
+
+        Returns:
+            The previous status (None if the message was not tracked)
+
+        Raises:
+            InvalidTransition: If the move is not allowed
+        """
+        if status == EmailStatus.SNOOZED:
+            raise InvalidTransition("Use snooze() to snooze a message")
+        with self._lock, self._conn:
+            return self._transition(message_id, status, self.clock())
+
+    def snooze(self, message_id: str, until: float) -> EmailStatus | None:
+        """Snooze a message until an epoch time.
+
+        Its response deadline is suspended; at until it returns to the
+        status it had before (re-arming the deadline if that is a waiting
+        status) and on_wake is called.
+
+        Returns:
+            The previous status (None if the message was not tracked)
+
+        Raises:
+            InvalidTransition: If the message cannot be snoozed (e.g. sent)
+        """
+        with self._lock, self._conn:
+            previous = self._transition(message_id, EmailStatus.SNOOZED, self.clock(), snooze_until=until)
+        return previous
+
+    def waiting(self, older_than: float = 0.0) -> list[str]:
+        """Messages waiting on the user, unchanged for at least older_than seconds.
+
+        Answered from the (status, updated_at) index, oldest first.
+        """
+        cutoff = self.clock() - older_than
+        placeholders = ",".join("?" * len(WAITING_STATUSES))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT message_id FROM email_status WHERE status IN ({placeholders}) "
+                "AND updated_at <= ? ORDER BY updated_at",
+                [*(status.value for status in sorted(WAITING_STATUSES)), cutoff],
+            ).fetchall()
+        return [row['message_id'] for row in rows]
+
+    def with_status(self, status: EmailStatus, limit: int = 50) -> list[str]:
+        """Messages currently in a status, most recently updated first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message_id FROM email_status WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+                (status.value, limit),
+            ).fetchall()
+        return [row['message_id'] for row in rows]
+
+    def history(self, message_id: str) -> list[tuple[EmailStatus | None, EmailStatus, float]]:
+        """A message's transitions as (from, to, at), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT from_status, to_status, at FROM status_transitions WHERE message_id = ? ORDER BY seq",
+                (message_id,),
+            ).fetchall()
+        return [
+            (EmailStatus(row['from_status']) if row['from_status'] else None, EmailStatus(row['to_status']), row['at'])
+            for row in rows
+        ]
+
+    def next_due(self) -> float | None:
+        """Epoch seconds of the earliest live timer, or None if none."""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def fire_due(self, now: float | None = None) -> tuple[list[str], list[str]]:
+        """Handle every timer due by now.
+
+        Overdue messages have their deadline cleared (so each is reported
+        once); snoozed messages are woken.
+
+        Returns:
+            (overdue message IDs, woken message IDs)
+        """
+        now = self.clock() if now is None else now
+        overdue: list[str] = []
+        woken: list[str] = []
+        with self._lock, self._conn:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, kind, message_id = heapq.heappop(self._heap)
+                del self._timers[(kind, message_id)]
+                if kind == 'deadline':
+                    self._conn.execute(
+                        "UPDATE email_status SET deadline = NULL WHERE message_id = ?", (message_id,)
+                    )
+                    overdue.append(message_id)
+                else:
+                    row = self._conn.execute(
+                        "SELECT resume_status FROM email_status WHERE message_id = ?", (message_id,)
+                    ).fetchone()
+                    resume = EmailStatus(row['resume_status'] or EmailStatus.NEW.value)
+                    self._transition(message_id, resume, now)
+                    woken.append(message_id)
+        return overdue, woken
+
+    async def fire_and_notify(self) -> None:
+        """Fire due timers and pass the results to the callbacks."""
+        overdue, woken = self.fire_due()
+        for callback, message_ids in ((self.on_wake, woken), (self.on_overdue, overdue)):
+            if callback is None or not message_ids:
+                continue
+            try:
+                await callback(message_ids)
+            except Exception as error:
+                print(f"Email status callback failed: {error}")
+
+    def start(self) -> asyncio.Task[None]:
+        """Start the timer task on the running loop (no-op if running)."""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run(), name='email-status-timers')
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the timer task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Timer loop: sleep until the earliest due time or a wake-up."""
+        while True:
+            next_due = self.next_due()
+            timeout = None if next_due is None else max(0.0, next_due - self.clock())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.fire_and_notify()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _transition(
+        self,
+        message_id: str,
+        status: EmailStatus,
+        now: float,
+        snooze_until: float | None = None,
+    ) -> EmailStatus | None:
+        """Apply a transition. Caller holds the lock inside a transaction."""
+        row = self._conn.execute(
+            "SELECT status, resume_status FROM email_status WHERE message_id = ?", (message_id,)
+        ).fetchone()
+        previous = EmailStatus(row['status']) if row else None
+        current = previous or EmailStatus.NEW
+        if status not in TRANSITIONS[current]:
+            raise InvalidTransition(f"{message_id}: cannot go from {current.value} to {status.value}")
+
+        deadline = now + self.response_deadline if status in WAITING_STATUSES else None
+        resume = None
+        if status == EmailStatus.SNOOZED:
+            # Re-snoozing only moves the wake-up time
+            resume = row['resume_status'] if current == EmailStatus.SNOOZED else current.value
+        self._conn.execute(
+            "INSERT OR REPLACE INTO email_status "
+            "(message_id, status, updated_at, deadline, snooze_until, resume_status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (message_id, status.value, now, deadline, snooze_until, resume),
+        )
+        if previous is None:
+            self._log(message_id, None, EmailStatus.NEW, now)
+        self._log(message_id, current, status, now)
+
+        self._set_timer('deadline', message_id, deadline)
+        self._set_timer('snooze', message_id, snooze_until)
+        return previous
+
+    def _log(self, message_id: str, from_status: EmailStatus | None, to_status: EmailStatus, at: float) -> None:
+        """Append to the transition log."""
+        self._conn.execute(
+            "INSERT INTO status_transitions (message_id, from_status, to_status, at) VALUES (?, ?, ?, ?)",
+            (message_id, from_status.value if from_status else None, to_status.value, at),
+        )
+
+    def _set_timer(self, kind: str, message_id: str, due: float | None) -> None:
+        """Arm, move or cancel a timer (old heap entries go stale)."""
+        key = (kind, message_id)
+        if due is None:
+            self._timers.pop(key, None)
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        self._timers[key] = due
+        heapq.heappush(self._heap, (due, kind, message_id))
+        if earliest is None or due < earliest:
+            # Earliest due time moved forward: reschedule the sleeper
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._wake.set)
+            else:
+                self._wake.set()
+
+    def _drop_stale(self) -> None:
+        """Pop cancelled or rescheduled entries off the top of the heap."""
+        heap = self._heap
+        while heap and self._timers.get((heap[0][1], heap[0][2])) != heap[0][0]:
+            heapq.heappop(heap)
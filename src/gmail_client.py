@@ -4,13 +4,119 @@ Provides high-level interface for Gmail operations with automatic OAuth handling
 """
 from __future__ import annotations
 
-from typing import Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterator
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from src.config import Config
+from src.gmail_transport import HttpPool
+from src.message_body import BODY_CHAR_LIMIT, extract_body
+from src.message_cache import MessageCache
+from src.message_store import PARTICIPANT_HEADERS, STORE_HEADERS, MessageStore
+from src.request_scheduler import QUOTA_UNITS, DeadlineExceeded, RequestScheduler, is_retryable
 from src.token_manager import TokenManager
+from src.triage import TRIAGE_HEADERS
+
+# Gmail accepts at most 100 calls per batch request, but recommends staying at
+# or below 50 to avoid per-user rate limiting on the batched calls.
+BATCH_SIZE_LIMIT = 50
+
+# Largest page messages.list will return
+LIST_PAGE_LIMIT = 500
+
+# How long an inbox counters snapshot is served before asking Gmail again
+COUNTERS_TTL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which parts of a message to ask Gmail for.
+    
+    format and metadata_headers are messages.get parameters; fields is the
+    partial-response mask (None = every field), which trims the JSON Gmail
+    sends back and we have to parse and hold in memory.
+    """
+    
+    format: str = 'full'
+    metadata_headers: tuple[str, ...] | None = None
+    fields: str | None = None
+    
+    def params(self) -> dict[str, Any]:
+        """messages.get keyword arguments for this projection."""
+        params: dict[str, Any] = {'format': self.format}
+        if self.metadata_headers is not None:
+            params['metadataHeaders'] = list(self.metadata_headers)
+        if self.fields is not None:
+            params['fields'] = self.fields
+        return params
+
+
+# Everything a header-only view needs: no body, parts, sizes or historyId
+HEADER_FIELDS = 'id,threadId,labelIds,snippet,internalDate,payload/headers'
+
+# Named projections for get_message / get_messages_batch. 'summary' is
+# exactly what MessageStore keeps (From, Subject, Date, snippet, labels).
+PROJECTIONS = {
+    'summary': Projection('metadata', tuple(STORE_HEADERS), HEADER_FIELDS),
+    # To/Cc let the sender index count sent mail as replies
+    'triage': Projection(
+        'metadata',
+        tuple(dict.fromkeys([*STORE_HEADERS, *TRIAGE_HEADERS, *PARTICIPANT_HEADERS])),
+        HEADER_FIELDS,
+    ),
+    'thread': Projection(
+        'metadata',
+        tuple(dict.fromkeys([*STORE_HEADERS, *PARTICIPANT_HEADERS])),
+        HEADER_FIELDS,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class InboxCounters:
+    """Inbox totals as Gmail reports them on the INBOX label."""
+    
+    messages_total: int
+    messages_unread: int
+    threads_total: int
+    threads_unread: int
+    fetched_at: float  # time.monotonic() when fetched
+
+
+# Labels refresh for cached messages: no headers, no body
+LABELS_ONLY = Projection('minimal', fields='id,labelIds')
+
+
+def resolve_projection(
+    format: str,
+    metadata_headers: list[str] | None,
+    fields: str | None,
+    projection: str | None,
+) -> Projection:
+    """Build the Projection for a fetch, preferring a named preset.
+    
+    Raises:
+        ValueError: If projection is not a key of PROJECTIONS
+    """
+    if projection is not None:
+        try:
+            return PROJECTIONS[projection]
+        except KeyError:
+            raise ValueError(
+                f"Unknown projection {projection!r}, expected one of: {', '.join(PROJECTIONS)}"
+            )
+    headers = tuple(metadata_headers) if metadata_headers is not None else None
+    return Projection(format, headers, fields)
+
+
+def _includes_labels(view: Projection) -> bool:
+    """Check whether messages fetched with view carry labelIds."""
+    return view.fields is None or 'labelIds' in view.fields
 
 
 class GmailClient:
@@ -21,20 +127,42 @@ class GmailClient:
     - Automatic token refresh via TokenManager
     - Read-only operations for Phase 1
     - Error handling with clear logging
+    - Optional local MessageStore, filled from Gmail and used when it is down
+    - Pooled per-thread HTTP connections, so calls can run in parallel
+    - Every call paced by quota units and retried with backoff
+    - Optional MessageCache, so repeat fetches of a message cost no content download
     """
     
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        store: MessageStore | None = None,
+        cache: MessageCache | None = None,
+    ) -> None:
         """Initialize Gmail client with configuration.
         
         Args:
             config: Application configuration with Gmail paths
+            store: Local message metadata store (default: no local store)
+            cache: Cache for fetched messages (default: no cache)
         """
         self.config = config
+        self.store = store
+        self.cache = cache
         self.token_manager = TokenManager(
             credentials_path=config.gmail_credentials_path,
-            token_path=config.gmail_token_path
+            token_path=config.gmail_token_path,
+            refresh_margin=config.token_refresh_margin,
         )
         self._service: Any = None  # Lazy-loaded Gmail service
+        self._connect_lock = threading.Lock()
+        self.transport = HttpPool(
+            self.token_manager.get_credentials,
+            size=config.gmail_pool_size,
+        )
+        self.scheduler = RequestScheduler(units_per_second=config.gmail_quota_units_per_second)
+        self._counters: InboxCounters | None = None
+        self._counters_lock = threading.Lock()
     
     def _ensure_connected(self) -> None:
         """Ensure Gmail service is initialized and authenticated.
@@ -45,115 +173,656 @@ class GmailClient:
         if self._service is not None:
             return
         
-        # Get valid credentials (TokenManager handles refresh)
-        creds = self.token_manager.get_credentials()
+        with self._connect_lock:
+            if self._service is not None:
+                return
+            
+            # Get valid credentials (TokenManager handles refresh)
+            creds = self.token_manager.get_credentials()
+            
+            # Build Gmail service from the discovery document packaged with
+            # google-api-python-client, never fetching it over the network
+            self._service = build(
+                'gmail', 'v1',
+                credentials=creds,
+                static_discovery=True,
+                cache_discovery=False,
+            )
+            print("Gmail service initialized")
+    
+    def _execute(self, request: Any, method: str, units: int | None = None) -> Any:
+        """Execute an API request (or batch) through the request scheduler.
+        
+        Each attempt runs on a pooled connection; the service's own shared
+        Http is never used, so this is safe to call from several threads.
         
-        # Build Gmail service
-        self._service = build('gmail', 'v1', credentials=creds)
-        print("Gmail service initialized")
+        Args:
+            request: HttpRequest or BatchHttpRequest to execute
+            method: Gmail method name for quota accounting
+            units: Quota units (default: the method's standard cost)
+        """
+        def attempt() -> Any:
+            with self.transport.connection() as http:
+                return request.execute(http=http)
+        
+        return self.scheduler.execute(attempt, method, units=units)
     
-    def list_messages(self, max_results: int = 10, query: str = '') -> list[dict[str, Any]]:
+    def warm_up(self, probe: bool = True) -> None:
+        """Pay first-call costs up front instead of on the first user command.
+        
+        Loads (and if needed refreshes) credentials, builds the service and,
+        with probe=True, makes one cheap getProfile call so the HTTPS
+        connection to Gmail is already open.
+        
+        Args:
+            probe: Also make a getProfile call (1 quota unit)
+        """
+        self._ensure_connected()
+        if probe:
+            self.get_profile()
+        print("Gmail client warmed up")
+    
+    def is_connected(self) -> bool:
+        """Check whether the Gmail service has been initialized."""
+        return self._service is not None
+    
+    def list_messages(
+        self,
+        max_results: int = 10,
+        query: str = '',
+        fields: str | None = None,
+    ) -> list[dict[str, Any]]:
         """List messages from Gmail inbox.
         
+        Only the first page is returned; use iter_messages to walk every
+        matching message.
+        
         Args:
             max_results: Maximum number of messages to return (default: 10)
             query: Gmail query string for filtering (default: empty = all messages)
                    Examples: "is:unread", "from:accountant@example.com"
+            fields: Partial-response mask, e.g. 'messages/id' (default: all fields)
         
         Returns:
             List of message metadata dicts with 'id' and 'threadId'
             
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        messages = self.list_messages_page(query, max_results, fields=fields).get('messages', [])
+        print(f"Listed {len(messages)} messages")
+        return messages
+    
+    def list_messages_page(
+        self,
+        query: str = '',
+        page_size: int = 100,
+        page_token: str | None = None,
+        fields: str | None = None,
+    ) -> dict[str, Any]:
+        """Fetch one page of messages.list.
+        
+        Args:
+            query: Gmail query string for filtering (default: all messages)
+            page_size: Messages per page (capped at LIST_PAGE_LIMIT)
+            page_token: Token from a previous page's 'nextPageToken'
+            fields: Partial-response mask (default: all fields)
+        
+        Returns:
+            Raw response with 'messages' and, if more match, 'nextPageToken'
+            
         Raises:
             HttpError: If Gmail API call fails
         """
         self._ensure_connected()
         
+        params: dict[str, Any] = {
+            'userId': 'me',
+            'maxResults': min(page_size, LIST_PAGE_LIMIT),
+            'q': query,
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        if fields is not None:
+            params['fields'] = fields
+        
         try:
             # Call Gmail API to list messages
-            results = self._service.users().messages().list(
-                userId='me',
-                maxResults=max_results,
-                q=query
-            ).execute()
-            
-            messages = results.get('messages', [])
-            print(f"Listed {len(messages)} messages")
-            return messages
-            
+            return self._execute(self._service.users().messages().list(**params), 'messages.list')
         except HttpError as error:
             print(f"Gmail API error listing messages: {error}")
             raise
     
-    def get_message(self, message_id: str, format: str = 'full') -> dict[str, Any]:
+    def iter_messages(self, query: str = '', page_size: int = 100) -> Iterator[dict[str, Any]]:
+        """Yield every message matching query, following nextPageToken.
+        
+        While the caller works through one page, the next is already being
+        fetched in the background. At most two pages are held at a time, so
+        memory stays flat however many messages match. Stopping early (break,
+        islice, close()) cancels the prefetch.
+        
+        Args:
+            query: Gmail query string for filtering (default: all messages)
+            page_size: Messages per page (capped at LIST_PAGE_LIMIT)
+        
+        Yields:
+            Message metadata dicts with 'id' and 'threadId'
+            
+        Raises:
+            HttpError: If fetching any page fails
+        """
+        page_size = min(page_size, LIST_PAGE_LIMIT)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gmail-list')
+        pending: Future[dict[str, Any]] | None = executor.submit(self.list_messages_page, query, page_size)
+        
+        try:
+            while pending is not None:
+                page = pending.result()
+                page_token = page.get('nextPageToken')
+                pending = executor.submit(self.list_messages_page, query, page_size, page_token) if page_token else None
+                yield from page.get('messages', [])
+        finally:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+    
+    def get_message(
+        self,
+        message_id: str,
+        format: str = 'full',
+        metadata_headers: list[str] | None = None,
+        fields: str | None = None,
+        projection: str | None = None,
+    ) -> dict[str, Any]:
         """Get full message details from Gmail.
         
+        With a cache attached, content is downloaded once per message and
+        format; later calls only refetch labels, and only if they changed.
+        
         Args:
             message_id: Gmail message ID
             format: Message format (default: 'full')
                    Options: 'minimal', 'full', 'raw', 'metadata'
+            metadata_headers: Headers to include when format is 'metadata'
+                              (default: all headers)
+            fields: Partial-response mask, e.g. 'id,snippet' (default: all fields)
+            projection: Name of a preset in PROJECTIONS, e.g. 'summary'; replaces
+                        format, metadata_headers and fields
         
         Returns:
             Full message object with headers, body, labels, etc.
             
         Raises:
             HttpError: If Gmail API call fails
+            ValueError: If projection is not a known preset
         """
+        view = resolve_projection(format, metadata_headers, fields, projection)
+        
+        if self.cache is not None:
+            cached = self.cache.get(message_id, view.format, view.metadata_headers, view.fields)
+            if cached is not None:
+                if 'labelIds' not in cached and _includes_labels(view):
+                    self._refresh_labels([message_id])
+                    cached = self.cache.get(message_id, view.format, view.metadata_headers, view.fields) or cached
+                return cached
+        
         self._ensure_connected()
         
         try:
             # Call Gmail API to get message details
-            message = self._service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format=format
-            ).execute()
+            message = self._execute(
+                self._service.users().messages().get(userId='me', id=message_id, **view.params()),
+                'messages.get',
+            )
             
             print(f"Retrieved message {message_id}")
+            if self.cache is not None:
+                self.cache.put(message, view.format, view.metadata_headers, view.fields)
             return message
             
         except HttpError as error:
             print(f"Gmail API error getting message {message_id}: {error}")
             raise
     
-    def get_inbox_summary(self) -> dict[str, Any]:
+    def get_message_text(self, message_id: str, max_chars: int = BODY_CHAR_LIMIT) -> str:
+        """Get a message's readable body text (e.g. as summarizer input).
+        
+        Args:
+            message_id: Gmail message ID
+            max_chars: Cap on the returned text
+        
+        Returns:
+            Up to max_chars of plain text (HTML converted, attachments skipped)
+            
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        return extract_body(self.get_message(message_id, format='full'), max_chars)
+    
+    def get_thread(
+        self,
+        thread_id: str,
+        format: str = 'metadata',
+        metadata_headers: list[str] | None = None,
+        fields: str | None = None,
+        projection: str | None = 'thread',
+    ) -> dict[str, Any]:
+        """Get a whole conversation with one threads.get call.
+        
+        With a store attached, the thread's messages are stored and its
+        index entry (message IDs, historyId, participants) updated.
+        
+        Args:
+            thread_id: Gmail thread ID
+            format: Message format, used when projection is None
+            metadata_headers: Headers for 'metadata', used when projection is None
+            fields: Per-message partial-response mask, used when projection is None
+            projection: Preset in PROJECTIONS (default: 'thread' = store
+                        headers plus To/Cc); None to use the arguments above
+        
+        Returns:
+            Thread dict with 'id', 'historyId' and 'messages' (oldest first)
+            
+        Raises:
+            HttpError: If Gmail API call fails
+            ValueError: If projection is not a known preset
+        """
+        view = resolve_projection(format, metadata_headers, fields, projection)
+        params = view.params()
+        if view.fields is not None:
+            # The message mask applies inside the thread's messages list
+            params['fields'] = f"id,historyId,messages({view.fields})"
+        
+        self._ensure_connected()
+        
+        try:
+            thread = self._execute(
+                self._service.users().threads().get(userId='me', id=thread_id, **params),
+                'threads.get',
+            )
+        except HttpError as error:
+            print(f"Gmail API error getting thread {thread_id}: {error}")
+            raise
+        
+        print(f"Retrieved thread {thread_id} ({len(thread.get('messages', []))} messages)")
+        if self.cache is not None:
+            for message in thread.get('messages', []):
+                self.cache.put(message, view.format, view.metadata_headers, view.fields)
+        if self.store is not None:
+            self.store.upsert_thread(thread)
+        return thread
+    
+    def get_attachment(self, message_id: str, attachment_id: str) -> dict[str, Any]:
+        """Download one attachment's bytes.
+        
+        Use AttachmentStore rather than calling this directly; it decodes
+        the data to disk and keeps one copy per distinct file.
+        
+        Args:
+            message_id: Gmail message ID
+            attachment_id: 'body.attachmentId' of the attachment part
+        
+        Returns:
+            Dict with 'size' and base64url-encoded 'data'
+            
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        self._ensure_connected()
+        
+        try:
+            return self._execute(
+                self._service.users().messages().attachments().get(
+                    userId='me', messageId=message_id, id=attachment_id, fields='size,data',
+                ),
+                'messages.attachments.get',
+            )
+        except HttpError as error:
+            print(f"Gmail API error getting attachment of {message_id}: {error}")
+            raise
+    
+    def get_label(self, label_id: str) -> dict[str, Any]:
+        """Get a label with its message and thread counters.
+        
+        Args:
+            label_id: Label ID, e.g. 'INBOX' or 'UNREAD'
+        
+        Returns:
+            Label dict including 'messagesTotal', 'messagesUnread',
+            'threadsTotal' and 'threadsUnread'
+            
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        self._ensure_connected()
+        
+        try:
+            return self._execute(self._service.users().labels().get(userId='me', id=label_id), 'labels.get')
+        except HttpError as error:
+            print(f"Gmail API error getting label {label_id}: {error}")
+            raise
+    
+    def get_inbox_counters(self, max_age: float = COUNTERS_TTL_SECONDS) -> InboxCounters:
+        """Get inbox totals from a single labels.get call.
+        
+        Gmail keeps these counters itself, so they are exact for any mailbox
+        size and cost one quota unit. A snapshot younger than max_age is
+        returned without calling Gmail at all.
+        
+        Args:
+            max_age: Seconds a snapshot may be reused (0 = always refetch)
+        
+        Returns:
+            InboxCounters snapshot
+            
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        counters = self._counters
+        if counters is not None and time.monotonic() - counters.fetched_at < max_age:
+            return counters
+        
+        with self._counters_lock:
+            # Another thread may have refreshed while we waited
+            counters = self._counters
+            if counters is not None and time.monotonic() - counters.fetched_at < max_age:
+                return counters
+            
+            label = self.get_label('INBOX')
+            counters = InboxCounters(
+                messages_total=label.get('messagesTotal', 0),
+                messages_unread=label.get('messagesUnread', 0),
+                threads_total=label.get('threadsTotal', 0),
+                threads_unread=label.get('threadsUnread', 0),
+                fetched_at=time.monotonic(),
+            )
+            self._counters = counters
+            return counters
+    
+    def invalidate_counters(self) -> None:
+        """Drop the counters snapshot, e.g. after a sync saw changes."""
+        self._counters = None
+    
+    def get_profile(self) -> dict[str, Any]:
+        """Get the mailbox profile.
+        
+        Returns:
+            Profile dict with 'emailAddress', 'messagesTotal',
+            'threadsTotal' and the mailbox's current 'historyId'
+            
+        Raises:
+            HttpError: If Gmail API call fails
+        """
+        self._ensure_connected()
+        
+        try:
+            return self._execute(self._service.users().getProfile(userId='me'), 'getProfile')
+        except HttpError as error:
+            print(f"Gmail API error getting profile: {error}")
+            raise
+    
+    def list_history(
+        self,
+        start_history_id: str,
+        page_token: str | None = None,
+        label_id: str | None = None,
+        max_results: int = 500,
+    ) -> dict[str, Any]:
+        """List one page of mailbox changes since a history ID.
+        
+        Args:
+            start_history_id: History ID to list changes after
+            page_token: Token from a previous page's 'nextPageToken'
+            label_id: Only return changes for messages with this label
+            max_results: Maximum number of history records per page
+        
+        Returns:
+            Raw history.list response with 'history', 'historyId' and
+            optionally 'nextPageToken'
+            
+        Raises:
+            HttpError: If Gmail API call fails. Status 404 means the start
+                       history ID is too old and a full sync is required.
+        """
+        self._ensure_connected()
+        
+        params: dict[str, Any] = {
+            'userId': 'me',
+            'startHistoryId': start_history_id,
+            'maxResults': max_results,
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        if label_id:
+            params['labelId'] = label_id
+        
+        try:
+            return self._execute(self._service.users().history().list(**params), 'history.list')
+        except HttpError as error:
+            print(f"Gmail API error listing history: {error}")
+            raise
+    
+    def get_messages_batch(
+        self,
+        message_ids: list[str],
+        format: str = 'metadata',
+        metadata_headers: list[str] | None = None,
+        fields: str | None = None,
+        projection: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get several messages using the Gmail batch endpoint.
+        
+        IDs are split into chunks of BATCH_SIZE_LIMIT, so each chunk costs a
+        single HTTP round trip instead of one per message. Messages already
+        in the cache are not downloaded again.
+        
+        Args:
+            message_ids: Gmail message IDs to fetch
+            format: Message format (default: 'metadata')
+                   Options: 'minimal', 'full', 'raw', 'metadata'
+            metadata_headers: Headers to include when format is 'metadata'
+                              (default: all headers)
+            fields: Partial-response mask (default: all fields)
+            projection: Name of a preset in PROJECTIONS; replaces format,
+                        metadata_headers and fields
+        
+        Returns:
+            Message objects in the same order as message_ids (a repeated ID
+            repeats the same message). Messages that fail individually are
+            logged and left out, matching how get_inbox_summary skips
+            messages it cannot fetch.
+            
+        Raises:
+            HttpError: If a whole batch request fails
+            ValueError: If projection is not a known preset
+        """
+        view = resolve_projection(format, metadata_headers, fields, projection)
+        results: dict[str, dict[str, Any]] = {}
+        
+        if self.cache is not None:
+            for message_id in message_ids:
+                cached = self.cache.get(message_id, view.format, view.metadata_headers, view.fields)
+                if cached is not None:
+                    results[message_id] = cached
+            
+            stale = [i for i, message in results.items() if 'labelIds' not in message]
+            if stale and _includes_labels(view):
+                self._refresh_labels(stale)
+                for message_id in stale:
+                    results[message_id] = self.cache.get(
+                        message_id, view.format, view.metadata_headers, view.fields,
+                    ) or results[message_id]
+        
+        # Duplicate IDs are fetched once (batch request IDs must be unique)
+        missing = [message_id for message_id in dict.fromkeys(message_ids) if message_id not in results]
+        if missing:
+            fetched = self._fetch_batch(missing, view)
+            if self.cache is not None:
+                for message in fetched.values():
+                    self.cache.put(message, view.format, view.metadata_headers, view.fields)
+            results.update(fetched)
+        
+        print(f"Retrieved {len(results)}/{len(message_ids)} messages ({len(missing)} downloaded)")
+        return [results[message_id] for message_id in message_ids if message_id in results]
+    
+    def _refresh_labels(self, message_ids: list[str]) -> None:
+        """Fetch current labels for cached messages, without their content."""
+        assert self.cache is not None
+        for message_id, message in self._fetch_batch(message_ids, LABELS_ONLY).items():
+            self.cache.set_labels(message_id, message.get('labelIds', []))
+    
+    def _fetch_batch(self, message_ids: list[str], view: Projection) -> dict[str, dict[str, Any]]:
+        """Download messages via batch requests, retrying throttled items.
+        
+        Returns:
+            Messages keyed by ID (failed messages are logged and omitted)
+        """
+        self._ensure_connected()
+        
+        results: dict[str, dict[str, Any]] = {}
+        messages = self._service.users().messages()
+        params = view.params()
+        pending = list(dict.fromkeys(message_ids))
+        attempt = 0
+        
+        while pending:
+            # Items throttled inside a batch are retried in a later round
+            retry: list[str] = []
+            
+            def on_response(request_id: str, response: Any, exception: Exception | None) -> None:
+                if exception is None:
+                    results[request_id] = response
+                elif (
+                    isinstance(exception, HttpError)
+                    and is_retryable(exception)
+                    and attempt < self.scheduler.max_retries
+                ):
+                    retry.append(request_id)
+                else:
+                    print(f"Error getting message {request_id}: {exception}")
+            
+            for start in range(0, len(pending), BATCH_SIZE_LIMIT):
+                chunk = pending[start:start + BATCH_SIZE_LIMIT]
+                batch = self._service.new_batch_http_request(callback=on_response)
+                for message_id in chunk:
+                    batch.add(messages.get(userId='me', id=message_id, **params), request_id=message_id)
+                
+                try:
+                    self._execute(batch, 'messages.get', units=QUOTA_UNITS['messages.get'] * len(chunk))
+                except HttpError as error:
+                    print(f"Gmail API error in batch get: {error}")
+                    raise
+            
+            if retry:
+                delay = self.scheduler.backoff_delay(attempt)
+                print(f"Retrying {len(retry)} throttled batch items in {delay:.1f}s")
+                self.scheduler.sleep(delay)
+                attempt += 1
+            pending = retry
+        
+        return results
+    
+    def get_messages_parallel(
+        self,
+        message_ids: list[str],
+        format: str = 'full',
+    ) -> list[dict[str, Any]]:
+        """Get several messages with concurrent get_message calls.
+        
+        Each worker uses its own pooled connection. Prefer get_messages_batch
+        for small metadata fetches; this suits large 'full'/'raw' fetches
+        where one batch response would be huge.
+        
+        Args:
+            message_ids: Gmail message IDs to fetch
+            format: Message format (default: 'full')
+        
+        Returns:
+            Message objects in the same order as message_ids. Messages that
+            fail individually are logged and left out.
+        """
+        self._ensure_connected()
+        
+        def fetch(message_id: str) -> dict[str, Any] | None:
+            try:
+                return self.get_message(message_id, format=format)
+            except HttpError:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=self.transport.size) as executor:
+            results = list(executor.map(fetch, message_ids))
+        return [message for message in results if message is not None]
+    
+    def get_inbox_summary(self, max_results: int = 5, cached: bool = False) -> dict[str, Any]:
         """Get inbox summary for testing connection.
         
+        With a store attached, only messages not stored yet are fetched from
+        Gmail, and the summary is served from the store if Gmail is down.
+        
+        Args:
+            max_results: Number of recent messages to include (default: 5)
+            cached: Answer from the store without any Gmail call when it
+                    has inbox messages (default: False)
+        
         Returns:
             Dict with message count and basic info about recent messages
         """
-        self._ensure_connected()
+        if cached and self.store is not None and self.store.count_messages('INBOX'):
+            return self._summary_from_store(self.store.recent_messages(max_results))
         
         try:
             # Get recent messages
-            messages = self.list_messages(max_results=5)
+            messages = self.list_messages(max_results=max_results)
+            message_ids = [msg_meta['id'] for msg_meta in messages]
+            
+            if self.store is not None:
+                # Fill the store with whatever it has not seen yet
+                missing = self.store.missing_ids(message_ids)
+                if missing:
+                    self.store.upsert_messages(self.get_messages_batch(
+                        missing,
+                        projection='summary',
+                    ))
+                return self._summary_from_store(self.store.get_messages(message_ids))
             
             summary = {
                 'message_count': len(messages),
                 'messages': []
             }
             
-            # Get basic info for each message
-            for msg_meta in messages:
-                try:
-                    msg = self.get_message(msg_meta['id'], format='metadata')
-                    
-                    # Extract subject and from headers
-                    headers = msg.get('payload', {}).get('headers', [])
-                    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                    from_addr = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                    
-                    summary['messages'].append({
-                        'id': msg['id'],
-                        'subject': subject,
-                        'from': from_addr
-                    })
-                except HttpError as error:
-                    print(f"Error getting message {msg_meta['id']}: {error}")
-                    # Continue with other messages
-                    continue
+            # Get basic info for all messages in one batch round trip
+            fetched = self.get_messages_batch(
+                message_ids,
+                projection='summary',
+            )
+            
+            for msg in fetched:
+                # Extract subject and from headers
+                headers = msg.get('payload', {}).get('headers', [])
+                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
+                from_addr = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
+                
+                summary['messages'].append({
+                    'id': msg['id'],
+                    'subject': subject,
+                    'from': from_addr
+                })
             
             return summary
             
-        except HttpError as error:
+        except (HttpError, DeadlineExceeded) as error:
             print(f"Gmail API error getting inbox summary: {error}")
+            if self.store is not None and self.store.count_messages('INBOX'):
+                print("Serving inbox summary from local store")
+                return self._summary_from_store(self.store.recent_messages(max_results))
             raise
+    
+    def _summary_from_store(self, rows: list[dict[str, Any]]) -> dict[str, Any]:
+        """Build an inbox summary dict from stored message rows."""
+        return {
+            'message_count': len(rows),
+            'messages': [
+                {'id': row['id'], 'subject': row['subject'], 'from': row['from']}
+                for row in rows
+            ],
+        }
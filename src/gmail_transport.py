@@ -0,0 +1,95 @@
+"""Pooled, thread-safe HTTP transport for Gmail API requests.
+
+httplib2.Http objects are not thread-safe, so a googleapiclient service that
+shares one cannot run requests from several threads at once. HttpPool hands
+each worker its own authorized Http for the duration of a request and takes it
+back afterwards. Connections stay open between requests (httplib2 keep-alive),
+so parallel fetches reuse TLS sessions instead of handshaking every time.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_HTTP_TIMEOUT = 30.0
+
+
+class HttpPool:
+    """Bounded pool of authorized httplib2 connections.
+
+    Features:
+    - At most `size` connections, created lazily on demand
+    - Each connection is used by one thread at a time
+    - Most recently used connection is handed out first, so warm
+      (already connected) sockets are preferred
+    """
+
+    def __init__(
+        self,
+        credentials: Callable[[], Credentials],
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_HTTP_TIMEOUT,
+    ) -> None:
+        """Initialize connection pool.
+
+        Args:
+            credentials: Returns current credentials (e.g. TokenManager.get_credentials)
+            size: Maximum number of connections
+            timeout: Socket timeout per request, in seconds
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got: {size}")
+        self.credentials = credentials
+        self.size = size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[AuthorizedHttp] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[AuthorizedHttp]:
+        """Borrow a connection for one request, blocking if all are busy."""
+        http = self._checkout()
+        try:
+            yield http
+        finally:
+            self._idle.put(http)
+
+    def _checkout(self) -> AuthorizedHttp:
+        """Take an idle connection, create one if under size, or wait."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                return AuthorizedHttp(self.credentials(), http=httplib2.Http(timeout=self.timeout))
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            http.close()
+            with self._lock:
+                self._created -= 1
@@ -0,0 +1,248 @@
+"""Readable-text extraction from Gmail message payloads.
+
+Summaries only need the first few kilobytes of a message's text, but
+financial emails are often multipart/alternative HTML with inline images and
+PDF statements attached. extract_body() picks one text part, decodes only as
+much of it as the output cap can use, and turns HTML into text in a single
+parser pass, so a 5 MB statement costs about as much as a short note. HTML is
+decoded in chunks until enough visible text is collected, so a bulky <head>
+or inline stylesheet cannot use up the budget before the body starts.
+"""
+from __future__ import annotations
+
+import base64
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Iterable, Iterator
+
+# Default cap on returned text, in characters
+BODY_CHAR_LIMIT = 4000
+
+# HTML is decoded in chunks of this many bytes until enough text is found...
+HTML_CHUNK_BYTES = 16 * 1024
+
+# ...but never more than this, however little of it is visible text
+HTML_BYTE_LIMIT = 1024 * 1024
+
+# Tags whose content is never readable text
+_SKIPPED_TAGS = {'script', 'style', 'head', 'title', 'noscript', 'template'}
+
+# Tags that start a new line in the text output
+_BLOCK_TAGS = {
+    'address', 'article', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p', 'pre',
+    'section', 'table', 'tr', 'ul',
+}
+
+_SPACES = re.compile(r'[ \t\r\f\v\u00a0]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+def find_text_part(payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Pick the part holding the message's readable text.
+
+    Walks payload.parts depth-first in document order. The first text/plain
+    part wins; otherwise the first text/html part. Attachments (parts with a
+    filename) are never chosen.
+
+    Args:
+        payload: Message 'payload' from a format='full' fetch
+
+    Returns:
+        The chosen part, or None if the message has no inline text
+    """
+    html_part = None
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get('parts')
+        if children:
+            # Reversed so the first child is visited first
+            stack.extend(reversed(children))
+            continue
+        if part.get('filename'):
+            continue
+        mime_type = part.get('mimeType', '').lower()
+        if mime_type == 'text/plain':
+            return part
+        if mime_type == 'text/html' and html_part is None:
+            html_part = part
+    return html_part
+
+
+def part_charset(part: dict[str, Any]) -> str:
+    """Charset from a part's Content-Type header (default utf-8)."""
+    for header in part.get('headers', []):
+        if header.get('name', '').lower() == 'content-type':
+            match = re.search(r'charset="?([\w.:-]+)"?', header.get('value', ''), re.IGNORECASE)
+            if match:
+                return match.group(1)
+    return 'utf-8'
+
+
+def decode_part(part: dict[str, Any], max_bytes: int | None = None) -> bytes:
+    """Base64url-decode a part's inline body, stopping after max_bytes.
+
+    Only the prefix of the encoded data needed for max_bytes is decoded
+    (every 4 encoded characters make 3 bytes), never the whole body.
+
+    Args:
+        part: Message part with 'body.data'
+        max_bytes: Most bytes to return (default: all)
+
+    Returns:
+        Decoded bytes (empty if the body is not inline, e.g. attachments)
+    """
+    data = part.get('body', {}).get('data', '')
+    if max_bytes is not None:
+        data = data[:(max_bytes + 2) // 3 * 4]
+    # Gmail strips padding; restore it for the decoder
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))[:max_bytes]
+
+
+def iter_part_bytes(
+    part: dict[str, Any], chunk_bytes: int, max_bytes: int | None = None
+) -> Iterator[bytes]:
+    """Base64url-decode a part's inline body chunk by chunk.
+
+    Args:
+        part: Message part with 'body.data'
+        chunk_bytes: Decoded bytes per chunk (rounded up to a multiple of 3)
+        max_bytes: Stop after this many decoded bytes (default: all)
+
+    Yields:
+        Decoded chunks, in order
+    """
+    data = part.get('body', {}).get('data', '')
+    if max_bytes is not None:
+        data = data[:(max_bytes + 2) // 3 * 4]
+    # 4 encoded characters make 3 bytes, so slices on that boundary decode alone
+    step = (chunk_bytes + 2) // 3 * 4
+    for start in range(0, len(data), step):
+        piece = data[start:start + step]
+        yield base64.urlsafe_b64decode(piece + '=' * (-len(piece) % 4))
+
+
+class _HtmlText(HTMLParser):
+    """Single-pass HTML to text converter that stops at a character limit."""
+
+    def __init__(self, max_chars: int) -> None:
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.chunks: list[str] = []
+        self.length = 0
+        self._skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def _emit(self, text: str) -> None:
+        if not self.full:
+            self.chunks.append(text)
+            self.length += len(text)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._emit('\n')
+        elif tag == 'td':
+            self._emit(' ')
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _BLOCK_TAGS:
+            self._emit('\n')
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._emit('\n')
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._emit(data)
+
+
+def html_to_text(html: str | Iterable[str], max_chars: int = BODY_CHAR_LIMIT) -> str:
+    """Convert HTML to plain text in one pass, keeping at most max_chars.
+
+    Scripts, styles and the document head are dropped; block elements become
+    line breaks; entities are decoded. html may be a string or an iterable
+    of pieces; pieces after max_chars of text are never consumed.
+    """
+    if isinstance(html, str):
+        # Feed in slices so parsing stops soon after enough text is collected
+        text = html
+        pieces: Iterable[str] = (
+            text[start:start + HTML_CHUNK_BYTES] for start in range(0, len(text), HTML_CHUNK_BYTES)
+        )
+    else:
+        pieces = html
+
+    parser = _HtmlText(max_chars)
+    for piece in pieces:
+        parser.feed(piece)
+        if parser.full:
+            break
+    else:
+        parser.close()
+    return ''.join(parser.chunks)
+
+
+def _html_part_text(part: dict[str, Any], max_chars: int) -> str:
+    """Convert an HTML part to text, decoding only until max_chars are found.
+
+    Skipped markup (head, styles, scripts) does not count towards max_chars;
+    HTML_BYTE_LIMIT bounds the work for parts that are almost all markup.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(part_charset(part))(errors='replace')
+    except LookupError:
+        # Unknown charset name; UTF-8 is the best guess
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def pieces() -> Iterator[str]:
+        for chunk in iter_part_bytes(part, HTML_CHUNK_BYTES, HTML_BYTE_LIMIT):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+
+    return html_to_text(pieces(), max_chars)
+
+
+def _tidy(text: str, max_chars: int) -> str:
+    """Collapse runs of spaces and blank lines, then apply the cap."""
+    text = _SPACES.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    text = _BLANK_LINES.sub('\n\n', text).strip()
+    return text[:max_chars]
+
+
+def extract_body(message: dict[str, Any], max_chars: int = BODY_CHAR_LIMIT) -> str:
+    """Get up to max_chars of readable text from a message.
+
+    Args:
+        message: Message from a format='full' fetch
+        max_chars: Cap on the returned text
+
+    Returns:
+        Plain text of the message body, or its snippet if it has no inline
+        text part
+    """
+    part = find_text_part(message.get('payload', {}))
+    if part is None:
+        return message.get('snippet', '')
+
+    if part.get('mimeType', '').lower() == 'text/html':
+        text = _html_part_text(part, max_chars * 2)
+    else:
+        # UTF-8 uses up to 4 bytes per character
+        raw = decode_part(part, max_chars * 4)
+        try:
+            text = raw.decode(part_charset(part), errors='replace')
+        except LookupError:
+            # Unknown charset name; UTF-8 is the best guess
+            text = raw.decode('utf-8', errors='replace')
+    return _tidy(text, max_chars) or message.get('snippet', '')
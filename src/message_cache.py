@@ -0,0 +1,271 @@
+"""Bounded cache for Gmail message fetches.
+
+A Gmail message's content never changes once stored under its ID, so a
+fetched message can be reused until it is deleted. Only its labels (read,
+archived, starred, ...) change, and those are tracked separately so a label
+change invalidates the labels alone, never the content.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+# Default memory budget; small enough for the bot's 512 MB container
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Default budget for the on-disk tier
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+CacheKey = tuple[str, str, tuple[str, ...], str]
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a MessageCache."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+def make_key(
+    message_id: str,
+    format: str,
+    metadata_headers: Sequence[str] | None,
+    fields: str | None = None,
+) -> CacheKey:
+    """Build a cache key; the header projection only matters for 'metadata'."""
+    if format != 'metadata' or metadata_headers is None:
+        headers: tuple[str, ...] = ()
+    else:
+        headers = tuple(sorted(h.lower() for h in metadata_headers))
+    return (message_id, format, headers, fields or '')
+
+
+class MessageCache:
+    """Two-tier cache for immutable message content plus mutable labels.
+
+    Features:
+    - In-memory LRU bounded by serialized size (max_bytes)
+    - Optional on-disk tier that survives restarts, LRU-bounded by max_disk_bytes
+    - Labels kept apart from content; invalidate_labels() drops labels only
+    - Labels live only as long as the message's content is in memory
+    - Entries stored as JSON bytes, so callers can't mutate cached state
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        disk_dir: str | None = None,
+        max_disk_bytes: int = DEFAULT_DISK_BYTES,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            max_bytes: Memory budget for cached content, in bytes
+            disk_dir: Directory for the on-disk tier (None = memory only)
+            max_disk_bytes: Budget for the on-disk tier, in bytes
+        """
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self.stats = CacheStats()
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._keys_by_id: dict[str, set[CacheKey]] = {}
+        self._labels: dict[str, tuple[str, ...]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Disk tier files by name -> size, least recently used first
+        self._disk_files: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes of content currently held in memory."""
+        return self._bytes
+
+    def get(
+        self,
+        message_id: str,
+        format: str,
+        metadata_headers: Sequence[str] | None = None,
+        fields: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Look up a cached message.
+
+        Returns:
+            The message, with 'labelIds' only if its labels are known to be
+            current (see has_labels), or None on a miss
+        """
+        key = make_key(message_id, format, metadata_headers, fields)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+            labels = self._labels.get(message_id)
+
+        if data is None:
+            data = self._read_disk(key)
+            if data is None:
+                with self._lock:
+                    self.stats.misses += 1
+                return None
+            with self._lock:
+                self.stats.disk_hits += 1
+                self._insert(key, data)
+
+        message = json.loads(data)
+        if labels is not None:
+            message['labelIds'] = list(labels)
+        return message
+
+    def has_labels(self, message_id: str) -> bool:
+        """Check whether a message's labels are cached and current."""
+        return message_id in self._labels
+
+    def put(
+        self,
+        message: dict[str, Any],
+        format: str,
+        metadata_headers: Sequence[str] | None = None,
+        fields: str | None = None,
+    ) -> None:
+        """Cache a freshly fetched message (content and labels)."""
+        message_id = message['id']
+        content = {k: v for k, v in message.items() if k != 'labelIds'}
+        data = json.dumps(content, separators=(',', ':')).encode()
+        key = make_key(message_id, format, metadata_headers, fields)
+
+        with self._lock:
+            self._insert(key, data)
+            # Labels are only worth keeping alongside in-memory content
+            if 'labelIds' in message and message_id in self._keys_by_id:
+                self._labels[message_id] = tuple(message['labelIds'])
+        self._write_disk(key, data)
+
+    def set_labels(self, message_id: str, labels: Iterable[str]) -> None:
+        """Record current labels for a message whose content is in memory."""
+        with self._lock:
+            if message_id in self._keys_by_id:
+                self._labels[message_id] = tuple(labels)
+
+    def invalidate_labels(self, message_ids: Iterable[str]) -> None:
+        """Forget labels for messages whose labels changed; content stays cached."""
+        with self._lock:
+            for message_id in message_ids:
+                self._labels.pop(message_id, None)
+
+    def remove(self, message_ids: Iterable[str]) -> None:
+        """Drop deleted messages entirely (all formats, memory and disk)."""
+        for message_id in message_ids:
+            with self._lock:
+                self._labels.pop(message_id, None)
+                keys = self._keys_by_id.pop(message_id, set())
+                for key in keys:
+                    self._bytes -= len(self._entries.pop(key))
+            if self.disk_dir is not None:
+                for path in self.disk_dir.glob(f"{message_id}.*.json"):
+                    path.unlink(missing_ok=True)
+                    with self._lock:
+                        self._disk_bytes -= self._disk_files.pop(path.name, 0)
+
+    def _insert(self, key: CacheKey, data: bytes) -> None:
+        """Add to the memory tier, evicting LRU entries. Caller holds the lock."""
+        # Very large messages would flush everything else; leave them to disk
+        if len(data) > self.max_bytes // 8:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = data
+        self._keys_by_id.setdefault(key[0], set()).add(key)
+        self._bytes += len(data)
+
+        while self._bytes > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats.evictions += 1
+            keys = self._keys_by_id.get(evicted_key[0])
+            if keys is not None:
+                keys.discard(evicted_key)
+                if not keys:
+                    # Last copy gone: its labels go too (refetched on next use)
+                    del self._keys_by_id[evicted_key[0]]
+                    self._labels.pop(evicted_key[0], None)
+
+    def _load_disk_index(self) -> None:
+        """Index existing disk tier files, oldest first, and enforce the budget."""
+        assert self.disk_dir is not None
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._disk_files[name] = size
+            self._disk_bytes += size
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete least recently used disk files until within budget."""
+        assert self.disk_dir is not None
+        while self._disk_bytes > self.max_disk_bytes and self._disk_files:
+            name, size = self._disk_files.popitem(last=False)
+            self._disk_bytes -= size
+            (self.disk_dir / name).unlink(missing_ok=True)
+
+    def _disk_path(self, key: CacheKey) -> Path:
+        """File for a key in the disk tier."""
+        assert self.disk_dir is not None
+        projection = hashlib.sha1(f"{','.join(key[2])}|{key[3]}".encode()).hexdigest()[:12]
+        return self.disk_dir / f"{key[0]}.{key[1]}.{projection}.json"
+
+    def _read_disk(self, key: CacheKey) -> bytes | None:
+        """Read an entry from the disk tier, if enabled and present."""
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        with self._lock:
+            if path.name in self._disk_files:
+                self._disk_files.move_to_end(path.name)
+            else:
+                # Written after our startup scan (e.g. by another process)
+                self._disk_files[path.name] = len(data)
+                self._disk_bytes += len(data)
+                self._prune_disk()
+        return data
+
+    def _write_disk(self, key: CacheKey, data: bytes) -> None:
+        """Write an entry to the disk tier atomically."""
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_name(path.name + '.tmp')
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as error:
+            print(f"Message cache disk write failed: {error}")
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk_files.pop(path.name, 0)
+            self._disk_files[path.name] = len(data)
+            self._prune_disk()
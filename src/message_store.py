@@ -0,0 +1,318 @@
+"""Local SQLite store for Gmail message metadata.
+
+Keeps just enough about each message (IDs, From, Subject, Date, labels,
+snippet) to answer summary and status queries without a Gmail round trip,
+and to keep answering them while Gmail is unreachable. Threads are indexed
+too (message IDs, latest historyId, participants), so per-conversation flows
+know what a thread holds without fetching it.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from email.utils import getaddresses, parseaddr
+from pathlib import Path
+from typing import Any, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    from_header TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    snippet TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL REFERENCES messages(id) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    PRIMARY KEY (message_id, label)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(sender, date);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages(date);
+CREATE INDEX IF NOT EXISTS idx_message_labels_label ON message_labels(label, message_id);
+CREATE TABLE IF NOT EXISTS threads (
+    id TEXT PRIMARY KEY,
+    history_id TEXT NOT NULL,
+    message_ids TEXT NOT NULL,
+    last_date INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thread_participants (
+    thread_id TEXT NOT NULL REFERENCES threads(id) ON DELETE CASCADE,
+    address TEXT NOT NULL,
+    PRIMARY KEY (thread_id, address)
+);
+CREATE INDEX IF NOT EXISTS idx_thread_participants_address ON thread_participants(address, thread_id);
+"""
+
+# Headers the store needs from a format='metadata' fetch
+STORE_HEADERS = ['From', 'Subject', 'Date']
+
+# Headers whose addresses count as thread participants
+PARTICIPANT_HEADERS = ['From', 'To', 'Cc']
+
+
+def _header(message: dict[str, Any], name: str, default: str) -> str:
+    """Get a header value from a Gmail message resource."""
+    for header in message.get('payload', {}).get('headers', []):
+        if header['name'].lower() == name.lower():
+            return header['value']
+    return default
+
+
+class MessageStore:
+    """SQLite-backed message metadata store.
+
+    Features:
+    - WAL mode, so reads never wait on the sync writer
+    - Indexes on sender, date and label for the common queries
+    - Safe to share between the event loop and Gmail worker threads
+    """
+
+    def __init__(self, db_path: str = "messages.db") -> None:
+        """Open (or create) the store.
+
+        Args:
+            db_path: SQLite database file (":memory:" for a throwaway store)
+        """
+        self.db_path = db_path
+        if db_path != ":memory:" and Path(db_path).parent != Path("."):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def upsert_messages(self, messages: Iterable[dict[str, Any]]) -> int:
+        """Insert or update messages from Gmail message resources.
+
+        Args:
+            messages: Messages fetched with format='metadata' (or 'full')
+
+        Returns:
+            Number of messages written
+        """
+        rows = []
+        labels = []
+        for message in messages:
+            from_header = _header(message, 'From', 'Unknown')
+            rows.append((
+                message['id'],
+                message.get('threadId', ''),
+                parseaddr(from_header)[1].lower(),
+                from_header,
+                _header(message, 'Subject', 'No Subject'),
+                int(message.get('internalDate', 0)),
+                message.get('snippet', ''),
+            ))
+            labels.extend((message['id'], label) for label in message.get('labelIds', []))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages "
+                "(id, thread_id, sender, from_header, subject, date, snippet) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "DELETE FROM message_labels WHERE message_id = ?",
+                [(row[0],) for row in rows],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO message_labels (message_id, label) VALUES (?, ?)",
+                labels,
+            )
+        return len(rows)
+
+    def delete_messages(self, message_ids: Iterable[str]) -> None:
+        """Remove messages (and their labels) from the store."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM messages WHERE id = ?",
+                [(message_id,) for message_id in message_ids],
+            )
+
+    def add_labels(self, message_id: str, labels: Iterable[str]) -> None:
+        """Add labels to a stored message (ignored if not stored)."""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone():
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO message_labels (message_id, label) VALUES (?, ?)",
+                    [(message_id, label) for label in labels],
+                )
+
+    def remove_labels(self, message_id: str, labels: Iterable[str]) -> None:
+        """Remove labels from a stored message."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM message_labels WHERE message_id = ? AND label = ?",
+                [(message_id, label) for label in labels],
+            )
+
+    def missing_ids(self, message_ids: Iterable[str]) -> list[str]:
+        """Return the IDs that are not in the store yet, in input order."""
+        message_ids = list(message_ids)
+        stored = {row['id'] for row in self._select_ids(message_ids)}
+        return [message_id for message_id in message_ids if message_id not in stored]
+
+    def get_messages(self, message_ids: Iterable[str]) -> list[dict[str, Any]]:
+        """Get stored messages by ID, in input order (unknown IDs are skipped)."""
+        message_ids = list(message_ids)
+        by_id = {row['id']: row for row in self._select_ids(message_ids)}
+        return self._to_dicts([by_id[i] for i in message_ids if i in by_id])
+
+    def recent_messages(self, limit: int = 5, label: str | None = 'INBOX') -> list[dict[str, Any]]:
+        """Get the newest stored messages, optionally restricted to one label."""
+        if label is None:
+            sql = "SELECT * FROM messages ORDER BY date DESC LIMIT ?"
+            params: tuple[Any, ...] = (limit,)
+        else:
+            sql = (
+                "SELECT m.* FROM messages m "
+                "JOIN message_labels l ON l.message_id = m.id "
+                "WHERE l.label = ? ORDER BY m.date DESC LIMIT ?"
+            )
+            params = (label, limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return self._to_dicts(rows)
+
+    def messages_from(self, sender: str, limit: int = 50) -> list[dict[str, Any]]:
+        """Get the newest stored messages from one sender address."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM messages WHERE sender = ? ORDER BY date DESC LIMIT ?",
+                (sender.lower(), limit),
+            ).fetchall()
+        return self._to_dicts(rows)
+
+    def count_messages(self, label: str | None = 'INBOX') -> int:
+        """Count stored messages, optionally restricted to one label."""
+        with self._lock:
+            if label is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM message_labels WHERE label = ?", (label,)
+                ).fetchone()
+        return row[0]
+
+    def upsert_thread(self, thread: dict[str, Any]) -> None:
+        """Store a thread's messages and update its index entry.
+
+        Args:
+            thread: threads.get response (any format with message headers)
+        """
+        messages = thread.get('messages', [])
+        self.upsert_messages(messages)
+
+        participants = set()
+        for message in messages:
+            for name in PARTICIPANT_HEADERS:
+                value = _header(message, name, '')
+                participants.update(
+                    address.lower() for _, address in getaddresses([value]) if address
+                )
+        last_date = max((int(m.get('internalDate', 0)) for m in messages), default=0)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (id, history_id, message_ids, last_date) "
+                "VALUES (?, ?, ?, ?)",
+                (thread['id'], str(thread.get('historyId', '')),
+                 json.dumps([m['id'] for m in messages]), last_date),
+            )
+            self._conn.execute("DELETE FROM thread_participants WHERE thread_id = ?", (thread['id'],))
+            self._conn.executemany(
+                "INSERT INTO thread_participants (thread_id, address) VALUES (?, ?)",
+                [(thread['id'], address) for address in sorted(participants)],
+            )
+
+    def get_thread(self, thread_id: str) -> dict[str, Any] | None:
+        """Get a thread's index entry.
+
+        Returns:
+            Dict with id, history_id, message_ids (oldest first),
+            participants and last_date, or None if not indexed
+        """
+        threads = self._thread_dicts("SELECT * FROM threads WHERE id = ?", (thread_id,))
+        return threads[0] if threads else None
+
+    def threads_with(self, address: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Get indexed threads involving an address, most recent first."""
+        return self._thread_dicts(
+            "SELECT t.* FROM threads t "
+            "JOIN thread_participants p ON p.thread_id = t.id "
+            "WHERE p.address = ? ORDER BY t.last_date DESC LIMIT ?",
+            (address.lower(), limit),
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _select_ids(self, message_ids: list[str]) -> list[sqlite3.Row]:
+        """Fetch message rows for a list of IDs."""
+        if not message_ids:
+            return []
+        placeholders = ",".join("?" * len(message_ids))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT * FROM messages WHERE id IN ({placeholders})", message_ids
+            ).fetchall()
+
+    def _thread_dicts(self, sql: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+        """Run a threads query and attach each thread's participants."""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            threads = []
+            for row in rows:
+                participants = [
+                    address for (address,) in self._conn.execute(
+                        "SELECT address FROM thread_participants WHERE thread_id = ? ORDER BY address",
+                        (row['id'],),
+                    )
+                ]
+                threads.append({
+                    'id': row['id'],
+                    'history_id': row['history_id'],
+                    'message_ids': json.loads(row['message_ids']),
+                    'participants': participants,
+                    'last_date': row['last_date'],
+                })
+        return threads
+
+    def _to_dicts(self, rows: list[sqlite3.Row]) -> list[dict[str, Any]]:
+        """Convert rows to dicts, attaching each message's labels."""
+        if not rows:
+            return []
+        ids = [row['id'] for row in rows]
+        placeholders = ",".join("?" * len(ids))
+        labels: dict[str, list[str]] = {message_id: [] for message_id in ids}
+        with self._lock:
+            for message_id, label in self._conn.execute(
+                f"SELECT message_id, label FROM message_labels WHERE message_id IN ({placeholders})",
+                ids,
+            ):
+                labels[message_id].append(label)
+
+        return [
+            {
+                'id': row['id'],
+                'thread_id': row['thread_id'],
+                'sender': row['sender'],
+                'from': row['from_header'],
+                'subject': row['subject'],
+                'date': row['date'],
+                'snippet': row['snippet'],
+                'labels': labels[row['id']],
+            }
+            for row in rows
+        ]
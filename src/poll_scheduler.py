@@ -0,0 +1,222 @@
+"""Adaptive polling scheduler for inbox monitoring.
+
+A fixed poll interval either wastes Gmail quota on an idle inbox or delays
+mail that arrives during a busy stretch. AdaptivePoller polls quickly after
+recent activity, backs off exponentially while the inbox is idle, adds jitter
+so polls don't line up, and sleeps through configured quiet hours.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+PollFunc = Callable[[], Awaitable[list[dict[str, Any]]]]
+NotifyFunc = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class PollStats:
+    """Running cost and latency figures for tuning the poller."""
+
+    polls: int = 0
+    errors: int = 0
+    messages_found: int = 0
+    total_poll_seconds: float = 0.0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=100))
+
+    @property
+    def average_poll_seconds(self) -> float:
+        """Mean wall time per poll."""
+        return self.total_poll_seconds / self.polls if self.polls else 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """Mean seconds from message arrival to delivery (recent messages)."""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def max_latency(self) -> float:
+        """Worst arrival-to-delivery latency among recent messages."""
+        return max(self.latencies, default=0.0)
+
+    def record_delivery(self, messages: list[dict[str, Any]], delivered_at: float | None = None) -> None:
+        """Record arrival-to-delivery latency for messages just sent to the user.
+
+        Called by whatever finally delivers the mail (e.g. the digest
+        callback), since notify may only queue it.
+
+        Args:
+            messages: Stored message rows with 'date' in epoch milliseconds
+            delivered_at: Epoch seconds of delivery (default: now)
+        """
+        if delivered_at is None:
+            delivered_at = time.time()
+        for message in messages:
+            arrived_ms = int(message.get('date', 0))
+            if arrived_ms:
+                self.latencies.append(max(0.0, delivered_at - arrived_ms / 1000))
+
+
+class AdaptivePoller:
+    """Background task that polls for new mail on an adaptive schedule.
+
+    Features:
+    - Interval resets to min_interval after new mail or user activity
+    - Exponential backoff up to max_interval while the inbox stays idle
+    - Jitter on every delay
+    - No scheduled polls during quiet hours (trigger() still works)
+    - Poll cost tracking; delivery latency via stats.record_delivery()
+    """
+
+    def __init__(
+        self,
+        poll: PollFunc,
+        notify: NotifyFunc | None = None,
+        min_interval: float = 30.0,
+        max_interval: float = 900.0,
+        backoff: float = 2.0,
+        jitter: float = 0.1,
+        quiet_hours: tuple[int, int] | None = None,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        """Initialize poller.
+
+        Args:
+            poll: Coroutine returning newly arrived messages (stored message
+                  rows with 'date' in epoch milliseconds)
+            notify: Coroutine called with new messages after each poll
+            min_interval: Seconds between polls while mail is active
+            max_interval: Upper bound on the idle backoff, in seconds
+            backoff: Interval multiplier after each idle poll
+            jitter: Random +/- fraction applied to each delay
+            quiet_hours: (start_hour, end_hour) local time with no scheduled
+                         polls, e.g. (22, 7). None disables quiet hours.
+            now: Clock returning local time (overridable for tests)
+        """
+        self.poll = poll
+        self.notify = notify
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.quiet_hours = quiet_hours
+        self.now = now
+
+        self.interval = min_interval
+        self.stats = PollStats()
+        self._wake = asyncio.Event()
+        self._triggered = False
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> asyncio.Task[None]:
+        """Start the polling task on the running loop (no-op if running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name='inbox-poller')
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the polling task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def trigger(self) -> None:
+        """Poll as soon as possible, even during quiet hours."""
+        self._triggered = True
+        self._wake.set()
+
+    def note_activity(self) -> None:
+        """Record user interaction: switch back to fast polling.
+
+        The pending poll is brought forward to min_interval after the last
+        one, never pushed back, so a stream of commands cannot starve it.
+        """
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def in_quiet_hours(self) -> bool:
+        """Check whether the current local time is inside quiet hours."""
+        if self.quiet_hours is None:
+            return False
+        start, end = self.quiet_hours
+        hour = self.now().hour
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def next_delay(self) -> float:
+        """Seconds until the next scheduled poll."""
+        if self.in_quiet_hours():
+            assert self.quiet_hours is not None
+            current = self.now()
+            resume = current.replace(hour=self.quiet_hours[1], minute=0, second=0, microsecond=0)
+            if resume <= current:
+                resume += timedelta(days=1)
+            return (resume - current).total_seconds()
+
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def poll_once(self) -> list[dict[str, Any]]:
+        """Run one poll, notify, and adapt the interval.
+
+        Returns:
+            New messages found (empty on error)
+        """
+        started = time.monotonic()
+        try:
+            messages = await self.poll()
+        except Exception as error:
+            print(f"Inbox poll failed: {error}")
+            self.stats.errors += 1
+            messages = []
+        finally:
+            self.stats.polls += 1
+            self.stats.total_poll_seconds += time.monotonic() - started
+
+        if messages:
+            self.stats.messages_found += len(messages)
+            self.interval = self.min_interval
+            if self.notify is not None:
+                try:
+                    await self.notify(messages)
+                except Exception as error:
+                    print(f"New mail notification failed: {error}")
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        return messages
+
+    async def _run(self) -> None:
+        """Poll loop: wait for the next deadline or a wake-up, then poll."""
+        last_poll = time.monotonic()
+        deadline = last_poll + self.next_delay()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(0.0, deadline - time.monotonic()))
+                woken = True
+            except asyncio.TimeoutError:
+                woken = False
+            self._wake.clear()
+
+            if woken and not self._triggered:
+                # Activity: keep the pending poll, but no later than min_interval after the last
+                deadline = min(deadline, last_poll + self.min_interval)
+                continue
+            if not woken and self.in_quiet_hours():
+                deadline = time.monotonic() + self.next_delay()
+                continue
+
+            self._triggered = False
+            await self.poll_once()
+            last_poll = time.monotonic()
+            deadline = last_poll + self.next_delay()
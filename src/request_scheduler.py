@@ -0,0 +1,248 @@
+"""Quota-aware scheduling, retry and backoff for Gmail API calls.
+
+Gmail meters each user in quota units (5 per messages.get/list, 2 per
+history.list, ...) against a per-second ceiling. Without pacing, a bulk
+backfill overshoots the ceiling, gets 429/rateLimitExceeded, and retries
+without backoff turn that into an error storm. RequestScheduler paces every
+call through a token bucket sized in quota units, retries retryable errors
+with jittered exponential backoff, enforces a per-call deadline, and counts
+the units spent.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, TypeVar
+
+from googleapiclient.errors import HttpError
+
+T = TypeVar('T')
+
+# Quota units per Gmail API method
+# https://developers.google.com/gmail/api/reference/quota
+QUOTA_UNITS = {
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.attachments.get': 5,
+    'threads.list': 10,
+    'threads.get': 10,
+    'history.list': 2,
+    'labels.list': 1,
+    'labels.get': 1,
+    'getProfile': 1,
+}
+
+# Gmail's per-user rate limit
+DEFAULT_UNITS_PER_SECOND = 250.0
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = (b'ratelimitexceeded', b'userratelimitexceeded')
+
+
+class DeadlineExceeded(Exception):
+    """A call could not complete (including waits and retries) before its deadline."""
+
+
+def is_retryable(error: HttpError) -> bool:
+    """Check whether a Gmail error is worth retrying after a backoff.
+
+    Args:
+        error: Error raised by a Gmail API call
+
+    Returns:
+        True for 429, 5xx, and 403 rate-limit errors
+    """
+    status = error.resp.status
+    if status in RETRYABLE_STATUSES:
+        return True
+    if status == 403:
+        content = (error.content or b'').lower()
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+    return False
+
+
+class TokenBucket:
+    """Thread-safe token bucket measured in quota units.
+
+    Callers reserve units up front and sleep off any deficit outside the
+    lock, so concurrent callers are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize bucket (starts full).
+
+        Args:
+            rate: Units added per second
+            capacity: Maximum burst in units (default: one second of rate)
+            clock: Monotonic clock (overridable for tests)
+            sleep: Sleep function (overridable for tests)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float, deadline: float | None = None) -> float:
+        """Take units from the bucket, waiting if they aren't available yet.
+
+        Args:
+            units: Quota units needed
+            deadline: Clock time by which the units must be available
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            DeadlineExceeded: If the wait would run past the deadline
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = max(0.0, (units - self._tokens) / self.rate)
+            if deadline is not None and now + wait > deadline:
+                raise DeadlineExceeded(f"Quota wait of {wait:.2f}s exceeds deadline")
+            self._tokens -= units
+
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+@dataclass
+class SchedulerStats:
+    """Counters for Gmail calls made through a RequestScheduler."""
+
+    calls: int = 0
+    units_spent: int = 0
+    retries: int = 0
+    failures: int = 0
+    throttled_seconds: float = 0.0
+    units_by_method: Counter[str] = field(default_factory=Counter)
+
+
+class RequestScheduler:
+    """Central pacing and retry policy for every Gmail API call.
+
+    Features:
+    - Token bucket sized in Gmail quota units
+    - Exponential backoff with jitter on 429/5xx/rateLimitExceeded
+    - Honors Retry-After when Gmail sends it
+    - Per-call deadline covering quota waits and retries
+    - Counters for calls, units spent, retries and time throttled
+    """
+
+    def __init__(
+        self,
+        units_per_second: float = DEFAULT_UNITS_PER_SECOND,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 32.0,
+        default_deadline: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            units_per_second: Quota ceiling to pace against
+            max_retries: Retries per call before giving up
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound on a single backoff delay
+            default_deadline: Seconds each call may take in total
+            clock: Monotonic clock (overridable for tests)
+            sleep: Sleep function (overridable for tests)
+        """
+        self.bucket = TokenBucket(units_per_second, clock=clock, sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.default_deadline = default_deadline
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = SchedulerStats()
+        self._stats_lock = threading.Lock()
+
+    def execute(
+        self,
+        call: Callable[[], T],
+        method: str,
+        units: int | None = None,
+        deadline: float | None = None,
+    ) -> T:
+        """Run a Gmail call under the quota budget, retrying transient errors.
+
+        Args:
+            call: Performs the HTTP request (re-invoked on retry)
+            method: Gmail method name for quota accounting, e.g. 'messages.get'
+            units: Quota units for this call (default: QUOTA_UNITS[method])
+            deadline: Seconds allowed for the call (default: default_deadline)
+
+        Returns:
+            Whatever call returns
+
+        Raises:
+            HttpError: Non-retryable errors, or retryable ones after max_retries
+            DeadlineExceeded: If waiting or retrying would pass the deadline
+        """
+        cost = units if units is not None else QUOTA_UNITS.get(method, 5)
+        deadline_at = self.clock() + (deadline if deadline is not None else self.default_deadline)
+
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire(cost, deadline_at)
+            with self._stats_lock:
+                self.stats.calls += 1
+                self.stats.units_spent += cost
+                self.stats.units_by_method[method] += cost
+                self.stats.throttled_seconds += waited
+
+            try:
+                return call()
+            except HttpError as error:
+                if not is_retryable(error) or attempt >= self.max_retries:
+                    with self._stats_lock:
+                        self.stats.failures += 1
+                    raise
+
+                delay = self.backoff_delay(attempt, error)
+                if self.clock() + delay > deadline_at:
+                    with self._stats_lock:
+                        self.stats.failures += 1
+                    raise DeadlineExceeded(f"{method} still failing at deadline: {error}") from error
+
+                print(f"Gmail {method} got {error.resp.status}, retrying in {delay:.1f}s")
+                with self._stats_lock:
+                    self.stats.retries += 1
+                self.sleep(delay)
+                attempt += 1
+
+    def backoff_delay(self, attempt: int, error: HttpError | None = None) -> float:
+        """Delay before retry number attempt + 1.
+
+        Uses Retry-After if Gmail sent one, otherwise exponential backoff
+        with "equal jitter" (half fixed, half random) capped at max_delay.
+        """
+        if error is not None:
+            retry_after = error.resp.get('retry-after') if isinstance(error.resp, dict) else None
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_delay)
+                except ValueError:
+                    pass
+
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return cap / 2 + random.uniform(0, cap / 2)
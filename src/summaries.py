@@ -0,0 +1,226 @@
+"""Cached message and thread summaries.
+
+Summarizing costs seconds of model time, and the same email gets asked about
+again and again. Message summaries are cached under a hash of the normalized
+body plus the summarizer's version, so an unchanged email (or the same text
+in another message) is answered from SQLite and a summarizer upgrade
+naturally invalidates old entries. Thread summaries remember which messages
+they cover; when a reply arrives only the new message is summarized and
+merged into the previous thread summary.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Protocol
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS message_summaries (
+    body_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (body_hash, version)
+);
+CREATE TABLE IF NOT EXISTS thread_summaries (
+    thread_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    message_ids TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+# Quoted reply lines ("> ...") and "On <date>, X wrote:" attributions
+_QUOTED = re.compile(r'^\s*>.*$|^On .{1,200} wrote:\s*$', re.MULTILINE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class Summarizer(Protocol):
+    """Anything that can summarize text.
+
+    version must change whenever output would change (new model, prompt or
+    settings), so cached summaries from the old one are not reused.
+    """
+
+    version: str
+
+    def summarize(self, text: str) -> str:
+        """Summarize one message body."""
+        ...
+
+    def merge(self, previous: str, addition: str) -> str:
+        """Fold a new message's summary into an existing thread summary."""
+        ...
+
+
+class LeadSummarizer:
+    """Model-free summarizer: the first sentences of the text.
+
+    Used until a model-backed summarizer is configured; follows the same
+    protocol, so swapping it in only changes the version.
+    """
+
+    version = "lead-1"
+
+    def __init__(self, max_chars: int = 280) -> None:
+        """Initialize summarizer.
+
+        Args:
+            max_chars: Longest summary to return
+        """
+        self.max_chars = max_chars
+
+    def summarize(self, text: str) -> str:
+        """Whole sentences from the start of text, up to max_chars."""
+        text = _WHITESPACE.sub(' ', text).strip()
+        if len(text) <= self.max_chars:
+            return text
+        cut = text[:self.max_chars]
+        end = cut.rfind('. ')
+        return cut[:end + 1] if end > 0 else cut.rstrip() + '…'
+
+    def merge(self, previous: str, addition: str) -> str:
+        """One line per message, oldest first."""
+        return f"{previous}\n{addition}" if previous else addition
+
+
+def normalize_body(text: str) -> str:
+    """Reduce a body to what matters for summarizing.
+
+    Quoted earlier replies are dropped and whitespace collapsed, so the same
+    message re-sent with different wrapping or quoting hashes the same.
+    """
+    return _WHITESPACE.sub(' ', _QUOTED.sub('', text)).strip()
+
+
+def body_hash(text: str) -> str:
+    """SHA-256 of the normalized body."""
+    return hashlib.sha256(normalize_body(text).encode()).hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed store for message and thread summaries.
+
+    Features:
+    - WAL mode, safe to share between the event loop and worker threads
+    - Message summaries keyed by (body hash, summarizer version)
+    - Thread summaries with the ordered message IDs they cover
+    """
+
+    def __init__(self, db_path: str = "summaries.db") -> None:
+        """Open (or create) the cache.
+
+        Args:
+            db_path: SQLite database file (":memory:" for a throwaway cache)
+        """
+        if db_path != ":memory:" and Path(db_path).parent != Path("."):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get_message(self, digest: str, version: str) -> str | None:
+        """Cached summary for a body hash, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM message_summaries WHERE body_hash = ? AND version = ?",
+                (digest, version),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_message(self, digest: str, version: str, summary: str) -> None:
+        """Store a message summary."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO message_summaries (body_hash, version, summary) VALUES (?, ?, ?)",
+                (digest, version, summary),
+            )
+
+    def get_thread(self, thread_id: str, version: str) -> tuple[list[str], str] | None:
+        """Cached (message_ids, summary) for a thread, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message_ids, summary FROM thread_summaries WHERE thread_id = ? AND version = ?",
+                (thread_id, version),
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put_thread(self, thread_id: str, version: str, message_ids: list[str], summary: str) -> None:
+        """Store a thread summary and the messages it covers."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thread_summaries (thread_id, version, message_ids, summary) "
+                "VALUES (?, ?, ?, ?)",
+                (thread_id, version, json.dumps(message_ids), summary),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SummaryService:
+    """Summarizes messages and threads, doing model work only for new text."""
+
+    def __init__(self, summarizer: Summarizer, cache: SummaryCache) -> None:
+        """Initialize service.
+
+        Args:
+            summarizer: Produces and merges summaries
+            cache: Where summaries are kept between calls and restarts
+        """
+        self.summarizer = summarizer
+        self.cache = cache
+
+    def summarize_message(self, text: str) -> str:
+        """Summarize a message body, reusing the cached summary if known."""
+        digest = body_hash(text)
+        summary = self.cache.get_message(digest, self.summarizer.version)
+        if summary is None:
+            summary = self.summarizer.summarize(normalize_body(text))
+            self.cache.put_message(digest, self.summarizer.version, summary)
+        return summary
+
+    def summarize_thread(
+        self,
+        thread_id: str,
+        message_ids: list[str],
+        get_text: Callable[[str], str],
+    ) -> str:
+        """Summarize a thread, folding in only messages added since last time.
+
+        Args:
+            thread_id: Gmail thread ID
+            message_ids: Thread's message IDs, oldest first
+            get_text: Returns the body text for a message ID; only called
+                      for messages not covered by the cached summary
+
+        Returns:
+            Summary of the whole thread
+        """
+        version = self.summarizer.version
+        cached = self.cache.get_thread(thread_id, version)
+
+        # Incremental only if the thread grew at the end; edits or deletions
+        # anywhere else mean starting over
+        if cached is not None and message_ids[:len(cached[0])] == cached[0]:
+            covered, summary = cached
+        else:
+            covered, summary = [], ''
+
+        new_ids = message_ids[len(covered):]
+        if not new_ids:
+            return summary
+
+        for message_id in new_ids:
+            summary = self.summarizer.merge(summary, self.summarize_message(get_text(message_id)))
+        self.cache.put_thread(thread_id, version, message_ids, summary)
+        print(f"Thread {thread_id}: summarized {len(new_ids)} new of {len(message_ids)} messages")
+        return summary
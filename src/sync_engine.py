@@ -0,0 +1,267 @@
+"""Incremental mailbox sync using the Gmail History API.
+
+Instead of re-listing the inbox on every check, SyncEngine remembers the last
+seen historyId and asks Gmail only for what changed since then. Polling cost
+scales with new mail rather than mailbox size.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from googleapiclient.errors import HttpError
+
+from src.gmail_client import GmailClient
+from src.message_store import MessageStore
+from src.sender_index import SenderIndex
+
+# Upper bound on messages listed when the stored history ID has expired
+DEFAULT_RESYNC_LIMIT = 500
+
+
+@dataclass
+class SyncResult:
+    """Changes found by one sync pass."""
+
+    history_id: str
+    added: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    labels_added: dict[str, list[str]] = field(default_factory=dict)
+    labels_removed: dict[str, list[str]] = field(default_factory=dict)
+    full_resync: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        """True if anything changed since the previous sync."""
+        return bool(self.added or self.deleted or self.labels_added or self.labels_removed)
+
+
+class SyncEngine:
+    """Tracks mailbox changes between checks via users.history.list.
+
+    Features:
+    - Persists the last historyId so restarts resume where they left off
+    - Reports message additions, deletions and label changes
+    - Falls back to a bounded full resync when the history ID has expired
+    - Keeps an optional MessageStore in step with deletions and label changes
+    - Feeds an optional SenderIndex, seeding it with one full resync
+    - Safe to call from several threads; syncs run one at a time
+    """
+
+    def __init__(
+        self,
+        gmail_client: GmailClient,
+        state_path: str = "sync_state.json",
+        label_id: str | None = 'INBOX',
+        resync_limit: int = DEFAULT_RESYNC_LIMIT,
+        store: MessageStore | None = None,
+        projection: str = 'summary',
+        senders: SenderIndex | None = None,
+    ) -> None:
+        """Initialize sync engine.
+
+        Args:
+            gmail_client: Client used for Gmail API calls
+            state_path: File where the last historyId is stored
+            label_id: Only track messages with this label (None = all mail)
+            resync_limit: Maximum messages listed during a full resync
+            store: Local message store to update with each sync result
+            projection: Projection used to fetch added messages for the
+                        store; a superset of 'summary' (e.g. 'triage') lets
+                        callers reuse the fetch through the message cache
+            senders: Per-sender history index fed with every added message;
+                     the first sync with it runs a full resync to seed it
+        """
+        self.gmail_client = gmail_client
+        self.state_path = Path(state_path)
+        self.label_id = label_id
+        self.resync_limit = resync_limit
+        self.store = store
+        self.projection = projection
+        self.senders = senders
+        # One history walk at a time: they share the stored history ID
+        self._lock = threading.Lock()
+
+    @property
+    def history_id(self) -> str | None:
+        """Last stored history ID, or None if never synced."""
+        return self._load_state().get('history_id')
+
+    def _load_state(self) -> dict[str, Any]:
+        """Stored sync state ({} if never synced or unreadable)."""
+        if not self.state_path.exists():
+            return {}
+
+        try:
+            return json.loads(self.state_path.read_text())
+        except (ValueError, OSError) as error:
+            print(f"Invalid sync state, full resync required: {error}")
+            return {}
+
+    def sync(self) -> SyncResult:
+        """Fetch changes since the last sync and store the new history ID.
+
+        Returns:
+            SyncResult describing what changed. On first run, or when the
+            stored history ID has expired, this is a full resync listing
+            up to resync_limit current messages as 'added'.
+
+        A sync started while another is running waits for it, then picks up
+        from the history ID it saved.
+
+        Raises:
+            HttpError: If Gmail API call fails (other than an expired history ID)
+        """
+        with self._lock:
+            return self._sync()
+
+    def _sync(self) -> SyncResult:
+        """Run one sync pass (caller holds the lock)."""
+        state = self._load_state()
+        start_history_id = state.get('history_id')
+        if start_history_id is None:
+            result = self._full_resync()
+        elif self.senders is not None and not state.get('senders_seeded'):
+            # Mail synced before the index existed was never counted
+            print("Seeding sender index, running full resync")
+            result = self._full_resync()
+        else:
+            try:
+                result = self._incremental_sync(start_history_id)
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+                print(f"History ID {start_history_id} expired, running full resync")
+                result = self._full_resync()
+
+        self._apply(result)
+        if result.has_changes:
+            self.gmail_client.invalidate_counters()
+        self._save_history_id(result.history_id, senders_seeded=self.senders is not None)
+        return result
+
+    def _incremental_sync(self, start_history_id: str) -> SyncResult:
+        """Walk all history pages after start_history_id."""
+        added: dict[str, None] = {}
+        deleted: dict[str, None] = {}
+        # Last label event per message and label, in history order (True = added)
+        label_changes: dict[str, dict[str, bool]] = {}
+        history_id = start_history_id
+        page_token = None
+
+        while True:
+            response = self.gmail_client.list_history(
+                start_history_id,
+                page_token=page_token,
+                label_id=self.label_id,
+            )
+
+            for record in response.get('history', []):
+                for item in record.get('messagesAdded', []):
+                    message_id = item['message']['id']
+                    deleted.pop(message_id, None)
+                    added[message_id] = None
+                for item in record.get('messagesDeleted', []):
+                    message_id = item['message']['id']
+                    # Added and deleted within one window: nothing to report
+                    if message_id in added:
+                        del added[message_id]
+                        continue
+                    deleted[message_id] = None
+                for item in record.get('labelsAdded', []):
+                    changes = label_changes.setdefault(item['message']['id'], {})
+                    changes.update(dict.fromkeys(item['labelIds'], True))
+                for item in record.get('labelsRemoved', []):
+                    changes = label_changes.setdefault(item['message']['id'], {})
+                    changes.update(dict.fromkeys(item['labelIds'], False))
+
+            history_id = response.get('historyId', history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        for message_id in deleted:
+            label_changes.pop(message_id, None)
+
+        # Net result per label, so a label removed and re-added ends up added
+        labels_added: dict[str, list[str]] = {}
+        labels_removed: dict[str, list[str]] = {}
+        for message_id, changes in label_changes.items():
+            for label, added_last in changes.items():
+                target = labels_added if added_last else labels_removed
+                target.setdefault(message_id, []).append(label)
+
+        print(f"Synced history: {len(added)} added, {len(deleted)} deleted")
+        return SyncResult(
+            history_id=history_id,
+            added=list(added),
+            deleted=list(deleted),
+            labels_added=labels_added,
+            labels_removed=labels_removed,
+        )
+
+    def _full_resync(self) -> SyncResult:
+        """List current messages and start tracking from the current history ID."""
+        # Read the history ID first so nothing arriving mid-listing is missed
+        history_id = self.gmail_client.get_profile()['historyId']
+
+        # Unfiltered: the store and sender index describe all mail, not just
+        # allowlisted senders (the allowlist only filters notifications)
+        query = f"label:{self.label_id}" if self.label_id else ''
+        messages = self.gmail_client.list_messages(max_results=self.resync_limit, query=query)
+
+        return SyncResult(
+            history_id=str(history_id),
+            added=[message['id'] for message in messages],
+            full_resync=True,
+        )
+
+    def _apply(self, result: SyncResult) -> None:
+        """Mirror a sync result into the message cache, store and sender index.
+
+        Added messages the store lacks or the index has not counted are
+        fetched in one metadata batch; deletions and label changes are
+        applied locally without further Gmail calls.
+        """
+        self._update_cache(result)
+        wanted = self.store.missing_ids(result.added) if self.store is not None else []
+        if self.senders is not None:
+            wanted = list(dict.fromkeys([*wanted, *self.senders.uncounted(result.added)]))
+        if wanted:
+            fetched = self.gmail_client.get_messages_batch(wanted, projection=self.projection)
+            if self.store is not None:
+                self.store.upsert_messages(fetched)
+            if self.senders is not None:
+                self.senders.record_messages(fetched)
+        if self.store is None:
+            return
+
+        self.store.delete_messages(result.deleted)
+        for message_id, labels in result.labels_added.items():
+            self.store.add_labels(message_id, labels)
+        for message_id, labels in result.labels_removed.items():
+            self.store.remove_labels(message_id, labels)
+
+    def _update_cache(self, result: SyncResult) -> None:
+        """Drop deleted messages and stale labels from the client's message cache."""
+        cache = getattr(self.gmail_client, 'cache', None)
+        if cache is None:
+            return
+        cache.remove(result.deleted)
+        cache.invalidate_labels([*result.labels_added, *result.labels_removed])
+
+    def _save_history_id(self, history_id: str, senders_seeded: bool = False) -> None:
+        """Persist the history ID (and whether the sender index is seeded) atomically."""
+        if self.state_path.parent != Path("."):
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+        state: dict[str, Any] = {'history_id': str(history_id)}
+        if senders_seeded:
+            state['senders_seeded'] = True
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.state_path)
@@ -2,6 +2,10 @@
 
 import json
 import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Sequence, cast
 
@@ -11,18 +15,45 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 
 GMAIL_READONLY_SCOPE = "https://www.googleapis.com/auth/gmail.readonly"
 
+# Refresh this many seconds before the access token expires
+DEFAULT_REFRESH_MARGIN = 300.0
+
+# Wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 60.0
+
 logger = logging.getLogger(__name__)
 
 
-class TokenManager:
-    """Manages Gmail OAuth2 tokens with automatic refresh and persistence."""
+def _utcnow() -> datetime:
+    """Naive UTC now, matching google-auth's expiry timestamps."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
-    def __init__(self, credentials_path: str, token_path: str) -> None:
+class TokenManager:
+    """Manages Gmail OAuth2 tokens with automatic refresh and persistence.
+
+    Credentials are kept in memory after the first load and refreshed on a
+    background timer refresh_margin seconds before they expire, so callers
+    normally never wait on a refresh or touch token.json. Concurrent callers
+    that do need a refresh share a single in-flight refresh.
+    """
+
+    def __init__(
+        self,
+        credentials_path: str,
+        token_path: str,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+    ) -> None:
         self.credentials_path = Path(credentials_path)
         self.token_path = Path(token_path)
+        self.refresh_margin = refresh_margin
+        self._creds: Credentials | None = None
+        self._scopes: list[str] | None = None
+        self._lock = threading.Lock()
+        self._refresh_timer: threading.Timer | None = None
 
     def get_credentials(self, scopes: Sequence[str] | None = None) -> Credentials:
-        """Load credentials or run OAuth flow, then persist token.
+        """Return cached credentials, loading, refreshing or running OAuth if needed.
 
         Args:
             scopes: OAuth scopes to request. Defaults to Gmail read-only.
@@ -33,20 +64,41 @@ class TokenManager:
         Raises:
             FileNotFoundError: If credentials.json is missing.
         """
+        scopes = list(scopes or [GMAIL_READONLY_SCOPE])
+
+        # Fast path: no lock, no disk
+        creds = self._creds
+        if creds is not None and scopes == self._scopes and self._is_fresh(creds):
+            return creds
+
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            creds = self._creds
+            if creds is not None and scopes == self._scopes and self._is_fresh(creds):
+                return creds
+            creds = self._acquire(scopes)
+            self._creds = creds
+            self._scopes = scopes
+
+        self._schedule_refresh(creds)
+        return creds
+
+    def _acquire(self, scopes: list[str]) -> Credentials:
+        """Load, refresh or create credentials. Caller holds self._lock."""
         if not self.credentials_path.exists():
             raise FileNotFoundError(
                 f"Missing OAuth credentials file: {self.credentials_path}. "
                 "Download credentials.json from Google Cloud Console."
             )
 
-        scopes = list(scopes or [GMAIL_READONLY_SCOPE])
+        creds = self._creds if scopes == self._scopes else None
+        if creds is None:
+            creds = self._load_token(scopes)
+            if creds and self._is_fresh(creds):
+                return creds
 
-        creds = self._load_token(scopes)
-        if creds and creds.valid:
-            return creds
-
-        if creds and creds.expired and creds.refresh_token:
-            logger.info("Refreshing expired Gmail token")
+        if creds and creds.refresh_token:
+            logger.info("Refreshing Gmail token")
             creds.refresh(Request())
             refreshed = cast(Credentials, creds)
             self._save_token(refreshed)
@@ -61,6 +113,51 @@ class TokenManager:
         self._save_token(creds)
         return creds
 
+    def _is_fresh(self, creds: Credentials) -> bool:
+        """True if creds are valid and not inside the refresh margin."""
+        if not creds.valid:
+            return False
+        if creds.expiry is None:
+            return True
+        return (creds.expiry - _utcnow()).total_seconds() > self.refresh_margin
+
+    def _schedule_refresh(self, creds: Credentials, delay: float | None = None) -> None:
+        """Start a timer that refreshes creds shortly before they expire."""
+        if delay is None:
+            if creds.expiry is None or not creds.refresh_token:
+                return
+            delay = (creds.expiry - _utcnow()).total_seconds() - self.refresh_margin
+
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = threading.Timer(max(delay, 0.0), self._refresh_in_background)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self) -> None:
+        """Timer callback: refresh ahead of expiry, retrying on failure."""
+        try:
+            with self._lock:
+                creds = self._creds
+                if creds is None or not creds.refresh_token:
+                    return
+                logger.info("Refreshing Gmail token ahead of expiry")
+                creds.refresh(Request())
+                self._save_token(creds)
+        except Exception as exc:
+            logger.warning("Background token refresh failed, retrying: %s", exc)
+            if self._creds is not None:
+                self._schedule_refresh(self._creds, delay=REFRESH_RETRY_SECONDS)
+            return
+
+        self._schedule_refresh(creds)
+
+    def close(self) -> None:
+        """Stop the background refresh timer."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
     def _load_token(self, scopes: Sequence[str]) -> Credentials | None:
         if not self.token_path.exists():
             return None
@@ -73,6 +170,11 @@ class TokenManager:
             return None
 
     def _save_token(self, creds: Credentials) -> None:
+        """Write token.json atomically (temp file + rename).
+
+        A crash mid-write leaves the previous token.json intact instead of a
+        truncated file that would force the interactive OAuth flow again.
+        """
         self._ensure_token_dir()
         token_data = {
             "token": creds.token,
@@ -82,7 +184,24 @@ class TokenManager:
             "client_secret": creds.client_secret,
             "scopes": creds.scopes,
         }
-        self.token_path.write_text(json.dumps(token_data, indent=2))
+        if creds.expiry is not None:
+            token_data["expiry"] = creds.expiry.isoformat() + "Z"
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(self.token_path.parent),
+            prefix=f".{self.token_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                tmp_file.write(json.dumps(token_data, indent=2))
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.token_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
         logger.info("Token saved to %s", self.token_path)
 
     def _ensure_token_dir(self) -> None:
@@ -0,0 +1,348 @@
+"""Off-loop transcription of Discord voice messages.
+
+Decoding audio and running speech-to-text takes seconds of CPU per voice
+note; doing it on the bot's event loop would stall every other command
+meanwhile. Transcriber streams the attachment to a spool file in chunks
+(hashing it on the way), answers repeats from a SQLite cache keyed by the
+audio hash and backend version, and otherwise hands the file to a backend
+running in a process pool. Backends read the file incrementally, so a long
+note is never held in memory as one buffer. A newer voice note from the
+same user (or deleting the old one) cancels the older job: queued work is
+dropped, and running work stops at its next chunk.
+"""
+from __future__ import annotations
+
+import asyncio
+import codecs
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterable, Callable, Iterator, Protocol
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    audio_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (audio_hash, version)
+);
+"""
+
+# Bytes read per step when spooling and decoding audio
+AUDIO_CHUNK_BYTES = 64 * 1024
+
+
+class TranscriptionCancelled(Exception):
+    """Raised inside a worker when its job was cancelled."""
+
+
+class TranscriptionBackend(Protocol):
+    """Speech-to-text engine run inside a worker process.
+
+    Backends are pickled into the worker, so keep their state small (load
+    models lazily, once per process). version must change whenever output
+    would change, so cached transcripts from the old one are not reused.
+    """
+
+    version: str
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        """Transcribe an audio file, checking cancelled() between steps.
+
+        Raises:
+            TranscriptionCancelled: If cancelled() turns true
+        """
+        ...
+
+
+def iter_audio_chunks(path: str, chunk_bytes: int = AUDIO_CHUNK_BYTES) -> Iterator[bytes]:
+    """Read a file in fixed-size chunks."""
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_bytes):
+            yield chunk
+
+
+class FakeBackend:
+    """Deterministic stand-in backend for tests and development.
+
+    Treats the audio bytes as UTF-8 text and returns it, decoded chunk by
+    chunk; real audio comes back as replacement characters. Needs no model
+    and gives the same answer for the same bytes every time.
+    """
+
+    version = "fake-1"
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        """Decode the file as text, stopping if cancelled."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        parts = []
+        for chunk in iter_audio_chunks(path):
+            if cancelled():
+                raise TranscriptionCancelled(path)
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts).strip()
+
+
+# faster-whisper models loaded in this (worker) process, by (size, compute type)
+_WHISPER_MODELS: dict[tuple[str, str], Any] = {}
+
+
+class WhisperBackend:
+    """Local Whisper transcription via the optional faster-whisper package.
+
+    faster-whisper decodes the file through PyAV in frames and yields
+    segments as it goes, so cancellation is checked once per segment.
+    """
+
+    def __init__(self, model_size: str = "base", compute_type: str = "int8") -> None:
+        """Initialize backend (the model loads on first use in each worker).
+
+        Args:
+            model_size: Whisper model name, e.g. "tiny", "base", "small"
+            compute_type: CTranslate2 compute type
+        """
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.version = f"whisper-{model_size}-{compute_type}"
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        """Transcribe with Whisper, stopping between segments if cancelled.
+
+        Raises:
+            ImportError: If faster-whisper is not installed
+        """
+        key = (self.model_size, self.compute_type)
+        model = _WHISPER_MODELS.get(key)
+        if model is None:
+            from faster_whisper import WhisperModel
+
+            model = _WHISPER_MODELS[key] = WhisperModel(self.model_size, compute_type=self.compute_type)
+
+        segments, _ = model.transcribe(path)
+        parts = []
+        for segment in segments:
+            if cancelled():
+                raise TranscriptionCancelled(path)
+            parts.append(segment.text.strip())
+        return ' '.join(parts)
+
+
+BACKENDS: dict[str, Callable[[], TranscriptionBackend]] = {
+    'fake': FakeBackend,
+    'whisper': WhisperBackend,
+}
+
+
+# Optional package each backend needs, checked when the backend is created
+BACKEND_PACKAGES = {'whisper': 'faster_whisper'}
+
+
+def make_backend(name: str) -> TranscriptionBackend:
+    """Create a backend by name ("fake" or "whisper").
+
+    Raises:
+        ValueError: If the name is unknown, or the backend's optional
+                    package is not installed
+    """
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend {name!r}; expected one of {sorted(BACKENDS)}")
+
+    package = BACKEND_PACKAGES.get(name)
+    if package is not None and importlib.util.find_spec(package) is None:
+        raise ValueError(
+            f"TRANSCRIPTION_BACKEND={name} needs the optional {package.replace('_', '-')} package "
+            f"(pip install {package.replace('_', '-')}), or leave TRANSCRIPTION_BACKEND empty"
+        )
+    return factory()
+
+
+def _run_job(backend: TranscriptionBackend, path: str, cancel_path: str) -> str:
+    """Worker-process entry point; cancellation is signalled by a marker file."""
+    return backend.transcribe(path, lambda: os.path.exists(cancel_path))
+
+
+class TranscriptCache:
+    """SQLite-backed transcripts keyed by (audio hash, backend version)."""
+
+    def __init__(self, db_path: str = "transcripts.db") -> None:
+        """Open (or create) the cache.
+
+        Args:
+            db_path: SQLite database file (":memory:" for a throwaway cache)
+        """
+        if db_path != ":memory:" and Path(db_path).parent != Path("."):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, digest: str, version: str) -> str | None:
+        """Cached transcript for an audio hash, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM transcripts WHERE audio_hash = ? AND version = ?",
+                (digest, version),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest: str, version: str, text: str) -> None:
+        """Store a transcript."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (audio_hash, version, text) VALUES (?, ?, ?)",
+                (digest, version, text),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class Transcriber:
+    """Transcribes voice notes in worker processes, one live job per user.
+
+    Features:
+    - Backend runs in a process pool, never on the event loop
+    - Audio spooled to disk in chunks and hashed on the way
+    - Transcripts cached by audio hash and backend version
+    - A new job for the same key cancels the previous one
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptionBackend,
+        cache: TranscriptCache,
+        spool_dir: str | Path | None = None,
+        max_workers: int = 1,
+        executor: Executor | None = None,
+    ) -> None:
+        """Initialize transcriber.
+
+        Args:
+            backend: Speech-to-text engine (must be picklable)
+            cache: Where transcripts are kept between calls and restarts
+            spool_dir: Directory for audio being transcribed (default: temp dir)
+            max_workers: Worker processes (ignored if executor is given)
+            executor: Executor to run jobs in (default: a forkserver process
+                      pool, started on first use)
+        """
+        self.backend = backend
+        self.cache = cache
+        self.spool_dir = Path(spool_dir or tempfile.gettempdir())
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self._executor = executor
+        self._jobs: dict[Any, asyncio.Task[str]] = {}
+
+    def submit(self, key: Any, chunks: AsyncIterable[bytes]) -> asyncio.Task[str]:
+        """Start transcribing audio, cancelling key's previous job.
+
+        Args:
+            key: Whose job this is (e.g. the Discord user ID)
+            chunks: Audio bytes, e.g. Attachment.read_chunked(...)
+
+        Returns:
+            Task resolving to the transcript; cancelled if superseded
+        """
+        self.cancel(key)
+        task = asyncio.create_task(self._transcribe(chunks), name=f'transcribe-{key}')
+        self._jobs[key] = task
+
+        def forget(done: asyncio.Task[str]) -> None:
+            if self._jobs.get(key) is done:
+                del self._jobs[key]
+
+        task.add_done_callback(forget)
+        return task
+
+    def cancel(self, key: Any) -> bool:
+        """Cancel key's job if one is running.
+
+        Returns:
+            True if a job was cancelled
+        """
+        task = self._jobs.pop(key, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def pending(self) -> int:
+        """Number of jobs not finished yet."""
+        return len(self._jobs)
+
+    def shutdown(self) -> None:
+        """Cancel all jobs and stop the worker processes."""
+        for key in list(self._jobs):
+            self.cancel(key)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _transcribe(self, chunks: AsyncIterable[bytes]) -> str:
+        """Spool, check the cache, then run the backend in a worker."""
+        digest, path = await self._spool(chunks)
+        cached = self.cache.get(digest, self.backend.version)
+        if cached is not None:
+            path.unlink()
+            return cached
+
+        cancel_path = path.with_name(path.name + '.cancel')
+        if self._executor is None:
+            # Forking the bot's threads (Gmail pool, SQLite locks) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+            )
+        future = self._executor.submit(_run_job, self.backend, str(path), str(cancel_path))
+        # Files go once the worker is done with them, however the job ends
+        future.add_done_callback(lambda _: self._cleanup(path, cancel_path))
+
+        try:
+            text = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Queued jobs are dropped; a running worker sees the marker
+            if not future.cancel():
+                cancel_path.touch()
+                if future.done():
+                    # Finished before the marker landed: nobody will remove it
+                    self._cleanup(cancel_path)
+            raise
+        self.cache.put(digest, self.backend.version, text)
+        return text
+
+    async def _spool(self, chunks: AsyncIterable[bytes]) -> tuple[str, Path]:
+        """Write audio chunks to a spool file, hashing as they arrive."""
+        sha256 = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.spool_dir, suffix='.audio')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                async for chunk in chunks:
+                    sha256.update(chunk)
+                    file.write(chunk)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return sha256.hexdigest(), Path(tmp_name)
+
+    @staticmethod
+    def _cleanup(*paths: Path) -> None:
+        """Remove spool files, ignoring ones already gone."""
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
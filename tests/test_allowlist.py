@@ -0,0 +1,100 @@
+"""Unit tests for the sender allowlist compiler and matcher."""
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.allowlist import Allowlist, list_allowlisted_messages
+
+
+class TestAllowlist(unittest.TestCase):
+    """Test Allowlist parsing, matching and query compilation."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.allowlist = Allowlist.from_entries([
+            'Accountant@Example.com',
+            '@bank.com',
+            'tax.gov.au',
+            '  ',
+        ])
+
+    def test_from_entries_normalizes(self) -> None:
+        """Test entries are lower-cased and split into addresses and domains."""
+        self.assertEqual(self.allowlist.addresses, frozenset({'accountant@example.com'}))
+        self.assertEqual(self.allowlist.domains, frozenset({'bank.com', 'tax.gov.au'}))
+
+    def test_matches_exact_address(self) -> None:
+        """Test exact addresses match regardless of display name and case."""
+        self.assertTrue(self.allowlist.matches('My Accountant <ACCOUNTANT@example.com>'))
+        self.assertFalse(self.allowlist.matches('other@example.com'))
+
+    def test_matches_domain_and_subdomains(self) -> None:
+        """Test domain entries cover the domain and its subdomains only."""
+        self.assertTrue(self.allowlist.matches('alerts@bank.com'))
+        self.assertTrue(self.allowlist.matches('Statements <no-reply@mail.bank.com>'))
+        self.assertFalse(self.allowlist.matches('phish@notbank.com'))
+        self.assertFalse(self.allowlist.matches('bank.com@evil.com'))
+
+    def test_compile_single_query(self) -> None:
+        """Test a small allowlist compiles into one from: clause."""
+        queries = self.allowlist.compile_queries(base_query='in:inbox')
+
+        self.assertEqual(queries, ['in:inbox from:(accountant@example.com OR bank.com OR tax.gov.au)'])
+
+    def test_compile_splits_long_allowlists(self) -> None:
+        """Test large allowlists split into several queries under the limit."""
+        allowlist = Allowlist.from_entries(f'sender{i}@example.com' for i in range(200))
+
+        queries = allowlist.compile_queries(max_length=200)
+
+        self.assertGreater(len(queries), 1)
+        self.assertTrue(all(len(query) <= 200 for query in queries))
+        terms = [t for q in queries for t in q[len('from:('):-1].split(' OR ')]
+        self.assertEqual(sorted(terms), sorted(allowlist.addresses))
+
+    def test_empty_allowlist(self) -> None:
+        """Test an empty allowlist is falsy and compiles to no queries."""
+        allowlist = Allowlist.from_entries([])
+
+        self.assertFalse(allowlist)
+        self.assertEqual(allowlist.compile_queries(), [])
+
+    def test_list_allowlisted_messages_merges_queries(self) -> None:
+        """Test results from split queries are de-duplicated, newest first."""
+        gmail_client = MagicMock()
+        gmail_client.list_messages.side_effect = [
+            [{'id': '18f0a'}, {'id': '18e00'}],
+            [{'id': '18f0b'}, {'id': '18e00'}],
+        ]
+        # IDs deliberately out of date order: internalDate decides
+        gmail_client.get_messages_batch.return_value = [
+            {'id': '18f0a', 'internalDate': '3000'},
+            {'id': '18e00', 'internalDate': '2000'},
+            {'id': '18f0b', 'internalDate': '1000'},
+        ]
+        allowlist = Allowlist.from_entries(['a@example.com', 'b@example.com'])
+
+        with patch.object(
+            Allowlist, 'compile_queries', return_value=['from:(a@example.com)', 'from:(b@example.com)']
+        ):
+            messages = list_allowlisted_messages(gmail_client, allowlist, max_results=10)
+
+        self.assertEqual([m['id'] for m in messages], ['18f0a', '18e00', '18f0b'])
+        self.assertEqual(gmail_client.get_messages_batch.call_args.kwargs['fields'], 'id,internalDate')
+
+    def test_list_allowlisted_messages_single_query_keeps_order(self) -> None:
+        """Test one query needs no extra fetch."""
+        gmail_client = MagicMock()
+        gmail_client.list_messages.return_value = [{'id': 'b'}, {'id': 'a'}]
+        allowlist = Allowlist.from_entries(['bank.com'])
+
+        messages = list_allowlisted_messages(gmail_client, allowlist, base_query='label:INBOX')
+
+        self.assertEqual([m['id'] for m in messages], ['b', 'a'])
+        gmail_client.list_messages.assert_called_once_with(max_results=10, query='label:INBOX from:(bank.com)')
+        gmail_client.get_messages_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Unit tests for async Gmail client.
+
+Tests use a mocked GmailClient so no real Gmail connection is made.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from src.async_gmail_client import AsyncGmailClient
+from src.config import Config
+from src.gmail_client import InboxCounters
+
+
+class TestAsyncGmailClient(unittest.TestCase):
+    """Test AsyncGmailClient with a mocked GmailClient."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.config = Mock(spec=Config)
+        self.mock_client = MagicMock()
+
+    def test_delegates_to_gmail_client(self) -> None:
+        """Test coroutines return the wrapped client's results."""
+        self.mock_client.list_messages.return_value = [{'id': 'msg1'}]
+        self.mock_client.get_inbox_counters.return_value = InboxCounters(3, 1, 3, 1, fetched_at=0.0)
+        client = AsyncGmailClient(self.config, client=self.mock_client)
+
+        async def run() -> tuple:
+            return await client.list_messages(max_results=5), await client.get_message_count()
+
+        messages, count = asyncio.run(run())
+
+        self.mock_client.list_messages.assert_called_once_with(max_results=5, query='', fields=None)
+        self.assertEqual(messages, [{'id': 'msg1'}])
+        self.assertEqual(count, 3)
+
+    def test_iter_messages_yields_all_pages(self) -> None:
+        """Test the async iterator walks pages and prefetches the next one."""
+        pages = {
+            None: {'messages': [{'id': 'msg1'}], 'nextPageToken': 'page2'},
+            'page2': {'messages': [{'id': 'msg2'}]},
+        }
+        self.mock_client.list_messages_page.side_effect = lambda query, size, token: pages[token]
+        client = AsyncGmailClient(self.config, client=self.mock_client)
+
+        async def run() -> list:
+            return [message['id'] async for message in client.iter_messages('is:unread', page_size=1)]
+
+        self.assertEqual(asyncio.run(run()), ['msg1', 'msg2'])
+        self.mock_client.list_messages_page.assert_called_with('is:unread', 1, 'page2')
+
+    def test_calls_run_off_event_loop(self) -> None:
+        """Test blocking calls run on a worker thread, not the loop thread."""
+        call_threads = []
+
+        def record_thread(*args, **kwargs) -> dict:
+            call_threads.append(threading.current_thread())
+            return {'id': 'msg1'}
+
+        self.mock_client.get_message.side_effect = record_thread
+        client = AsyncGmailClient(self.config, client=self.mock_client)
+
+        asyncio.run(client.get_message('msg1'))
+
+        self.assertEqual(len(call_threads), 1)
+        self.assertIsNot(call_threads[0], threading.main_thread())
+
+    def test_slow_call_does_not_block_loop(self) -> None:
+        """Test the loop keeps running while a Gmail call is blocked."""
+        self.mock_client.get_inbox_summary.side_effect = lambda: time.sleep(0.2)
+        client = AsyncGmailClient(self.config, client=self.mock_client)
+        ticks = []
+
+        async def heartbeat() -> None:
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run() -> None:
+            await asyncio.gather(client.get_inbox_summary(), heartbeat())
+
+        asyncio.run(run())
+
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.15)
+
+    def test_timeout_releases_caller(self) -> None:
+        """Test a slow call raises TimeoutError instead of hanging."""
+        self.mock_client.get_inbox_summary.side_effect = lambda: time.sleep(0.5)
+        client = AsyncGmailClient(self.config, client=self.mock_client, timeout=0.05)
+
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(client.get_inbox_summary())
+
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_cancelled_while_queued_never_runs(self) -> None:
+        """Test a call cancelled while waiting for a slot never reaches Gmail."""
+        release = threading.Event()
+        self.mock_client.get_message.side_effect = lambda *args, **kwargs: release.wait(1)
+        client = AsyncGmailClient(self.config, client=self.mock_client, max_concurrency=1)
+
+        async def run() -> None:
+            first = asyncio.create_task(client.get_message('msg1'))
+            second = asyncio.create_task(client.get_message('msg2'))
+            await asyncio.sleep(0.05)
+            second.cancel()
+            release.set()
+            await first
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+
+        asyncio.run(run())
+
+        self.mock_client.get_message.assert_called_once_with('msg1', format='full')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Unit tests for the on-demand attachment store."""
+from __future__ import annotations
+
+import base64
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.attachments import DECODE_CHUNK_CHARS, AttachmentStore, list_attachments
+
+
+def encode(data: bytes) -> str:
+    """Base64url-encode bytes the way Gmail does (no padding)."""
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def make_message(message_id: str) -> dict:
+    """Build a message with a text body and one PDF attachment."""
+    return {
+        'id': message_id,
+        'payload': {
+            'mimeType': 'multipart/mixed',
+            'parts': [
+                {'partId': '0', 'mimeType': 'text/plain', 'filename': '', 'body': {'data': encode(b'hi')}},
+                {
+                    'partId': '1',
+                    'mimeType': 'application/pdf',
+                    'filename': 'statement.pdf',
+                    'body': {'attachmentId': f'att-{message_id}', 'size': 1234},
+                },
+            ],
+        },
+    }
+
+
+class TestAttachmentStore(unittest.TestCase):
+    """Test AttachmentStore with a mocked GmailClient."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.gmail_client = MagicMock()
+        # Larger than one decode chunk, and not a multiple of 3 bytes
+        self.content = bytes(range(256)) * (DECODE_CHUNK_CHARS // 128) + b'tail'
+        self.gmail_client.get_attachment.return_value = {'size': len(self.content), 'data': encode(self.content)}
+        self.store = AttachmentStore(self.gmail_client, self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Remove temp files."""
+        self.tmp_dir.cleanup()
+
+    def test_list_attachments_reads_metadata_only(self) -> None:
+        """Test attachments are found in the payload without any fetch."""
+        attachments = list_attachments(make_message('msg1'))
+
+        self.assertEqual(len(attachments), 1)
+        self.assertEqual(attachments[0].filename, 'statement.pdf')
+        self.assertEqual(attachments[0].part_id, '1')
+        self.assertEqual(attachments[0].size, 1234)
+        self.gmail_client.get_attachment.assert_not_called()
+
+    def test_open_fetches_once_and_maps_file(self) -> None:
+        """Test bytes are downloaded on first open and reused afterwards."""
+        info = list_attachments(make_message('msg1'))[0]
+
+        with self.store.open(info) as view:
+            self.assertEqual(len(view), len(self.content))
+            self.assertEqual(view[:4], self.content[:4])
+            self.assertEqual(view[-4:], b'tail')
+        with self.store.open(info):
+            pass
+
+        self.gmail_client.get_attachment.assert_called_once_with('msg1', 'att-msg1')
+
+    def test_identical_content_is_stored_once(self) -> None:
+        """Test two messages with the same file share one blob."""
+        first = self.store.fetch(list_attachments(make_message('msg1'))[0])
+        second = self.store.fetch(list_attachments(make_message('msg2'))[0])
+
+        self.assertEqual(first, second)
+        blobs = [p for p in Path(self.tmp_dir.name).rglob('*') if p.is_file() and p.name != 'index.json']
+        self.assertEqual(len(blobs), 1)
+
+    def test_index_survives_restart(self) -> None:
+        """Test a new store finds earlier downloads without refetching."""
+        info = list_attachments(make_message('msg1'))[0]
+        self.store.fetch(info)
+
+        store = AttachmentStore(self.gmail_client, self.tmp_dir.name)
+
+        self.assertIsNotNone(store.path_for(info))
+        store.fetch(info)
+        self.assertEqual(self.gmail_client.get_attachment.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
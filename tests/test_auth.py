@@ -10,13 +10,13 @@ from src.auth import check_allowlisted_user
 class TestCheckAllowlistedUser:
     """Test suite for check_allowlisted_user function."""
     
-    @patch('src.auth.load_config')
-    def test_authorized_user_returns_true(self, mock_load_config):
+    @patch('src.auth.get_config')
+    def test_authorized_user_returns_true(self, mock_get_config):
         """Test that allowlisted user ID returns True."""
         # Arrange: Set up mock config with allowlisted user ID
         mock_config = MagicMock()
         mock_config.discord_allowlisted_user_id = 123456789
-        mock_load_config.return_value = mock_config
+        mock_get_config.return_value = mock_config
         
         # Mock Discord context with matching user ID
         mock_ctx = MagicMock()
@@ -28,13 +28,13 @@ class TestCheckAllowlistedUser:
         # Assert: Should return True for allowlisted user
         assert result is True
     
-    @patch('src.auth.load_config')
-    def test_unauthorized_user_returns_false(self, mock_load_config):
+    @patch('src.auth.get_config')
+    def test_unauthorized_user_returns_false(self, mock_get_config):
         """Test that non-allowlisted user ID returns False."""
         # Arrange: Set up mock config with allowlisted user ID
         mock_config = MagicMock()
         mock_config.discord_allowlisted_user_id = 123456789
-        mock_load_config.return_value = mock_config
+        mock_get_config.return_value = mock_config
         
         # Mock Discord context with different user ID
         mock_ctx = MagicMock()
@@ -46,13 +46,13 @@ class TestCheckAllowlistedUser:
         # Assert: Should return False for non-allowlisted user
         assert result is False
     
-    @patch('src.auth.load_config')
-    def test_multiple_unauthorized_users_all_rejected(self, mock_load_config):
+    @patch('src.auth.get_config')
+    def test_multiple_unauthorized_users_all_rejected(self, mock_get_config):
         """Test that various unauthorized user IDs are all rejected."""
         # Arrange: Set up mock config
         mock_config = MagicMock()
         mock_config.discord_allowlisted_user_id = 123456789
-        mock_load_config.return_value = mock_config
+        mock_get_config.return_value = mock_config
         
         # Test multiple different unauthorized user IDs
         unauthorized_ids = [111111111, 222222222, 333333333, 999999999]
@@ -0,0 +1,47 @@
+"""Smoke test for the Discord bot module's wiring."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestBotModule(unittest.TestCase):
+    """Test src.bot imports and registers its global allowlist check."""
+
+    def test_imports_with_dummy_env(self) -> None:
+        """Test the module-level wiring runs without Discord or Gmail."""
+        script = (
+            "import src.bot as bot_module\n"
+            "from src.auth import check_allowlisted_user\n"
+            "bot = bot_module.bot\n"
+            "assert check_allowlisted_user in bot._checks\n"
+            "assert {'ping', 'status', 'check-inbox', 'summarize', 'snooze', 'poll'} <= {c.name for c in bot.commands}\n"
+        )
+        env = {
+            **os.environ,
+            'PYTHONPATH': str(ROOT),
+            'DISCORD_BOT_TOKEN': 'token',
+            'DISCORD_ALLOWLISTED_USER_ID': '1',
+        }
+        # Default file paths are relative, so run somewhere disposable
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = subprocess.run(
+                [sys.executable, '-c', script],
+                cwd=tmp_dir,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
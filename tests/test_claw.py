@@ -0,0 +1,148 @@
+"""Unit tests for the PersonalClaw orchestrator."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.claw import PersonalClaw
+from src.config import Config
+from src.email_status import EmailStatus
+from src.request_scheduler import DeadlineExceeded
+
+
+def make_message(message_id: str, subject: str) -> dict:
+    """Build a metadata-format inbox message."""
+    return {
+        'id': message_id,
+        'threadId': message_id,
+        'labelIds': ['INBOX'],
+        'internalDate': '1000',
+        'payload': {'headers': [
+            {'name': 'From', 'value': 'bank@example.com'},
+            {'name': 'Subject', 'value': subject},
+        ]},
+    }
+
+
+class TestPersonalClaw(unittest.TestCase):
+    """Test PersonalClaw with a mocked sync engine and Gmail calls."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.tmp_dir.name)
+        self.config = Config(
+            discord_bot_token='token',
+            discord_allowlisted_user_id=1,
+            sync_state_path=str(root / 'sync_state.json'),
+            message_store_path=str(root / 'messages.db'),
+            attachment_dir=str(root / 'attachments'),
+            summary_cache_path=str(root / 'summaries.db'),
+            status_db_path=str(root / 'status.db'),
+        )
+        self.sync_engine = MagicMock()
+        self.notified: list[str] = []
+
+        async def notify(text: str) -> None:
+            self.notified.append(text)
+
+        self.claw = PersonalClaw(self.config, sync_engine=self.sync_engine, notify=notify)
+
+    def tearDown(self) -> None:
+        """Remove temp files."""
+        self.claw.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_check_inbox_syncs_before_reading_store(self) -> None:
+        """Test the store is refreshed by a sync on every check."""
+        self.claw.store.upsert_messages([make_message('msg1', 'Old')])
+
+        def sync() -> None:
+            self.claw.store.upsert_messages([make_message('msg2', 'New')])
+
+        self.sync_engine.sync.side_effect = sync
+
+        reply = asyncio.run(self.claw.check_inbox())
+
+        self.sync_engine.sync.assert_called_once()
+        self.assertEqual(reply, "📬 You have 2 messages in your inbox")
+
+    def test_check_inbox_serves_store_when_sync_fails(self) -> None:
+        """Test a failed sync falls back to the last synced state."""
+        self.claw.store.upsert_messages([make_message('msg1', 'Old')])
+        self.sync_engine.sync.side_effect = DeadlineExceeded('quota')
+
+        reply = asyncio.run(self.claw.check_inbox())
+
+        self.assertEqual(reply, "📬 You have 1 message in your inbox")
+
+    def test_summarize_message_runs_off_the_event_loop(self) -> None:
+        """Test the blocking Gmail fetch does not run on the loop thread."""
+        threads = []
+
+        def get_message_text(message_id: str) -> str:
+            threads.append(threading.get_ident())
+            return 'Your statement is ready'
+
+        self.claw.gmail_client.get_message_text = get_message_text
+        self.claw.summaries.summarize_message = lambda text: f'Summary: {text}'
+
+        reply = asyncio.run(self.claw.summarize_message('msg1'))
+
+        self.assertEqual(reply, 'Summary: Your statement is ready')
+        self.assertNotEqual(threads, [threading.get_ident()])
+
+    def test_summarize_errors_are_friendly(self) -> None:
+        """Test quota and unexpected failures become user-facing messages."""
+        self.claw.gmail_client.get_message_text = MagicMock(side_effect=DeadlineExceeded('quota'))
+        self.claw.gmail_client.get_thread = MagicMock(side_effect=RuntimeError('boom'))
+
+        message_reply = asyncio.run(self.claw.summarize_message('msg1'))
+        thread_reply = asyncio.run(self.claw.summarize_thread('thread1'))
+
+        self.assertEqual(message_reply, "❌ Sorry, I couldn't reach Gmail right now. Try again in a moment?")
+        self.assertEqual(thread_reply, "❌ Something went wrong. Let me know if this keeps happening.")
+
+    def test_overdue_and_woken_mail_is_resurfaced(self) -> None:
+        """Test status timers notify the user with the emails concerned."""
+        self.claw.store.upsert_messages([make_message('msg1', 'Tax bill')])
+        self.claw.status.clock = lambda: 0.0
+        self.claw.status.transition('msg1', EmailStatus.SUMMARIZED)
+        self.claw.status.snooze('msg2', 10.0)
+        self.claw.status.clock = lambda: self.claw.status.response_deadline + 1
+
+        asyncio.run(self.claw.status.fire_and_notify())
+
+        self.assertEqual(self.notified, [
+            "⏰ Back from snooze:\n• Email msg2",
+            "⏰ Still waiting on you after 24h:\n• bank@example.com: Tax bill (msg1)",
+        ])
+
+    def test_start_runs_status_timers_until_stopped(self) -> None:
+        """Test start() launches the timer task and stop() ends it."""
+        async def run() -> tuple[bool, bool]:
+            await self.claw.start()
+            task = self.claw.status._task
+            running = task is not None and not task.done()
+            await self.claw.stop()
+            return running, task.done()
+
+        self.assertEqual(asyncio.run(run()), (True, True))
+
+    def test_shares_host_gmail_client_store_and_cache(self) -> None:
+        """Test an injected Gmail client brings its store and cache along."""
+        host = PersonalClaw(self.config, sync_engine=self.sync_engine, gmail=self.claw.gmail)
+
+        self.assertIs(host.gmail, self.claw.gmail)
+        self.assertIs(host.gmail_client, self.claw.gmail_client)
+        self.assertIs(host.store, self.claw.store)
+        self.assertIs(host.cache, self.claw.cache)
+        host.status.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
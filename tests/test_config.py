@@ -0,0 +1,77 @@
+"""Tests for configuration loading and the hot-reloadable config service."""
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+from unittest.mock import patch
+
+from src.config import ConfigService
+
+
+class TestConfigService(unittest.TestCase):
+    """Test ConfigService snapshots and reloads."""
+
+    def setUp(self) -> None:
+        """Write a temporary .env and isolate os.environ."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env_path = Path(self.tmp_dir.name) / '.env'
+        self.write_env(user_id='111')
+
+        self.env_patch = patch.dict(os.environ, {}, clear=True)
+        self.env_patch.start()
+
+    def tearDown(self) -> None:
+        """Restore environment and remove temp files."""
+        self.env_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def write_env(self, user_id: str, mtime: float | None = None) -> None:
+        """Write a .env file with the given allowlisted user ID."""
+        self.env_path.write_text(
+            f"DISCORD_BOT_TOKEN=token\nDISCORD_ALLOWLISTED_USER_ID={user_id}\n"
+        )
+        if mtime is not None:
+            os.utime(self.env_path, (mtime, mtime))
+
+    def test_get_returns_cached_snapshot(self) -> None:
+        """Test get() loads once and then returns the same immutable object."""
+        service = ConfigService(str(self.env_path))
+
+        first = service.get()
+        with patch('src.config.load_config') as mock_load_config:
+            second = service.get()
+
+        self.assertIs(first, second)
+        mock_load_config.assert_not_called()
+        self.assertEqual(first.discord_allowlisted_user_id, 111)
+        with self.assertRaises(FrozenInstanceError):
+            first.discord_allowlisted_user_id = 222  # type: ignore[misc]
+
+    def test_reload_if_changed_picks_up_new_env(self) -> None:
+        """Test a changed .env mtime swaps in a new snapshot."""
+        service = ConfigService(str(self.env_path))
+        service.get()
+
+        self.assertFalse(service.reload_if_changed())
+
+        self.write_env(user_id='222', mtime=self.env_path.stat().st_mtime + 10)
+
+        self.assertTrue(service.reload_if_changed())
+        self.assertEqual(service.get().discord_allowlisted_user_id, 222)
+
+    def test_invalid_reload_keeps_previous_snapshot(self) -> None:
+        """Test a broken .env does not replace a working config."""
+        service = ConfigService(str(self.env_path))
+        original = service.get()
+
+        self.write_env(user_id='not-a-number')
+
+        self.assertFalse(service.reload())
+        self.assertIs(service.get(), original)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Unit tests for the urgency-tiered digest scheduler."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.digest_scheduler import DigestScheduler, Urgency, classify_urgency
+
+
+def make_row(message_id: str, subject: str = 'Hello', labels: list[str] | None = None) -> dict:
+    """Build a stored message row."""
+    return {'id': message_id, 'from': 'bank@example.com', 'subject': subject, 'labels': labels or ['INBOX']}
+
+
+class TestDigestScheduler(unittest.TestCase):
+    """Test DigestScheduler with a fake clock."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp_dir.name) / 'digest.db')
+        self.now = 10_000.0
+        self.delivered: list[tuple[Urgency, list[str]]] = []
+        self.fail = False
+        self.scheduler = self.make_scheduler()
+
+    def tearDown(self) -> None:
+        """Close the database and remove temp files."""
+        self.scheduler.close()
+        self.tmp_dir.cleanup()
+
+    def make_scheduler(self) -> DigestScheduler:
+        async def deliver(tier: Urgency, items: list[dict]) -> None:
+            if self.fail:
+                raise RuntimeError("discord down")
+            self.delivered.append((tier, [item['id'] for item in items]))
+
+        return DigestScheduler(
+            deliver,
+            db_path=self.db_path,
+            windows={Urgency.NORMAL: 3600.0, Urgency.LOW: 86400.0},
+            clock=lambda: self.now,
+        )
+
+    def test_classify_urgency(self) -> None:
+        """Test tiers come from labels and subject words."""
+        self.assertEqual(classify_urgency(make_row('a', 'Payment OVERDUE')), Urgency.URGENT)
+        self.assertEqual(classify_urgency(make_row('b', labels=['INBOX', 'STARRED'])), Urgency.URGENT)
+        # Gmail marks most real mail IMPORTANT; it still goes in the digest
+        self.assertEqual(classify_urgency(make_row('e', labels=['INBOX', 'IMPORTANT'])), Urgency.NORMAL)
+        self.assertEqual(classify_urgency(make_row('c', labels=['CATEGORY_PROMOTIONS'])), Urgency.LOW)
+        self.assertEqual(classify_urgency(make_row('d')), Urgency.NORMAL)
+
+    def test_urgent_is_due_now_and_others_coalesce(self) -> None:
+        """Test non-urgent items in one window share a single delivery."""
+        self.scheduler.add_many([make_row('n1'), make_row('u1', 'Action required'), make_row('n2')])
+        self.now += 100
+        self.scheduler.add(make_row('n3'))
+
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(self.delivered, [(Urgency.URGENT, ['u1'])])
+        self.assertEqual(self.scheduler.next_due(), 10_800.0)
+
+        self.now = 10_800.0
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(self.delivered[1], (Urgency.NORMAL, ['n1', 'n2', 'n3']))
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_important_mail_is_batched(self) -> None:
+        """Test Gmail's IMPORTANT label alone waits for the digest window."""
+        self.scheduler.add_many([make_row('i1', labels=['INBOX', 'IMPORTANT']), make_row('n1')])
+
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(self.delivered, [])
+
+        self.now += 3600
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(self.delivered, [(Urgency.NORMAL, ['i1', 'n1'])])
+
+    def test_pending_items_survive_restart(self) -> None:
+        """Test a new scheduler on the same database picks up pending items."""
+        self.scheduler.add_many([make_row('n1'), make_row('l1', labels=['CATEGORY_UPDATES'])])
+        self.scheduler.close()
+
+        self.scheduler = self.make_scheduler()
+        self.now = 100_000.0
+        asyncio.run(self.scheduler.deliver_due())
+
+        self.assertEqual(self.delivered, [(Urgency.NORMAL, ['n1']), (Urgency.LOW, ['l1'])])
+
+    def test_failed_delivery_is_retried(self) -> None:
+        """Test items stay queued when delivery fails."""
+        self.scheduler.add(make_row('u1', 'Fraud alert'))
+        self.fail = True
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(len(self.scheduler), 1)
+
+        self.fail = False
+        self.now += 60
+        asyncio.run(self.scheduler.deliver_due())
+        self.assertEqual(self.delivered, [(Urgency.URGENT, ['u1'])])
+
+    def test_run_loop_delivers_urgent_immediately(self) -> None:
+        """Test the sleeping loop wakes for a newly added urgent item."""
+        async def run() -> None:
+            self.scheduler.start()
+            await asyncio.sleep(0.01)
+            self.scheduler.add(make_row('u1', 'Urgent'))
+            await asyncio.sleep(0.01)
+            await self.scheduler.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(self.delivered, [(Urgency.URGENT, ['u1'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
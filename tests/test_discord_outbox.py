@@ -0,0 +1,157 @@
+"""Unit tests for the outbound Discord message pipeline."""
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from src.discord_outbox import Outbox, split_message
+
+
+class FakeChannel:
+    """Messageable that records what was sent."""
+
+    def __init__(self, channel_id: int, fail: bool = False) -> None:
+        self.id = channel_id
+        self.fail = fail
+        self.sent: list[str] = []
+
+    async def send(self, text: str) -> None:
+        if self.fail:
+            raise RuntimeError("forbidden")
+        self.sent.append(text)
+
+
+class FakeUser:
+    """User whose DMs go through a separate channel object."""
+
+    def __init__(self, user_id: int, dm_channel: FakeChannel) -> None:
+        self.id = user_id
+        self.dm_channel = None
+        self._dm = dm_channel
+
+    async def create_dm(self) -> FakeChannel:
+        self.dm_channel = self._dm
+        return self._dm
+
+
+class TestSplitMessage(unittest.TestCase):
+    """Test splitting text for Discord's length limit."""
+
+    def test_short_text_is_one_chunk(self) -> None:
+        """Test text under the limit is unchanged."""
+        self.assertEqual(split_message("hello\nworld", limit=20), ["hello\nworld"])
+
+    def test_splits_on_line_boundaries(self) -> None:
+        """Test chunks break between lines and respect the limit."""
+        text = "\n".join(f"line {i:02d}" for i in range(10))
+
+        chunks = split_message(text, limit=25)
+
+        self.assertTrue(all(len(chunk) <= 25 for chunk in chunks))
+        self.assertEqual("\n".join(chunks), text)
+        self.assertEqual(chunks[0], "line 00\nline 01\nline 02")
+
+    def test_long_line_is_split_at_spaces(self) -> None:
+        """Test a single over-long line is broken up."""
+        chunks = split_message("word " * 20, limit=12)
+
+        self.assertTrue(all(len(chunk) <= 12 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), ["word"] * 20)
+
+
+class TestOutbox(unittest.TestCase):
+    """Test Outbox queueing with a fake clock and sleep."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+        async def fake_sleep(delay: float) -> None:
+            self.sleeps.append(delay)
+            self.now += delay
+
+        self.outbox = Outbox(limit=50, rate=1.0, burst=2, clock=lambda: self.now, sleep=fake_sleep)
+
+    def test_burst_is_coalesced(self) -> None:
+        """Test notifications sent together go out as one message."""
+        channel = FakeChannel(1)
+
+        async def run() -> None:
+            await asyncio.gather(*(self.outbox.send(channel, f"mail {i}") for i in range(5)))
+
+        asyncio.run(run())
+
+        self.assertEqual(channel.sent, ["mail 0\nmail 1\nmail 2\nmail 3\nmail 4"])
+
+    def test_long_reply_is_chunked_and_paced(self) -> None:
+        """Test long text is split and sends beyond the burst wait for the bucket."""
+        channel = FakeChannel(1)
+        text = "\n".join(f"message number {i}" for i in range(10))
+
+        asyncio.run(self.outbox.send(channel, text))
+
+        self.assertTrue(all(len(chunk) <= 50 for chunk in channel.sent))
+        self.assertEqual("\n".join(channel.sent), text)
+        # Burst of 2, then one per second
+        self.assertEqual(len(self.sleeps), len(channel.sent) - 2)
+        self.assertTrue(all(delay == 1.0 for delay in self.sleeps))
+
+    def test_channels_are_independent(self) -> None:
+        """Test each channel has its own queue."""
+        first, second = FakeChannel(1), FakeChannel(2)
+
+        async def run() -> None:
+            await asyncio.gather(self.outbox.send(first, "a"), self.outbox.send(second, "b"))
+
+        asyncio.run(run())
+
+        self.assertEqual((first.sent, second.sent), (["a"], ["b"]))
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_user_shares_queue_with_dm_channel(self) -> None:
+        """Test sends to a user and to its DM channel are coalesced together."""
+        dm = FakeChannel(10)
+        user = FakeUser(1, dm)
+
+        async def run() -> None:
+            await asyncio.gather(
+                self.outbox.send(dm, "reply"),
+                self.outbox.send(user, "digest"),
+                self.outbox.send(dm, "another reply"),
+            )
+
+        asyncio.run(run())
+
+        self.assertEqual(dm.sent, ["reply\ndigest\nanother reply"])
+        self.assertEqual(list(self.outbox._buckets), [10])
+
+    def test_cancelled_drain_releases_waiting_senders(self) -> None:
+        """Test senders awaiting a cancelled drain task are not left hanging."""
+        class SlowChannel(FakeChannel):
+            async def send(self, text: str) -> None:
+                await asyncio.sleep(10)
+
+        channel = SlowChannel(1)
+
+        async def run() -> list:
+            sends = [asyncio.ensure_future(self.outbox.send(channel, "a"))]
+            await asyncio.sleep(0.01)
+            sends.append(asyncio.ensure_future(self.outbox.send(channel, "b")))
+            await asyncio.sleep(0)
+            self.outbox._tasks[1].cancel()
+            return await asyncio.wait_for(asyncio.gather(*sends, return_exceptions=True), 1)
+
+        results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_send_errors_reach_the_caller(self) -> None:
+        """Test a failed send raises for the awaiting caller."""
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.outbox.send(FakeChannel(1, fail=True), "hello"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""Unit tests for the email status state machine store."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.email_status import EmailStatus, EmailStatusStore, InvalidTransition
+
+DAY = 24 * 3600.0
+
+
+class TestEmailStatusStore(unittest.TestCase):
+    """Test EmailStatusStore with a fake clock."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp_dir.name) / 'status.db')
+        self.now = 1_000_000.0
+        self.store = self.make_store()
+
+    def tearDown(self) -> None:
+        """Close the database and remove temp files."""
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def make_store(self, **kwargs) -> EmailStatusStore:
+        return EmailStatusStore(self.db_path, clock=lambda: self.now, **kwargs)
+
+    def test_track_and_transition(self) -> None:
+        """Test the happy path through the workflow is logged."""
+        self.assertEqual(self.store.track(['m1', 'm1']), 1)
+        for status in (EmailStatus.SUMMARIZED, EmailStatus.DRAFTED,
+                       EmailStatus.AWAITING_APPROVAL, EmailStatus.SENT):
+            self.store.transition('m1', status)
+
+        self.assertEqual(self.store.get('m1'), EmailStatus.SENT)
+        history = [(from_status, to_status) for from_status, to_status, _ in self.store.history('m1')]
+        self.assertEqual(history, [
+            (None, EmailStatus.NEW),
+            (EmailStatus.NEW, EmailStatus.SUMMARIZED),
+            (EmailStatus.SUMMARIZED, EmailStatus.DRAFTED),
+            (EmailStatus.DRAFTED, EmailStatus.AWAITING_APPROVAL),
+            (EmailStatus.AWAITING_APPROVAL, EmailStatus.SENT),
+        ])
+
+    def test_invalid_transition(self) -> None:
+        """Test moves outside the state machine are rejected."""
+        self.store.transition('m1', EmailStatus.SUMMARIZED)
+        self.store.transition('m1', EmailStatus.SENT)
+
+        with self.assertRaises(InvalidTransition):
+            self.store.transition('m1', EmailStatus.DRAFTED)
+        with self.assertRaises(InvalidTransition):
+            self.store.snooze('m1', self.now + 60)
+        with self.assertRaises(InvalidTransition):
+            self.store.transition('m2', EmailStatus.SNOOZED)
+
+    def test_overdue_after_deadline(self) -> None:
+        """Test waiting messages are reported once, after 24 hours."""
+        self.store.transition('m1', EmailStatus.SUMMARIZED)
+        self.now += 60
+        self.store.transition('m2', EmailStatus.SUMMARIZED)
+        self.store.transition('m3', EmailStatus.SUMMARIZED)
+        self.store.transition('m3', EmailStatus.SENT)
+
+        self.assertEqual(self.store.next_due(), 1_000_000.0 + DAY)
+        self.now += DAY - 30
+        self.assertEqual(self.store.fire_due(), (['m1'], []))
+        self.now += 60
+        self.assertEqual(self.store.fire_due(), (['m2'], []))
+        self.assertEqual(self.store.fire_due(), ([], []))
+        self.assertIsNone(self.store.next_due())
+
+    def test_waiting_query(self) -> None:
+        """Test waiting() lists unanswered messages oldest first."""
+        self.store.transition('m1', EmailStatus.SUMMARIZED)
+        self.now += 3600
+        self.store.transition('m2', EmailStatus.SUMMARIZED)
+        self.store.track(['m3'])
+
+        self.assertEqual(self.store.waiting(), ['m1', 'm2'])
+        self.assertEqual(self.store.waiting(older_than=1800), ['m1'])
+        self.assertEqual(self.store.with_status(EmailStatus.NEW), ['m3'])
+
+    def test_snooze_suspends_deadline_and_wakes(self) -> None:
+        """Test a snoozed message returns to its previous status on time."""
+        self.store.transition('m1', EmailStatus.SUMMARIZED)
+        self.store.snooze('m1', self.now + 3600)
+        self.store.snooze('m1', self.now + 7200)
+
+        self.now += 3600
+        self.assertEqual(self.store.fire_due(), ([], []))
+        self.now += 3600
+        self.assertEqual(self.store.fire_due(), ([], ['m1']))
+        self.assertEqual(self.store.get('m1'), EmailStatus.SUMMARIZED)
+        # Back in a waiting status: the deadline restarts from the wake-up
+        self.assertEqual(self.store.next_due(), self.now + DAY)
+
+    def test_acting_cancels_snooze(self) -> None:
+        """Test moving a snoozed message on cancels its wake-up."""
+        self.store.snooze('m1', self.now + 60)
+        self.store.transition('m1', EmailStatus.DRAFTED)
+
+        self.now += 120
+        self.assertEqual(self.store.fire_due(), ([], []))
+        self.assertEqual(self.store.get('m1'), EmailStatus.DRAFTED)
+
+    def test_timers_survive_restart(self) -> None:
+        """Test deadlines and snoozes are rebuilt from SQLite."""
+        self.store.transition('m1', EmailStatus.SUMMARIZED)
+        self.store.snooze('m2', self.now + 60)
+        self.store.close()
+
+        self.store = self.make_store()
+        self.now += DAY
+        self.assertEqual(self.store.fire_due(), (['m1'], ['m2']))
+        self.assertEqual(self.store.get('m2'), EmailStatus.NEW)
+
+    def test_timer_task_notifies(self) -> None:
+        """Test the timer task fires callbacks without polling."""
+        overdue: list[str] = []
+        woken: list[str] = []
+
+        async def on_overdue(message_ids: list[str]) -> None:
+            overdue.extend(message_ids)
+
+        async def on_wake(message_ids: list[str]) -> None:
+            woken.extend(message_ids)
+
+        async def run() -> None:
+            store = EmailStatusStore(':memory:', response_deadline=0.05, on_overdue=on_overdue, on_wake=on_wake)
+            store.start()
+            store.transition('m1', EmailStatus.SUMMARIZED)
+            store.snooze('m2', store.clock() + 0.02)
+            await asyncio.sleep(0.2)
+            await store.stop()
+            store.close()
+
+        asyncio.run(run())
+        self.assertEqual(overdue, ['m1'])
+        self.assertEqual(woken, ['m2'])
+
+    def test_transition_from_worker_thread_wakes_timer_task(self) -> None:
+        """Test a deadline armed off the loop thread still fires on time."""
+        overdue: list[str] = []
+
+        async def on_overdue(message_ids: list[str]) -> None:
+            overdue.extend(message_ids)
+
+        async def run() -> None:
+            store = EmailStatusStore(':memory:', response_deadline=0.05, on_overdue=on_overdue)
+            store.start()
+            await asyncio.sleep(0)
+            await asyncio.get_running_loop().run_in_executor(None, store.transition, 'm1', EmailStatus.SUMMARIZED)
+            await asyncio.sleep(0.2)
+            await store.stop()
+            store.close()
+
+        asyncio.run(run())
+        self.assertEqual(overdue, ['m1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,46 @@ from __future__ import annotations
 import unittest
 from unittest.mock import MagicMock, Mock, patch
 
+from googleapiclient.errors import HttpError
+
 from src.config import Config
-from src.gmail_client import GmailClient
+from src.gmail_client import BATCH_SIZE_LIMIT, LIST_PAGE_LIMIT, PROJECTIONS, GmailClient
+from src.message_cache import MessageCache
+from src.message_store import MessageStore
+
+
+class FakeBatch:
+    """Stand-in for BatchHttpRequest that answers from a response table."""
+    
+    def __init__(self, callback, responses, executed) -> None:
+        self.callback = callback
+        self.responses = responses
+        self.executed = executed
+        self.request_ids: list[str] = []
+    
+    def add(self, request, request_id) -> None:
+        self.request_ids.append(request_id)
+    
+    def execute(self, http=None) -> None:
+        self.executed.append(list(self.request_ids))
+        # Answer out of order, like the real batch endpoint may
+        for request_id in reversed(self.request_ids):
+            response = self.responses[request_id]
+            if isinstance(response, list):
+                # Sequence of responses for successive attempts
+                response = response.pop(0)
+            if isinstance(response, Exception):
+                self.callback(request_id, None, response)
+            else:
+                self.callback(request_id, response, None)
+
+
+def make_http_error(status: int) -> HttpError:
+    """Build an HttpError with the given status code."""
+    resp = Mock()
+    resp.status = status
+    resp.reason = 'error'
+    return HttpError(resp, b'{}')
 
 
 class TestGmailClient(unittest.TestCase):
@@ -20,6 +58,9 @@ class TestGmailClient(unittest.TestCase):
         self.config = Mock(spec=Config)
         self.config.gmail_credentials_path = "fake_credentials.json"
         self.config.gmail_token_path = "fake_token.json"
+        self.config.token_refresh_margin = 300.0
+        self.config.gmail_pool_size = 2
+        self.config.gmail_quota_units_per_second = 250.0
         
         # Patch TokenManager to avoid real OAuth
         self.token_manager_patch = patch('src.gmail_client.TokenManager')
@@ -35,6 +76,13 @@ class TestGmailClient(unittest.TestCase):
         self.mock_build = self.build_patch.start()
         self.mock_service = MagicMock()
         self.mock_build.return_value = self.mock_service
+        
+        # Route batch requests through FakeBatch
+        self.batch_responses: dict = {}
+        self.executed_batches: list = []
+        self.mock_service.new_batch_http_request.side_effect = (
+            lambda callback: FakeBatch(callback, self.batch_responses, self.executed_batches)
+        )
     
     def tearDown(self) -> None:
         """Clean up patches."""
@@ -48,7 +96,8 @@ class TestGmailClient(unittest.TestCase):
         # Should create TokenManager with correct paths
         self.mock_token_manager_class.assert_called_once_with(
             credentials_path=self.config.gmail_credentials_path,
-            token_path=self.config.gmail_token_path
+            token_path=self.config.gmail_token_path,
+            refresh_margin=self.config.token_refresh_margin,
         )
         
         # Service should not be built yet (lazy connection)
@@ -63,7 +112,12 @@ class TestGmailClient(unittest.TestCase):
         
         # Should get credentials and build service
         self.mock_token_manager.get_credentials.assert_called_once()
-        self.mock_build.assert_called_once_with('gmail', 'v1', credentials=self.mock_creds)
+        self.mock_build.assert_called_once_with(
+            'gmail', 'v1',
+            credentials=self.mock_creds,
+            static_discovery=True,
+            cache_discovery=False,
+        )
     
     def test_ensure_connected_reuses_service(self) -> None:
         """Test that _ensure_connected doesn't rebuild if already connected."""
@@ -76,6 +130,16 @@ class TestGmailClient(unittest.TestCase):
         # Should only build service once
         self.mock_build.assert_called_once()
     
+    def test_warm_up_connects_and_probes(self) -> None:
+        """Test warm_up builds the service and opens a connection."""
+        client = GmailClient(self.config)
+        self.mock_service.users().getProfile().execute.return_value = {'historyId': '1'}
+        
+        client.warm_up()
+        
+        self.assertTrue(client.is_connected())
+        self.mock_service.users().getProfile.assert_called_with(userId='me')
+    
     def test_list_messages(self) -> None:
         """Test list_messages calls Gmail API correctly."""
         client = GmailClient(self.config)
@@ -115,6 +179,47 @@ class TestGmailClient(unittest.TestCase):
         # Should return empty list
         self.assertEqual(messages, [])
     
+    def test_list_messages_page_caps_page_size(self) -> None:
+        """Test page sizes above Gmail's limit are clamped."""
+        client = GmailClient(self.config)
+        self.mock_service.users().messages().list().execute.return_value = {}
+        
+        client.list_messages_page('', page_size=5000)
+        
+        last_call = self.mock_service.users().messages().list.call_args.kwargs
+        self.assertEqual(last_call['maxResults'], LIST_PAGE_LIMIT)
+    
+    def test_iter_messages_follows_page_tokens(self) -> None:
+        """Test iter_messages yields every page in order."""
+        client = GmailClient(self.config)
+        self.mock_service.users().messages().list().execute.side_effect = [
+            {'messages': [{'id': 'msg1'}, {'id': 'msg2'}], 'nextPageToken': 'page2'},
+            {'messages': [{'id': 'msg3'}]},
+        ]
+        
+        messages = list(client.iter_messages('is:unread', page_size=2))
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2', 'msg3'])
+        last_call = self.mock_service.users().messages().list.call_args.kwargs
+        self.assertEqual(last_call['pageToken'], 'page2')
+        self.assertEqual(last_call['q'], 'is:unread')
+    
+    def test_iter_messages_stops_early(self) -> None:
+        """Test closing the iterator stops fetching after the prefetched page."""
+        client = GmailClient(self.config)
+        pages = [
+            {'messages': [{'id': f'msg{i}'}], 'nextPageToken': f'page{i + 1}'}
+            for i in range(10)
+        ]
+        self.mock_service.users().messages().list().execute.side_effect = pages
+        
+        iterator = client.iter_messages(page_size=1)
+        first = next(iterator)
+        iterator.close()
+        
+        self.assertEqual(first['id'], 'msg0')
+        self.assertLessEqual(client.scheduler.stats.units_by_method['messages.list'], 10)
+    
     def test_get_message(self) -> None:
         """Test get_message calls Gmail API correctly."""
         client = GmailClient(self.config)
@@ -140,6 +245,237 @@ class TestGmailClient(unittest.TestCase):
         # Verify result
         self.assertEqual(message['id'], 'msg1')
     
+    def test_get_message_with_projection(self) -> None:
+        """Test a named projection sets metadataHeaders and the fields mask."""
+        client = GmailClient(self.config)
+        self.mock_service.users().messages().get().execute.return_value = {'id': 'msg1'}
+        
+        client.get_message('msg1', projection='triage')
+        
+        kwargs = self.mock_service.users().messages().get.call_args.kwargs
+        self.assertEqual(kwargs['format'], 'metadata')
+        self.assertIn('List-Unsubscribe', kwargs['metadataHeaders'])
+        self.assertEqual(kwargs['fields'], PROJECTIONS['triage'].fields)
+        self.assertNotIn('parts', kwargs['fields'])
+    
+    def test_get_message_unknown_projection(self) -> None:
+        """Test an unknown projection name is rejected before any call."""
+        client = GmailClient(self.config)
+        
+        with self.assertRaises(ValueError):
+            client.get_message('msg1', projection='everything')
+    
+    def test_list_messages_fields_mask(self) -> None:
+        """Test list_messages passes a fields mask through."""
+        client = GmailClient(self.config)
+        self.mock_service.users().messages().list().execute.return_value = {}
+        
+        client.list_messages(fields='messages/id')
+        
+        self.assertEqual(self.mock_service.users().messages().list.call_args.kwargs['fields'], 'messages/id')
+    
+    def test_get_inbox_counters_uses_label(self) -> None:
+        """Test counters come from labels.get and are reused while fresh."""
+        client = GmailClient(self.config)
+        labels_get = self.mock_service.users().labels().get
+        labels_get().execute.return_value = {
+            'id': 'INBOX',
+            'messagesTotal': 12345,
+            'messagesUnread': 7,
+            'threadsTotal': 9000,
+            'threadsUnread': 5,
+        }
+        labels_get.reset_mock()
+        
+        first = client.get_inbox_counters()
+        second = client.get_inbox_counters()
+        
+        self.assertEqual(first.messages_total, 12345)
+        self.assertEqual(first.threads_unread, 5)
+        self.assertIs(first, second)
+        labels_get.assert_called_once_with(userId='me', id='INBOX')
+        self.assertEqual(client.scheduler.stats.units_by_method['labels.get'], 1)
+    
+    def test_get_inbox_counters_refetches_when_stale(self) -> None:
+        """Test an expired or invalidated snapshot is refetched."""
+        client = GmailClient(self.config)
+        self.mock_service.users().labels().get().execute.side_effect = [
+            {'messagesTotal': 1},
+            {'messagesTotal': 2},
+            {'messagesTotal': 3},
+        ]
+        
+        client.get_inbox_counters()
+        self.assertEqual(client.get_inbox_counters(max_age=0).messages_total, 2)
+        client.invalidate_counters()
+        self.assertEqual(client.get_inbox_counters().messages_total, 3)
+    
+    def test_get_thread_indexes_conversation(self) -> None:
+        """Test one threads.get call fetches and indexes a whole thread."""
+        store = MessageStore(':memory:')
+        client = GmailClient(self.config, store=store)
+        threads_get = self.mock_service.users().threads().get
+        threads_get().execute.return_value = {
+            'id': 'thread1',
+            'historyId': '42',
+            'messages': [
+                {'id': 'msg1', 'threadId': 'thread1', 'payload': {'headers': [
+                    {'name': 'From', 'value': 'bank@example.com'},
+                    {'name': 'To', 'value': 'me@example.com'},
+                ]}},
+                {'id': 'msg2', 'threadId': 'thread1', 'payload': {'headers': [
+                    {'name': 'From', 'value': 'me@example.com'},
+                ]}},
+            ],
+        }
+        threads_get.reset_mock()
+        
+        thread = client.get_thread('thread1')
+        
+        self.assertEqual(len(thread['messages']), 2)
+        kwargs = threads_get.call_args.kwargs
+        self.assertEqual(kwargs['format'], 'metadata')
+        self.assertIn('Cc', kwargs['metadataHeaders'])
+        self.assertTrue(kwargs['fields'].startswith('id,historyId,messages('))
+        self.assertEqual(client.scheduler.stats.units_by_method['threads.get'], 10)
+        
+        indexed = store.get_thread('thread1')
+        self.assertEqual(indexed['message_ids'], ['msg1', 'msg2'])
+        self.assertEqual(indexed['participants'], ['bank@example.com', 'me@example.com'])
+    
+    def test_get_messages_batch_preserves_order(self) -> None:
+        """Test batch results come back in input order."""
+        client = GmailClient(self.config)
+        
+        for message_id in ('msg1', 'msg2', 'msg3'):
+            self.batch_responses[message_id] = {'id': message_id}
+        
+        messages = client.get_messages_batch(['msg1', 'msg2', 'msg3'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2', 'msg3'])
+        self.assertEqual(self.executed_batches, [['msg1', 'msg2', 'msg3']])
+    
+    def test_get_messages_batch_dedupes_ids(self) -> None:
+        """Test repeated IDs are fetched once and mapped back to each position."""
+        client = GmailClient(self.config)
+        
+        for message_id in ('msg1', 'msg2'):
+            self.batch_responses[message_id] = {'id': message_id}
+        
+        messages = client.get_messages_batch(['msg1', 'msg2', 'msg1'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2', 'msg1'])
+        self.assertEqual(self.executed_batches, [['msg1', 'msg2']])
+    
+    def test_get_messages_batch_skips_failed_items(self) -> None:
+        """Test per-message errors are skipped, not raised."""
+        client = GmailClient(self.config)
+        
+        self.batch_responses['msg1'] = {'id': 'msg1'}
+        self.batch_responses['msg2'] = make_http_error(404)
+        self.batch_responses['msg3'] = {'id': 'msg3'}
+        
+        messages = client.get_messages_batch(['msg1', 'msg2', 'msg3'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg3'])
+    
+    def test_get_messages_batch_retries_throttled_items(self) -> None:
+        """Test items rate-limited inside a batch are retried in a new batch."""
+        client = GmailClient(self.config)
+        client.scheduler.sleep = lambda delay: None
+        
+        self.batch_responses['msg1'] = {'id': 'msg1'}
+        self.batch_responses['msg2'] = [make_http_error(429), {'id': 'msg2'}]
+        
+        messages = client.get_messages_batch(['msg1', 'msg2'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2'])
+        self.assertEqual(self.executed_batches, [['msg1', 'msg2'], ['msg2']])
+        self.assertEqual(client.scheduler.stats.units_spent, 15)
+    
+    def test_get_messages_batch_splits_large_lists(self) -> None:
+        """Test ID lists over the batch limit are split into several batches."""
+        client = GmailClient(self.config)
+        
+        ids = [f'msg{i}' for i in range(BATCH_SIZE_LIMIT + 5)]
+        for message_id in ids:
+            self.batch_responses[message_id] = {'id': message_id}
+        
+        messages = client.get_messages_batch(ids)
+        
+        self.assertEqual(len(messages), len(ids))
+        self.assertEqual([len(b) for b in self.executed_batches], [BATCH_SIZE_LIMIT, 5])
+    
+    def test_get_messages_batch_serves_cached_messages(self) -> None:
+        """Test cached messages are not downloaded again."""
+        client = GmailClient(self.config, cache=MessageCache())
+        
+        for message_id in ('msg1', 'msg2'):
+            self.batch_responses[message_id] = {'id': message_id, 'labelIds': ['INBOX']}
+        client.get_messages_batch(['msg1'])
+        
+        messages = client.get_messages_batch(['msg1', 'msg2'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2'])
+        self.assertEqual(self.executed_batches, [['msg1'], ['msg2']])
+    
+    def test_get_messages_batch_refreshes_stale_labels(self) -> None:
+        """Test invalidated labels are refetched without the content."""
+        cache = MessageCache()
+        client = GmailClient(self.config, cache=cache)
+        cache.put({'id': 'msg1', 'snippet': 'hello', 'labelIds': ['INBOX', 'UNREAD']}, 'full')
+        cache.invalidate_labels(['msg1'])
+        self.batch_responses['msg1'] = {'id': 'msg1', 'labelIds': ['INBOX']}
+        
+        messages = client.get_messages_batch(['msg1'], format='full')
+        
+        self.assertEqual(messages[0]['snippet'], 'hello')
+        self.assertEqual(messages[0]['labelIds'], ['INBOX'])
+        self.assertEqual(self.executed_batches, [['msg1']])
+        self.assertEqual(
+            self.mock_service.users().messages().get.call_args.kwargs['format'], 'minimal'
+        )
+    
+    def test_requests_execute_on_pooled_connection(self) -> None:
+        """Test API calls use a pooled Http rather than the service's own."""
+        client = GmailClient(self.config)
+        self.mock_service.users().messages().get().execute.return_value = {'id': 'msg1'}
+        
+        client.get_message('msg1')
+        
+        http = self.mock_service.users().messages().get().execute.call_args[1]['http']
+        with client.transport.connection() as pooled:
+            self.assertIs(http, pooled)
+    
+    def test_calls_are_retried_and_metered(self) -> None:
+        """Test retryable errors are retried and quota units counted."""
+        client = GmailClient(self.config)
+        client.scheduler.sleep = lambda delay: None
+        self.mock_service.users().messages().list().execute.side_effect = [
+            make_http_error(503),
+            {'messages': [{'id': 'msg1'}]},
+        ]
+        
+        messages = client.list_messages()
+        
+        self.assertEqual(messages, [{'id': 'msg1'}])
+        self.assertEqual(client.scheduler.stats.retries, 1)
+        self.assertEqual(client.scheduler.stats.units_by_method['messages.list'], 10)
+    
+    def test_get_messages_parallel(self) -> None:
+        """Test parallel fetches keep input order and skip failures."""
+        client = GmailClient(self.config)
+        
+        def fake_get_message(message_id, format='full'):
+            if message_id == 'bad':
+                raise make_http_error(404)
+            return {'id': message_id}
+        
+        with patch.object(client, 'get_message', side_effect=fake_get_message):
+            messages = client.get_messages_parallel(['msg1', 'bad', 'msg2', 'msg3'])
+        
+        self.assertEqual([m['id'] for m in messages], ['msg1', 'msg2', 'msg3'])
+    
     def test_get_inbox_summary(self) -> None:
         """Test get_inbox_summary returns correct structure."""
         client = GmailClient(self.config)
@@ -149,8 +485,8 @@ class TestGmailClient(unittest.TestCase):
             'messages': [{'id': 'msg1', 'threadId': 'thread1'}]
         }
         
-        # Mock get_message response
-        self.mock_service.users().messages().get().execute.return_value = {
+        # Mock batched get_message response
+        self.batch_responses['msg1'] = {
             'id': 'msg1',
             'payload': {
                 'headers': [
@@ -168,6 +504,82 @@ class TestGmailClient(unittest.TestCase):
         self.assertEqual(len(summary['messages']), 1)
         self.assertEqual(summary['messages'][0]['subject'], 'Test Email')
         self.assertEqual(summary['messages'][0]['from'], 'sender@example.com')
+        
+        # One batch round trip for the metadata
+        self.assertEqual(self.executed_batches, [['msg1']])
+
+    
+    def test_get_inbox_summary_repeat_uses_cache(self) -> None:
+        """Test a repeated summary makes no further message downloads."""
+        client = GmailClient(self.config, cache=MessageCache())
+        
+        self.mock_service.users().messages().list().execute.return_value = {
+            'messages': [{'id': 'msg1', 'threadId': 'thread1'}]
+        }
+        self.batch_responses['msg1'] = {
+            'id': 'msg1',
+            'labelIds': ['INBOX'],
+            'payload': {'headers': [{'name': 'Subject', 'value': 'Test Email'}]},
+        }
+        
+        first = client.get_inbox_summary()
+        second = client.get_inbox_summary()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.executed_batches, [['msg1']])
+    
+    def test_get_inbox_summary_fills_store(self) -> None:
+        """Test only messages missing from the store are fetched."""
+        store = MessageStore(':memory:')
+        store.upsert_messages([{
+            'id': 'msg1',
+            'labelIds': ['INBOX'],
+            'payload': {'headers': [{'name': 'Subject', 'value': 'Stored'}]},
+        }])
+        client = GmailClient(self.config, store=store)
+        
+        self.mock_service.users().messages().list().execute.return_value = {
+            'messages': [{'id': 'msg1'}, {'id': 'msg2'}]
+        }
+        self.batch_responses['msg2'] = {
+            'id': 'msg2',
+            'labelIds': ['INBOX'],
+            'payload': {'headers': [{'name': 'Subject', 'value': 'Fetched'}]},
+        }
+        
+        summary = client.get_inbox_summary()
+        
+        self.assertEqual(self.executed_batches, [['msg2']])
+        self.assertEqual([m['subject'] for m in summary['messages']], ['Stored', 'Fetched'])
+        self.assertEqual(store.count_messages('INBOX'), 2)
+    
+    def test_get_inbox_summary_served_from_store_when_gmail_down(self) -> None:
+        """Test the store answers when Gmail returns an error."""
+        store = MessageStore(':memory:')
+        store.upsert_messages([{
+            'id': 'msg1',
+            'labelIds': ['INBOX'],
+            'payload': {'headers': [{'name': 'From', 'value': 'bank@example.com'}]},
+        }])
+        client = GmailClient(self.config, store=store)
+        client.scheduler.sleep = lambda delay: None
+        self.mock_service.users().messages().list().execute.side_effect = make_http_error(503)
+        
+        summary = client.get_inbox_summary()
+        
+        self.assertEqual(summary['message_count'], 1)
+        self.assertEqual(summary['messages'][0]['from'], 'bank@example.com')
+    
+    def test_get_inbox_summary_cached_skips_gmail(self) -> None:
+        """Test cached summaries make no Gmail calls when the store has data."""
+        store = MessageStore(':memory:')
+        store.upsert_messages([{'id': 'msg1', 'labelIds': ['INBOX']}])
+        client = GmailClient(self.config, store=store)
+        
+        summary = client.get_inbox_summary(cached=True)
+        
+        self.assertEqual(summary['message_count'], 1)
+        self.mock_build.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+"""Unit tests for the pooled Gmail HTTP transport."""
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.gmail_transport import HttpPool
+
+
+class TestHttpPool(unittest.TestCase):
+    """Test HttpPool checkout, reuse and bounds."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.credentials = Mock(return_value=Mock())
+
+    def test_connections_are_reused(self) -> None:
+        """Test a returned connection is handed out again (keep-alive reuse)."""
+        pool = HttpPool(self.credentials, size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.credentials.assert_called_once()
+
+    def test_concurrent_workers_get_distinct_connections(self) -> None:
+        """Test connections in use are never shared between threads."""
+        pool = HttpPool(self.credentials, size=3)
+        barrier = threading.Barrier(3)
+        seen = []
+
+        def worker() -> None:
+            with pool.connection() as http:
+                seen.append(http)
+                barrier.wait(timeout=1)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(http) for http in seen}), 3)
+
+    def test_pool_size_is_bounded(self) -> None:
+        """Test callers wait for a free connection once the pool is full."""
+        pool = HttpPool(self.credentials, size=1)
+        acquired = threading.Event()
+        order = []
+
+        def holder() -> None:
+            with pool.connection():
+                acquired.set()
+                time.sleep(0.1)
+                order.append('released')
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        acquired.wait(1)
+        with pool.connection():
+            order.append('acquired')
+        thread.join()
+
+        self.assertEqual(order, ['released', 'acquired'])
+        self.assertEqual(self.credentials.call_count, 1)
+
+    def test_invalid_size(self) -> None:
+        """Test a pool needs at least one connection."""
+        with self.assertRaises(ValueError):
+            HttpPool(self.credentials, size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Unit tests for message body extraction."""
+from __future__ import annotations
+
+import base64
+import unittest
+
+from src.message_body import (
+    HTML_BYTE_LIMIT,
+    decode_part,
+    extract_body,
+    find_text_part,
+    html_to_text,
+)
+
+
+def encode(text: str, charset: str = 'utf-8') -> str:
+    """Base64url-encode text the way Gmail does (no padding)."""
+    return base64.urlsafe_b64encode(text.encode(charset)).decode().rstrip('=')
+
+
+def make_part(mime_type: str, text: str = '', filename: str = '', charset: str = 'utf-8') -> dict:
+    """Build a leaf message part."""
+    return {
+        'mimeType': mime_type,
+        'filename': filename,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}],
+        'body': {'data': encode(text, charset)} if text else {'attachmentId': 'att1'},
+    }
+
+
+class TestMessageBody(unittest.TestCase):
+    """Test part selection, decoding and HTML conversion."""
+
+    def test_prefers_plain_text_depth_first(self) -> None:
+        """Test the first text/plain part in a nested tree is chosen."""
+        payload = {
+            'mimeType': 'multipart/mixed',
+            'parts': [
+                {
+                    'mimeType': 'multipart/alternative',
+                    'parts': [
+                        make_part('text/html', '<p>html</p>'),
+                        make_part('text/plain', 'plain'),
+                    ],
+                },
+                make_part('text/plain', 'notes', filename='notes.txt'),
+                make_part('application/pdf', filename='statement.pdf'),
+            ],
+        }
+
+        self.assertEqual(decode_part(find_text_part(payload)), b'plain')
+
+    def test_falls_back_to_html(self) -> None:
+        """Test HTML-only messages are converted to text."""
+        message = {
+            'payload': {
+                'mimeType': 'multipart/related',
+                'parts': [
+                    make_part(
+                        'text/html',
+                        '<html><head><style>p {color: red}</style></head>'
+                        '<body><p>Balance:&nbsp;<b>$1,234</b></p><p>Due 1 May</p>'
+                        '<script>track()</script></body></html>',
+                    ),
+                    make_part('image/png', filename='logo.png'),
+                ],
+            }
+        }
+
+        self.assertEqual(extract_body(message), 'Balance: $1,234\n\nDue 1 May')
+
+    def test_decode_part_stops_at_max_bytes(self) -> None:
+        """Test only the requested prefix is decoded."""
+        part = make_part('text/plain', 'abcdefghij' * 1000)
+
+        self.assertEqual(decode_part(part, 7), b'abcdefg')
+
+    def test_output_is_capped(self) -> None:
+        """Test large bodies are truncated to max_chars."""
+        plain = {'payload': make_part('text/plain', 'word ' * 100_000)}
+        html = {'payload': make_part('text/html', '<p>word</p>' * 100_000)}
+
+        self.assertLessEqual(len(extract_body(plain, max_chars=100)), 100)
+        self.assertLessEqual(len(extract_body(html, max_chars=100)), 100)
+
+    def test_html_to_text_stops_early(self) -> None:
+        """Test conversion keeps at most max_chars of collected text."""
+        text = html_to_text('<div>x</div>' * 100_000, max_chars=50)
+
+        self.assertLessEqual(len(text), 60)
+
+    def test_large_head_does_not_hide_html_body(self) -> None:
+        """Test markup in head/style is not charged against the text budget."""
+        style = '<style>' + '.c { color: red; }\n' * 5000 + '</style>'
+        html = f'<html><head>{style}</head><body><p>Payment received</p></body></html>'
+        message = {'payload': make_part('text/html', html)}
+
+        self.assertEqual(extract_body(message, max_chars=100), 'Payment received')
+
+    def test_html_decoding_stops_at_byte_limit(self) -> None:
+        """Test text past HTML_BYTE_LIMIT of markup is never decoded."""
+        html = '<script>' + 'x' * (HTML_BYTE_LIMIT + 1000) + '</script><p>late</p>'
+        message = {'snippet': 'snippet', 'payload': make_part('text/html', html)}
+
+        self.assertEqual(extract_body(message), 'snippet')
+
+    def test_charset_is_honored(self) -> None:
+        """Test non-UTF-8 parts are decoded with their declared charset."""
+        message = {'payload': make_part('text/plain', 'Café', charset='iso-8859-1')}
+
+        self.assertEqual(extract_body(message), 'Café')
+
+    def test_no_text_part_uses_snippet(self) -> None:
+        """Test messages without inline text fall back to the snippet."""
+        message = {
+            'snippet': 'Your statement is attached',
+            'payload': make_part('application/pdf', filename='statement.pdf'),
+        }
+
+        self.assertEqual(extract_body(message), 'Your statement is attached')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Unit tests for the message fetch cache."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.message_cache import MessageCache
+
+
+def make_message(message_id: str, labels: list[str], size: int = 10) -> dict:
+    """Build a Gmail message resource with a body of roughly size bytes."""
+    return {
+        'id': message_id,
+        'threadId': f'thread-{message_id}',
+        'labelIds': labels,
+        'snippet': 'x' * size,
+    }
+
+
+class TestMessageCache(unittest.TestCase):
+    """Test MessageCache in memory and with a disk tier."""
+
+    def test_hit_returns_content_and_labels(self) -> None:
+        """Test a cached message comes back with its labels."""
+        cache = MessageCache()
+        cache.put(make_message('msg1', ['INBOX']), 'full')
+
+        message = cache.get('msg1', 'full')
+
+        self.assertEqual(message['snippet'], 'x' * 10)
+        self.assertEqual(message['labelIds'], ['INBOX'])
+        self.assertEqual(cache.stats.hits, 1)
+
+    def test_keys_include_format_and_headers(self) -> None:
+        """Test different formats and header projections are cached apart."""
+        cache = MessageCache()
+        cache.put(make_message('msg1', ['INBOX']), 'metadata', ['From', 'Subject'])
+
+        self.assertIsNotNone(cache.get('msg1', 'metadata', ['subject', 'from']))
+        self.assertIsNone(cache.get('msg1', 'metadata', ['From']))
+        self.assertIsNone(cache.get('msg1', 'full'))
+
+    def test_invalidate_labels_keeps_content(self) -> None:
+        """Test a label change drops labels only, and set_labels restores them."""
+        cache = MessageCache()
+        cache.put(make_message('msg1', ['INBOX', 'UNREAD']), 'full')
+
+        cache.invalidate_labels(['msg1'])
+        message = cache.get('msg1', 'full')
+        self.assertNotIn('labelIds', message)
+        self.assertFalse(cache.has_labels('msg1'))
+
+        cache.set_labels('msg1', ['INBOX'])
+        self.assertEqual(cache.get('msg1', 'full')['labelIds'], ['INBOX'])
+
+    def test_returned_messages_are_copies(self) -> None:
+        """Test callers mutating a result don't change the cache."""
+        cache = MessageCache()
+        cache.put(make_message('msg1', ['INBOX']), 'full')
+
+        cache.get('msg1', 'full')['snippet'] = 'changed'
+
+        self.assertEqual(cache.get('msg1', 'full')['snippet'], 'x' * 10)
+
+    def test_evicts_least_recently_used_within_budget(self) -> None:
+        """Test memory stays under max_bytes by evicting the oldest entry."""
+        cache = MessageCache(max_bytes=1000)
+        for message_id in ('msg1', 'msg2', 'msg3'):
+            cache.put(make_message(message_id, [], size=50), 'full')
+        cache.get('msg1', 'full')
+
+        for i in range(10):
+            cache.put(make_message(f'new{i}', [], size=50), 'full')
+
+        self.assertLessEqual(cache.size_bytes, 1000)
+        self.assertGreater(cache.stats.evictions, 0)
+        self.assertIsNone(cache.get('msg2', 'full'))
+
+    def test_labels_evicted_with_content(self) -> None:
+        """Test labels don't outlive the content they belong to."""
+        cache = MessageCache(max_bytes=1000)
+        for i in range(50):
+            cache.put(make_message(f'msg{i}', ['INBOX'], size=50), 'full')
+
+        self.assertFalse(cache.has_labels('msg0'))
+        self.assertTrue(cache.has_labels('msg49'))
+        self.assertLessEqual(len(cache._labels), len(cache._keys_by_id))
+
+        cache.set_labels('msg0', ['INBOX'])
+        self.assertFalse(cache.has_labels('msg0'))
+
+    def test_disk_tier_bounded(self) -> None:
+        """Test the disk tier deletes least recently used files over budget."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = MessageCache(disk_dir=tmp_dir, max_disk_bytes=500)
+            for i in range(20):
+                cache.put(make_message(f'msg{i}', [], size=50), 'full')
+
+            sizes = [path.stat().st_size for path in Path(tmp_dir).glob('*.json')]
+            self.assertLessEqual(sum(sizes), 500)
+            self.assertIsNone(MessageCache(disk_dir=tmp_dir).get('msg0', 'full'))
+            self.assertIsNotNone(MessageCache(disk_dir=tmp_dir).get('msg19', 'full'))
+
+            # Reopening with a smaller budget prunes right away
+            MessageCache(disk_dir=tmp_dir, max_disk_bytes=100)
+            sizes = [path.stat().st_size for path in Path(tmp_dir).glob('*.json')]
+            self.assertLessEqual(sum(sizes), 100)
+
+    def test_untracked_disk_hits_are_budgeted(self) -> None:
+        """Test files written by another instance count against the budget."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = MessageCache(disk_dir=tmp_dir, max_disk_bytes=10_000)
+            MessageCache(disk_dir=tmp_dir).put(make_message('msg1', [], size=50), 'full')
+
+            self.assertIsNotNone(cache.get('msg1', 'full'))
+            size = next(Path(tmp_dir).glob('*.json')).stat().st_size
+            self.assertEqual(cache._disk_bytes, size)
+
+    def test_remove_drops_all_formats(self) -> None:
+        """Test deleted messages are gone from every format."""
+        cache = MessageCache()
+        cache.put(make_message('msg1', ['INBOX']), 'full')
+        cache.put(make_message('msg1', ['INBOX']), 'minimal')
+
+        cache.remove(['msg1'])
+
+        self.assertIsNone(cache.get('msg1', 'full'))
+        self.assertIsNone(cache.get('msg1', 'minimal'))
+        self.assertEqual(cache.size_bytes, 0)
+
+    def test_disk_tier_survives_restart(self) -> None:
+        """Test a new cache on the same directory serves earlier fetches."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            MessageCache(disk_dir=tmp_dir).put(make_message('msg1', ['INBOX']), 'full')
+
+            cache = MessageCache(disk_dir=tmp_dir)
+            message = cache.get('msg1', 'full')
+
+            self.assertEqual(message['id'], 'msg1')
+            # Labels may have changed while the process was down
+            self.assertNotIn('labelIds', message)
+            self.assertEqual(cache.stats.disk_hits, 1)
+
+            cache.remove(['msg1'])
+            self.assertIsNone(MessageCache(disk_dir=tmp_dir).get('msg1', 'full'))
+
+
+if __name__ == '__main__':
+    unittest.main()
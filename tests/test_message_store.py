@@ -0,0 +1,118 @@
+"""Unit tests for the local message metadata store."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.message_store import MessageStore
+
+
+def make_message(message_id: str, sender: str, date: int, labels: list[str]) -> dict:
+    """Build a Gmail metadata-format message resource."""
+    return {
+        'id': message_id,
+        'threadId': f'thread-{message_id}',
+        'labelIds': labels,
+        'snippet': f'snippet {message_id}',
+        'internalDate': str(date),
+        'payload': {
+            'headers': [
+                {'name': 'From', 'value': f'Sender <{sender}>'},
+                {'name': 'Subject', 'value': f'Subject {message_id}'},
+            ]
+        },
+    }
+
+
+class TestMessageStore(unittest.TestCase):
+    """Test MessageStore against a temporary SQLite file."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp_dir.name) / 'messages.db')
+        self.store = MessageStore(self.db_path)
+        self.store.upsert_messages([
+            make_message('msg1', 'Bank@Example.com', 1000, ['INBOX', 'UNREAD']),
+            make_message('msg2', 'accountant@example.com', 3000, ['INBOX']),
+            make_message('msg3', 'bank@example.com', 2000, ['SENT']),
+        ])
+
+    def tearDown(self) -> None:
+        """Close the store and remove temp files."""
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_uses_wal_mode(self) -> None:
+        """Test the database is opened in WAL mode."""
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_recent_messages_by_label(self) -> None:
+        """Test recent messages are filtered by label and ordered newest first."""
+        rows = self.store.recent_messages(limit=5, label='INBOX')
+
+        self.assertEqual([row['id'] for row in rows], ['msg2', 'msg1'])
+        self.assertEqual(rows[0]['subject'], 'Subject msg2')
+        self.assertEqual(rows[1]['from'], 'Sender <Bank@Example.com>')
+        self.assertEqual(sorted(rows[1]['labels']), ['INBOX', 'UNREAD'])
+
+    def test_messages_from_normalizes_sender(self) -> None:
+        """Test sender lookups match case-insensitively on the address."""
+        rows = self.store.messages_from('BANK@example.com')
+
+        self.assertEqual([row['id'] for row in rows], ['msg3', 'msg1'])
+
+    def test_get_messages_and_missing_ids_keep_order(self) -> None:
+        """Test ID lookups keep input order and report unknown IDs."""
+        rows = self.store.get_messages(['msg3', 'nope', 'msg1'])
+
+        self.assertEqual([row['id'] for row in rows], ['msg3', 'msg1'])
+        self.assertEqual(self.store.missing_ids(['msg1', 'nope', 'msg2', 'new']), ['nope', 'new'])
+
+    def test_label_changes_and_deletes(self) -> None:
+        """Test label updates and deletions are reflected in counts."""
+        self.store.remove_labels('msg1', ['INBOX'])
+        self.store.add_labels('msg3', ['INBOX'])
+        self.store.delete_messages(['msg2'])
+
+        self.assertEqual(self.store.count_messages('INBOX'), 1)
+        self.assertEqual(self.store.count_messages(None), 2)
+        self.assertEqual(self.store.count_messages('UNREAD'), 1)
+
+    def test_persists_across_reopen(self) -> None:
+        """Test stored data survives closing and reopening the store."""
+        self.store.close()
+        self.store = MessageStore(self.db_path)
+
+        self.assertEqual(self.store.count_messages('INBOX'), 2)
+
+    def test_thread_index(self) -> None:
+        """Test threads record message IDs, historyId and participants."""
+        reply = make_message('msg5', 'accountant@example.com', 5000, ['INBOX'])
+        reply['threadId'] = 'thread-msg4'
+        reply['payload']['headers'].append({'name': 'To', 'value': 'Me <me@example.com>'})
+        reply['payload']['headers'].append({'name': 'Cc', 'value': 'a@x.com, B <b@x.com>'})
+        self.store.upsert_thread({
+            'id': 'thread-msg4',
+            'historyId': '777',
+            'messages': [make_message('msg4', 'me@example.com', 4000, ['SENT']), reply],
+        })
+
+        thread = self.store.get_thread('thread-msg4')
+
+        self.assertEqual(thread['message_ids'], ['msg4', 'msg5'])
+        self.assertEqual(thread['history_id'], '777')
+        self.assertEqual(thread['last_date'], 5000)
+        self.assertEqual(
+            thread['participants'],
+            ['a@x.com', 'accountant@example.com', 'b@x.com', 'me@example.com'],
+        )
+        self.assertEqual(self.store.missing_ids(['msg4', 'msg5']), [])
+        self.assertEqual([t['id'] for t in self.store.threads_with('B@x.com')], ['thread-msg4'])
+        self.assertIsNone(self.store.get_thread('unknown'))
+
+
+if __name__ == '__main__':
+    unittest.main()
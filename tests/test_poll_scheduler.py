@@ -0,0 +1,150 @@
+"""Unit tests for the adaptive inbox poller."""
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+from datetime import datetime
+
+from src.poll_scheduler import AdaptivePoller
+
+
+class TestAdaptivePoller(unittest.TestCase):
+    """Test AdaptivePoller scheduling decisions."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.results: list[list[dict]] = []
+        self.notified: list[list[dict]] = []
+
+        async def poll() -> list[dict]:
+            return self.results.pop(0) if self.results else []
+
+        async def notify(messages: list[dict]) -> None:
+            self.notified.append(messages)
+
+        self.poll = poll
+        self.notify = notify
+
+    def make_poller(self, **kwargs) -> AdaptivePoller:
+        """Create a poller with no jitter unless overridden."""
+        kwargs.setdefault('jitter', 0.0)
+        return AdaptivePoller(self.poll, notify=self.notify, min_interval=10, max_interval=80, **kwargs)
+
+    def test_idle_polls_back_off_to_max(self) -> None:
+        """Test the interval doubles on idle polls and caps at max_interval."""
+        poller = self.make_poller()
+
+        delays = []
+        for _ in range(5):
+            asyncio.run(poller.poll_once())
+            delays.append(poller.next_delay())
+
+        self.assertEqual(delays, [20, 40, 80, 80, 80])
+
+    def test_new_mail_resets_interval_and_notifies(self) -> None:
+        """Test new mail snaps back to min_interval and notifies."""
+        poller = self.make_poller()
+        poller.interval = 80
+        arrived_ms = int((time.time() - 5) * 1000)
+        self.results.append([{'id': 'msg1', 'date': arrived_ms}])
+
+        asyncio.run(poller.poll_once())
+
+        self.assertEqual(poller.interval, 10)
+        self.assertEqual(self.notified, [[{'id': 'msg1', 'date': arrived_ms}]])
+        self.assertEqual(poller.stats.messages_found, 1)
+        # Notifying only queues the mail; nothing was delivered yet
+        self.assertEqual(poller.stats.average_latency, 0)
+
+    def test_delivery_latency_is_recorded_at_delivery(self) -> None:
+        """Test latency runs from arrival to the delivery time given."""
+        poller = self.make_poller()
+
+        poller.stats.record_delivery([{'id': 'msg1', 'date': 1_000_000}, {'id': 'msg2'}], delivered_at=1_030)
+
+        self.assertEqual(list(poller.stats.latencies), [30.0])
+
+    def test_activity_resets_interval(self) -> None:
+        """Test user activity switches back to fast polling."""
+        poller = self.make_poller()
+        poller.interval = 80
+
+        poller.note_activity()
+
+        self.assertEqual(poller.next_delay(), 10)
+
+    def test_jitter_stays_in_bounds(self) -> None:
+        """Test jittered delays stay within the configured fraction."""
+        poller = self.make_poller(jitter=0.2)
+
+        for _ in range(50):
+            self.assertTrue(8 <= poller.next_delay() <= 12)
+
+    def test_quiet_hours_wrap_midnight(self) -> None:
+        """Test quiet hours spanning midnight delay until they end."""
+        poller = self.make_poller(quiet_hours=(22, 7), now=lambda: datetime(2026, 1, 1, 23, 30))
+
+        self.assertTrue(poller.in_quiet_hours())
+        self.assertEqual(poller.next_delay(), 7.5 * 3600)
+
+        poller.now = lambda: datetime(2026, 1, 1, 12, 0)
+        self.assertFalse(poller.in_quiet_hours())
+
+    def test_poll_errors_are_counted(self) -> None:
+        """Test a failing poll is recorded and treated as idle."""
+        async def failing_poll() -> list[dict]:
+            raise RuntimeError("Gmail down")
+
+        poller = AdaptivePoller(failing_poll, min_interval=10, max_interval=80, jitter=0.0)
+
+        asyncio.run(poller.poll_once())
+
+        self.assertEqual(poller.stats.errors, 1)
+        self.assertEqual(poller.stats.polls, 1)
+        self.assertEqual(poller.interval, 20)
+
+    def test_trigger_polls_during_quiet_hours(self) -> None:
+        """Test trigger() polls immediately even when quiet hours are active."""
+        poller = self.make_poller(quiet_hours=(0, 23), now=lambda: datetime(2026, 1, 1, 12, 0))
+        self.results.append([{'id': 'msg1'}])
+
+        async def run() -> None:
+            poller.start()
+            await asyncio.sleep(0)
+            poller.trigger()
+            for _ in range(20):
+                if self.notified:
+                    break
+                await asyncio.sleep(0.01)
+            await poller.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(self.notified, [[{'id': 'msg1'}]])
+
+    def test_frequent_activity_does_not_starve_polls(self) -> None:
+        """Test activity more often than min_interval still lets polls run."""
+        polls = []
+
+        async def poll() -> list[dict]:
+            polls.append(time.monotonic())
+            return []
+
+        poller = AdaptivePoller(poll, min_interval=0.05, max_interval=10, jitter=0.0)
+        poller.interval = 10
+
+        async def run() -> None:
+            poller.start()
+            for _ in range(30):
+                poller.note_activity()
+                await asyncio.sleep(0.01)
+            await poller.stop()
+
+        asyncio.run(run())
+
+        self.assertGreaterEqual(len(polls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Unit tests for the quota-aware Gmail request scheduler."""
+from __future__ import annotations
+
+import unittest
+from unittest.mock import Mock
+
+from googleapiclient.errors import HttpError
+
+from src.request_scheduler import DeadlineExceeded, RequestScheduler, TokenBucket, is_retryable
+
+
+def make_http_error(status: int, content: bytes = b'{}', retry_after: str | None = None) -> HttpError:
+    """Build an HttpError with the given status code."""
+    resp = {'retry-after': retry_after} if retry_after else {}
+    resp = type('Response', (dict,), {'status': status, 'reason': 'error'})(resp)
+    return HttpError(resp, content)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock; sleeping advances it."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRetryable(unittest.TestCase):
+    """Test classification of Gmail errors."""
+
+    def test_retryable_errors(self) -> None:
+        """Test 429, 5xx and 403 rate limits are retryable; others are not."""
+        self.assertTrue(is_retryable(make_http_error(429)))
+        self.assertTrue(is_retryable(make_http_error(503)))
+        self.assertTrue(is_retryable(make_http_error(403, b'{"reason": "userRateLimitExceeded"}')))
+        self.assertFalse(is_retryable(make_http_error(403, b'{"reason": "forbidden"}')))
+        self.assertFalse(is_retryable(make_http_error(404)))
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test quota-unit token bucket pacing."""
+
+    def test_waits_once_burst_is_spent(self) -> None:
+        """Test calls beyond the burst wait for units to refill."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(bucket.acquire(10), 0.0)
+        self.assertAlmostEqual(bucket.acquire(5), 0.5)
+        self.assertEqual(clock.sleeps, [0.5])
+
+    def test_deadline_exceeded(self) -> None:
+        """Test a wait that would pass the deadline raises instead of sleeping."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, clock=clock, sleep=clock.sleep)
+        bucket.acquire(10)
+
+        with self.assertRaises(DeadlineExceeded):
+            bucket.acquire(10, deadline=0.5)
+        self.assertEqual(clock.sleeps, [])
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """Test retry, backoff and accounting."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.scheduler = RequestScheduler(
+            units_per_second=250,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_counts_units(self) -> None:
+        """Test successful calls are metered by method cost."""
+        self.scheduler.execute(lambda: 'ok', 'messages.get')
+        self.scheduler.execute(lambda: 'ok', 'history.list')
+
+        self.assertEqual(self.scheduler.stats.calls, 2)
+        self.assertEqual(self.scheduler.stats.units_spent, 7)
+        self.assertEqual(self.scheduler.stats.units_by_method['history.list'], 2)
+
+    def test_retries_with_backoff(self) -> None:
+        """Test retryable errors back off exponentially, then succeed."""
+        call = Mock(side_effect=[make_http_error(429), make_http_error(500), 'ok'])
+
+        result = self.scheduler.execute(call, 'messages.list')
+
+        self.assertEqual(result, 'ok')
+        self.assertEqual(self.scheduler.stats.retries, 2)
+        self.assertTrue(0.5 <= self.clock.sleeps[0] <= 1.0)
+        self.assertTrue(1.0 <= self.clock.sleeps[1] <= 2.0)
+
+    def test_honors_retry_after(self) -> None:
+        """Test Gmail's Retry-After header sets the delay."""
+        call = Mock(side_effect=[make_http_error(429, retry_after='7'), 'ok'])
+
+        self.scheduler.execute(call, 'messages.list')
+
+        self.assertEqual(self.clock.sleeps, [7.0])
+
+    def test_non_retryable_raises_immediately(self) -> None:
+        """Test a 404 is raised without retrying."""
+        call = Mock(side_effect=make_http_error(404))
+
+        with self.assertRaises(HttpError):
+            self.scheduler.execute(call, 'messages.get')
+
+        call.assert_called_once()
+        self.assertEqual(self.scheduler.stats.failures, 1)
+
+    def test_gives_up_at_deadline(self) -> None:
+        """Test retries stop once the next backoff would pass the deadline."""
+        call = Mock(side_effect=make_http_error(503))
+
+        with self.assertRaises(DeadlineExceeded):
+            self.scheduler.execute(call, 'messages.get', deadline=3.0)
+
+        self.assertLessEqual(self.clock.now, 3.0)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        """Test the last retryable error is raised after max_retries."""
+        self.scheduler.max_retries = 2
+        self.scheduler.default_deadline = 1000
+        call = Mock(side_effect=make_http_error(503))
+
+        with self.assertRaises(HttpError):
+            self.scheduler.execute(call, 'messages.get')
+
+        self.assertEqual(call.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
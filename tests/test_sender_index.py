@@ -0,0 +1,135 @@
+"""Unit tests for the per-sender history index."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.sender_index import SenderIndex, SenderStats, normalize_address
+
+
+def make_message(
+    message_id: str,
+    thread_id: str,
+    date: int,
+    sender: str = 'Alice <alice@example.com>',
+    to: str = '',
+    labels: list[str] | None = None,
+) -> dict:
+    """Build a metadata-format message."""
+    headers = [{'name': 'From', 'value': sender}]
+    if to:
+        headers.append({'name': 'To', 'value': to})
+    return {
+        'id': message_id,
+        'threadId': thread_id,
+        'internalDate': str(date),
+        'labelIds': labels or ['INBOX'],
+        'payload': {'headers': headers},
+    }
+
+
+class TestNormalizeAddress(unittest.TestCase):
+    """Test address normalization."""
+
+    def test_from_header(self) -> None:
+        """Test display names are dropped and case folded."""
+        self.assertEqual(normalize_address('Alice <Alice@Example.COM>'), 'alice@example.com')
+
+    def test_plus_tag(self) -> None:
+        """Test +tags map to the base mailbox."""
+        self.assertEqual(normalize_address('alice+news@example.com'), 'alice@example.com')
+
+    def test_gmail_dots(self) -> None:
+        """Test Gmail dots and googlemail.com are folded."""
+        self.assertEqual(normalize_address('j.smith@googlemail.com'), 'jsmith@gmail.com')
+        self.assertEqual(normalize_address('j.smith@example.com'), 'j.smith@example.com')
+
+    def test_no_address(self) -> None:
+        """Test headers without an address normalize to ''."""
+        self.assertEqual(normalize_address('Unknown'), '')
+        self.assertEqual(normalize_address(''), '')
+
+
+class TestSenderIndex(unittest.TestCase):
+    """Test SenderIndex."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp_dir.name) / 'senders.db')
+        self.index = SenderIndex(self.db_path)
+
+    def tearDown(self) -> None:
+        """Close the database and remove temp files."""
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_counts_messages_and_threads(self) -> None:
+        """Test message totals, distinct threads and first/last seen."""
+        self.index.record_messages([
+            make_message('m1', 't1', 2000),
+            make_message('m2', 't1', 1000),
+            make_message('m3', 't2', 3000, sender='alice+x@example.com'),
+        ])
+
+        stats = self.index.get('alice@example.com')
+        self.assertEqual(stats, SenderStats('alice@example.com', 1000, 3000, 3, 0, 2))
+        self.assertEqual(len(self.index), 1)
+
+    def test_messages_counted_once(self) -> None:
+        """Test feeding the same message again changes nothing."""
+        self.assertEqual(self.index.record_messages([make_message('m1', 't1', 1000)]), 1)
+        self.assertEqual(self.index.record_messages([make_message('m1', 't1', 1000)]), 0)
+
+        self.assertEqual(self.index.get('alice@example.com').messages, 1)
+
+    def test_sent_mail_counts_as_replies(self) -> None:
+        """Test SENT messages credit their recipients, not the user."""
+        self.index.record_messages([
+            make_message('m1', 't1', 1000),
+            make_message(
+                'm2', 't1', 2000,
+                sender='Me <me@gmail.com>',
+                to='Alice <alice@example.com>, bob@example.com',
+                labels=['SENT'],
+            ),
+        ])
+
+        alice = self.index.get('alice@example.com')
+        self.assertEqual((alice.messages, alice.replies, alice.threads), (1, 1, 1))
+        self.assertEqual(alice.last_seen, 2000)
+        self.assertEqual(self.index.get('bob@example.com').replies, 1)
+        self.assertNotIn('me@gmail.com', self.index)
+
+    def test_failed_batch_leaves_totals_untouched(self) -> None:
+        """Test a rolled-back batch changes nothing, so a retry counts once."""
+        with self.assertRaises(KeyError):
+            self.index.record_messages([make_message('m1', 't1', 1000), {'threadId': 't2'}])
+
+        self.assertIsNone(self.index.get('alice@example.com'))
+        self.index.record_messages([make_message('m1', 't1', 1000)])
+        stats = self.index.get('alice@example.com')
+        self.assertEqual((stats.messages, stats.threads), (1, 1))
+
+    def test_lookup_by_from_header(self) -> None:
+        """Test lookups accept From headers and unknown senders return None."""
+        self.index.record_messages([make_message('m1', 't1', 1000)])
+
+        self.assertIn('Alice <ALICE@example.com>', self.index)
+        self.assertIsNone(self.index.get('stranger@example.com'))
+
+    def test_persists_across_restarts(self) -> None:
+        """Test totals and counted messages survive reopening."""
+        self.index.record_messages([make_message('m1', 't1', 1000)])
+        self.index.close()
+
+        self.index = SenderIndex(self.db_path)
+        self.index.record_messages([make_message('m1', 't1', 1000), make_message('m2', 't1', 2000)])
+
+        stats = self.index.get('alice@example.com')
+        self.assertEqual((stats.messages, stats.threads, stats.last_seen), (2, 1, 2000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Unit tests for the summary cache and service."""
+from __future__ import annotations
+
+import unittest
+
+from src.summaries import LeadSummarizer, SummaryCache, SummaryService, body_hash
+
+
+class CountingSummarizer:
+    """Summarizer that records every call."""
+
+    def __init__(self, version: str = "test-1") -> None:
+        self.version = version
+        self.summarized: list[str] = []
+
+    def summarize(self, text: str) -> str:
+        self.summarized.append(text)
+        return f"S({text})"
+
+    def merge(self, previous: str, addition: str) -> str:
+        return f"{previous}+{addition}" if previous else addition
+
+
+class TestSummaryService(unittest.TestCase):
+    """Test SummaryService against an in-memory SummaryCache."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.cache = SummaryCache(':memory:')
+        self.summarizer = CountingSummarizer()
+        self.service = SummaryService(self.summarizer, self.cache)
+        self.bodies = {'m1': 'Invoice attached.', 'm2': 'Thanks, paid.', 'm3': 'Receipt sent.'}
+        self.fetched: list[str] = []
+
+    def tearDown(self) -> None:
+        """Close the cache."""
+        self.cache.close()
+
+    def get_text(self, message_id: str) -> str:
+        self.fetched.append(message_id)
+        return self.bodies[message_id]
+
+    def test_body_hash_ignores_quoting_and_whitespace(self) -> None:
+        """Test reformatted or re-quoted bodies hash the same."""
+        self.assertEqual(
+            body_hash("Paid  in\nfull.\n\nOn Mon, Bob wrote:\n> invoice?"),
+            body_hash("Paid in full."),
+        )
+
+    def test_message_summary_is_cached(self) -> None:
+        """Test the same body is summarized only once."""
+        first = self.service.summarize_message('Invoice attached.')
+        second = self.service.summarize_message('Invoice   attached.')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.summarizer.summarized), 1)
+
+    def test_new_version_invalidates_cache(self) -> None:
+        """Test a summarizer upgrade re-summarizes."""
+        self.service.summarize_message('Invoice attached.')
+        upgraded = CountingSummarizer(version="test-2")
+
+        SummaryService(upgraded, self.cache).summarize_message('Invoice attached.')
+
+        self.assertEqual(len(upgraded.summarized), 1)
+
+    def test_thread_only_summarizes_new_messages(self) -> None:
+        """Test a new reply costs one summary and one fetch."""
+        self.service.summarize_thread('t1', ['m1', 'm2'], self.get_text)
+        self.summarizer.summarized.clear()
+        self.fetched.clear()
+
+        summary = self.service.summarize_thread('t1', ['m1', 'm2', 'm3'], self.get_text)
+
+        self.assertEqual(self.fetched, ['m3'])
+        self.assertEqual(self.summarizer.summarized, ['Receipt sent.'])
+        self.assertEqual(summary, 'S(Invoice attached.)+S(Thanks, paid.)+S(Receipt sent.)')
+
+    def test_unchanged_thread_needs_no_work(self) -> None:
+        """Test re-asking about a known thread does no fetches."""
+        first = self.service.summarize_thread('t1', ['m1', 'm2'], self.get_text)
+        self.fetched.clear()
+
+        self.assertEqual(self.service.summarize_thread('t1', ['m1', 'm2'], self.get_text), first)
+        self.assertEqual(self.fetched, [])
+
+    def test_thread_rebuilt_when_history_changes(self) -> None:
+        """Test a removed message triggers a full re-summary."""
+        self.service.summarize_thread('t1', ['m1', 'm2'], self.get_text)
+
+        summary = self.service.summarize_thread('t1', ['m2', 'm3'], self.get_text)
+
+        self.assertEqual(summary, 'S(Thanks, paid.)+S(Receipt sent.)')
+
+    def test_lead_summarizer_keeps_whole_sentences(self) -> None:
+        """Test the default summarizer cuts at a sentence boundary."""
+        summary = LeadSummarizer(max_chars=30).summarize("First sentence here. Second one is longer.")
+
+        self.assertEqual(summary, "First sentence here.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,276 @@
+"""Unit tests for the History API sync engine."""
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
+
+from googleapiclient.errors import HttpError
+
+from src.message_cache import MessageCache
+from src.message_store import MessageStore
+from src.sender_index import SenderIndex
+from src.sync_engine import SyncEngine
+
+
+def make_http_error(status: int) -> HttpError:
+    """Build an HttpError with the given status code."""
+    resp = Mock()
+    resp.status = status
+    resp.reason = 'error'
+    return HttpError(resp, b'{}')
+
+
+class TestSyncEngine(unittest.TestCase):
+    """Test SyncEngine with a mocked GmailClient."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmp_dir.name) / 'sync_state.json'
+        self.gmail_client = MagicMock()
+        self.gmail_client.get_profile.return_value = {'historyId': '100'}
+        self.gmail_client.list_messages.return_value = [{'id': 'msg1'}, {'id': 'msg2'}]
+        self.engine = SyncEngine(self.gmail_client, state_path=str(self.state_path))
+
+    def tearDown(self) -> None:
+        """Clean up temp files."""
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_syncs_run_one_at_a_time(self) -> None:
+        """Test a second thread's sync waits and resumes from the saved ID."""
+        self.state_path.write_text('{"history_id": "100"}')
+        active = []
+        overlaps = []
+        start_ids = []
+
+        def list_history(start_history_id, page_token=None, label_id=None):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            start_ids.append(start_history_id)
+            time.sleep(0.05)
+            active.pop()
+            return {'historyId': str(int(start_history_id) + 10)}
+
+        self.gmail_client.list_history.side_effect = list_history
+        threads = [threading.Thread(target=self.engine.sync) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [False, False])
+        self.assertEqual(start_ids, ['100', '110'])
+        self.assertEqual(self.engine.history_id, '120')
+
+    def test_first_sync_is_full_resync(self) -> None:
+        """Test first run lists messages and stores the profile history ID."""
+        result = self.engine.sync()
+
+        self.assertTrue(result.full_resync)
+        self.assertEqual(result.added, ['msg1', 'msg2'])
+        self.assertEqual(self.engine.history_id, '100')
+        self.gmail_client.list_messages.assert_called_once_with(max_results=500, query='label:INBOX')
+
+    def test_incremental_sync_walks_pages(self) -> None:
+        """Test history pages are merged into one result."""
+        self.engine.sync()
+        self.gmail_client.list_history.side_effect = [
+            {
+                'history': [
+                    {'messagesAdded': [{'message': {'id': 'msg3'}}]},
+                    {'labelsRemoved': [{'message': {'id': 'msg1'}, 'labelIds': ['UNREAD']}]},
+                ],
+                'historyId': '110',
+                'nextPageToken': 'page2',
+            },
+            {
+                'history': [{'messagesDeleted': [{'message': {'id': 'msg2'}}]}],
+                'historyId': '120',
+            },
+        ]
+
+        result = self.engine.sync()
+
+        self.assertFalse(result.full_resync)
+        self.assertEqual(result.added, ['msg3'])
+        self.assertEqual(result.deleted, ['msg2'])
+        self.assertEqual(result.labels_removed, {'msg1': ['UNREAD']})
+        self.assertEqual(self.engine.history_id, '120')
+        self.gmail_client.list_history.assert_called_with('100', page_token='page2', label_id='INBOX')
+
+    def test_added_then_deleted_is_not_reported(self) -> None:
+        """Test a message added and deleted in one window is dropped."""
+        self.engine.sync()
+        self.gmail_client.list_history.return_value = {
+            'history': [
+                {'messagesAdded': [{'message': {'id': 'msg3'}}]},
+                {'messagesDeleted': [{'message': {'id': 'msg3'}}]},
+            ],
+            'historyId': '105',
+        }
+
+        result = self.engine.sync()
+
+        self.assertFalse(result.has_changes)
+
+    def test_expired_history_id_falls_back_to_resync(self) -> None:
+        """Test a 404 from history.list triggers a bounded full resync."""
+        self.engine.sync()
+        self.gmail_client.list_history.side_effect = make_http_error(404)
+        self.gmail_client.get_profile.return_value = {'historyId': '900'}
+
+        result = self.engine.sync()
+
+        self.assertTrue(result.full_resync)
+        self.assertEqual(self.engine.history_id, '900')
+
+    def test_other_errors_propagate(self) -> None:
+        """Test non-404 errors are raised and the history ID is kept."""
+        self.engine.sync()
+        self.gmail_client.list_history.side_effect = make_http_error(500)
+
+        with self.assertRaises(HttpError):
+            self.engine.sync()
+
+        self.assertEqual(self.engine.history_id, '100')
+
+    def test_sync_updates_store(self) -> None:
+        """Test added messages are fetched and label changes applied locally."""
+        store = MessageStore(':memory:')
+        store.upsert_messages([{'id': 'msg1', 'labelIds': ['INBOX', 'UNREAD']}])
+        engine = SyncEngine(self.gmail_client, state_path=str(self.state_path), store=store)
+        self.state_path.write_text('{"history_id": "100"}')
+        self.gmail_client.list_history.return_value = {
+            'history': [
+                {'messagesAdded': [{'message': {'id': 'msg2'}}]},
+                {'labelsRemoved': [{'message': {'id': 'msg1'}, 'labelIds': ['UNREAD']}]},
+            ],
+            'historyId': '110',
+        }
+        self.gmail_client.get_messages_batch.return_value = [{'id': 'msg2', 'labelIds': ['INBOX']}]
+
+        engine.sync()
+
+        self.assertEqual(self.gmail_client.get_messages_batch.call_args[0][0], ['msg2'])
+        self.assertEqual(store.count_messages('INBOX'), 2)
+        self.assertEqual(store.count_messages('UNREAD'), 0)
+
+    def test_label_changes_are_netted_in_history_order(self) -> None:
+        """Test a label removed then re-added ends up added, and vice versa."""
+        self.state_path.write_text('{"history_id": "100"}')
+        self.gmail_client.list_history.return_value = {
+            'history': [
+                {'labelsRemoved': [{'message': {'id': 'msg1'}, 'labelIds': ['UNREAD', 'INBOX']}]},
+                {'labelsAdded': [{'message': {'id': 'msg1'}, 'labelIds': ['INBOX']}]},
+                {'labelsAdded': [{'message': {'id': 'msg2'}, 'labelIds': ['STARRED']}]},
+                {'labelsRemoved': [{'message': {'id': 'msg2'}, 'labelIds': ['STARRED']}]},
+            ],
+            'historyId': '110',
+        }
+
+        result = self.engine.sync()
+
+        self.assertEqual(result.labels_added, {'msg1': ['INBOX']})
+        self.assertEqual(result.labels_removed, {'msg1': ['UNREAD'], 'msg2': ['STARRED']})
+
+    def test_sync_records_sender_history(self) -> None:
+        """Test newly stored messages are counted in the sender index."""
+        store = MessageStore(':memory:')
+        senders = SenderIndex(':memory:')
+        engine = SyncEngine(self.gmail_client, state_path=str(self.state_path), store=store, senders=senders)
+        self.gmail_client.get_messages_batch.return_value = [
+            {
+                'id': 'msg1',
+                'threadId': 't1',
+                'internalDate': '1000',
+                'labelIds': ['INBOX'],
+                'payload': {'headers': [{'name': 'From', 'value': 'Alice <alice@example.com>'}]},
+            },
+        ]
+
+        engine.sync()
+
+        stats = senders.get('alice@example.com')
+        self.assertIsNotNone(stats)
+        self.assertEqual(stats.messages, 1)
+        self.assertEqual(stats.threads, 1)
+
+    def test_sent_sync_counts_replies_without_a_store(self) -> None:
+        """Test a SENT engine feeds To/Cc replies into the index on its own."""
+        senders = SenderIndex(':memory:')
+        engine = SyncEngine(
+            self.gmail_client, state_path=str(self.state_path), label_id='SENT', senders=senders,
+        )
+        self.gmail_client.list_messages.return_value = [{'id': 'sent1'}]
+        self.gmail_client.get_messages_batch.return_value = [
+            {
+                'id': 'sent1',
+                'threadId': 't1',
+                'internalDate': '1000',
+                'labelIds': ['SENT'],
+                'payload': {'headers': [
+                    {'name': 'To', 'value': 'Alice <alice@example.com>'},
+                    {'name': 'Cc', 'value': 'bob@example.com'},
+                ]},
+            },
+        ]
+
+        engine.sync()
+
+        self.assertEqual(senders.get('alice@example.com').replies, 1)
+        self.assertEqual(senders.get('bob@example.com').replies, 1)
+        self.assertEqual(self.gmail_client.list_messages.call_args.kwargs['query'], 'label:SENT')
+
+    def test_sender_index_is_seeded_from_stored_mail(self) -> None:
+        """Test mail already in the store is counted by a one-off resync."""
+        store = MessageStore(':memory:')
+        message = {
+            'id': 'msg1',
+            'threadId': 't1',
+            'internalDate': '1000',
+            'labelIds': ['INBOX'],
+            'payload': {'headers': [{'name': 'From', 'value': 'alice@example.com'}]},
+        }
+        store.upsert_messages([message])
+        senders = SenderIndex(':memory:')
+        engine = SyncEngine(self.gmail_client, state_path=str(self.state_path), store=store, senders=senders)
+        # Synced before the index existed
+        self.state_path.write_text('{"history_id": "100"}')
+        self.gmail_client.list_messages.return_value = [{'id': 'msg1'}]
+        self.gmail_client.get_messages_batch.return_value = [message]
+
+        first = engine.sync()
+        self.gmail_client.list_history.return_value = {'historyId': '120'}
+        second = engine.sync()
+
+        self.assertTrue(first.full_resync)
+        self.assertFalse(second.full_resync)
+        self.assertEqual(senders.get('alice@example.com').messages, 1)
+        self.gmail_client.get_messages_batch.assert_called_once_with(['msg1'], projection='summary')
+
+    def test_sync_invalidates_message_cache(self) -> None:
+        """Test label changes drop cached labels and deletions drop messages."""
+        cache = MessageCache()
+        cache.put({'id': 'msg1', 'labelIds': ['INBOX', 'UNREAD']}, 'full')
+        cache.put({'id': 'msg2', 'labelIds': ['INBOX']}, 'full')
+        self.gmail_client.cache = cache
+        self.state_path.write_text('{"history_id": "100"}')
+        self.gmail_client.list_history.return_value = {
+            'history': [
+                {'labelsRemoved': [{'message': {'id': 'msg1'}, 'labelIds': ['UNREAD']}]},
+                {'messagesDeleted': [{'message': {'id': 'msg2'}}]},
+            ],
+            'historyId': '110',
+        }
+
+        self.engine.sync()
+
+        self.assertNotIn('labelIds', cache.get('msg1', 'full'))
+        self.assertIsNone(cache.get('msg2', 'full'))
+
+if __name__ == '__main__':
+    unittest.main()
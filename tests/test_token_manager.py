@@ -0,0 +1,157 @@
+"""Unit tests for OAuth token management (no real Google calls)."""
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from src.token_manager import TokenManager
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, like google-auth uses."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeCredentials:
+    """Minimal stand-in for google.oauth2.credentials.Credentials."""
+
+    def __init__(self, expires_in: float, refresh_delay: float = 0.0) -> None:
+        self.token = 'access'
+        self.refresh_token = 'refresh'
+        self.token_uri = 'https://oauth2.googleapis.com/token'
+        self.client_id = 'client'
+        self.client_secret = 'secret'
+        self.scopes = ['scope']
+        self.expiry = utcnow() + timedelta(seconds=expires_in)
+        self.refresh_delay = refresh_delay
+        self.refresh_count = 0
+
+    @property
+    def valid(self) -> bool:
+        return self.expiry > utcnow()
+
+    @property
+    def expired(self) -> bool:
+        return not self.valid
+
+    def refresh(self, request) -> None:
+        time.sleep(self.refresh_delay)
+        self.refresh_count += 1
+        self.token = f'access-{self.refresh_count}'
+        self.expiry = utcnow() + timedelta(hours=1)
+
+
+class TestTokenManager(unittest.TestCase):
+    """Test TokenManager caching, refresh and persistence."""
+
+    def setUp(self) -> None:
+        """Create temp credential files and patch token loading."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        tmp = Path(self.tmp_dir.name)
+        (tmp / 'credentials.json').write_text('{}')
+        (tmp / 'token.json').write_text('{}')
+        self.token_path = tmp / 'token.json'
+
+        self.load_patch = patch('src.token_manager.Credentials.from_authorized_user_file')
+        self.mock_load = self.load_patch.start()
+
+        self.manager = TokenManager(
+            credentials_path=str(tmp / 'credentials.json'),
+            token_path=str(self.token_path),
+            refresh_margin=300,
+        )
+
+    def tearDown(self) -> None:
+        """Stop timers and patches, remove temp files."""
+        self.manager.close()
+        self.load_patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_credentials_cached_in_memory(self) -> None:
+        """Test token.json is read once, then served from memory."""
+        creds = FakeCredentials(expires_in=3600)
+        self.mock_load.return_value = creds
+
+        first = self.manager.get_credentials()
+        second = self.manager.get_credentials()
+
+        self.assertIs(first, creds)
+        self.assertIs(second, creds)
+        self.mock_load.assert_called_once()
+        self.assertEqual(creds.refresh_count, 0)
+
+    def test_refreshes_inside_margin(self) -> None:
+        """Test credentials close to expiry are refreshed before use."""
+        creds = FakeCredentials(expires_in=60)
+        self.mock_load.return_value = creds
+
+        result = self.manager.get_credentials()
+
+        self.assertEqual(result.refresh_count, 1)
+        saved = json.loads(self.token_path.read_text())
+        self.assertEqual(saved['token'], 'access-1')
+        self.assertIn('expiry', saved)
+
+    def test_concurrent_callers_share_one_refresh(self) -> None:
+        """Test a refresh in flight is shared by all waiting callers."""
+        creds = FakeCredentials(expires_in=-10, refresh_delay=0.1)
+        self.mock_load.return_value = creds
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(self.manager.get_credentials()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(creds.refresh_count, 1)
+
+    def test_background_refresh_ahead_of_expiry(self) -> None:
+        """Test the timer refreshes credentials before they expire."""
+        self.manager.refresh_margin = 3599.9
+        creds = FakeCredentials(expires_in=3600)
+        self.mock_load.return_value = creds
+
+        self.manager.get_credentials()
+        for _ in range(50):
+            if creds.refresh_count:
+                break
+            time.sleep(0.02)
+
+        self.assertGreaterEqual(creds.refresh_count, 1)
+
+    def test_save_is_atomic(self) -> None:
+        """Test a failed write keeps the previous token.json intact."""
+        self.token_path.write_text('{"token": "old"}')
+        creds = FakeCredentials(expires_in=3600)
+
+        with patch('src.token_manager.os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager._save_token(creds)
+
+        self.assertEqual(json.loads(self.token_path.read_text()), {'token': 'old'})
+        self.assertEqual(list(self.token_path.parent.glob('*.tmp')), [])
+
+    def test_missing_credentials_file(self) -> None:
+        """Test a missing credentials.json raises FileNotFoundError."""
+        manager = TokenManager(
+            credentials_path=str(self.token_path.parent / 'missing.json'),
+            token_path=str(self.token_path),
+        )
+
+        with self.assertRaises(FileNotFoundError):
+            manager.get_credentials()
+
+
+if __name__ == '__main__':
+    unittest.main()
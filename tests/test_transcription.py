@@ -0,0 +1,172 @@
+"""Unit tests for off-loop voice transcription."""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable
+from unittest.mock import patch
+
+from src.transcription import (
+    FakeBackend,
+    TranscriptCache,
+    Transcriber,
+    TranscriptionCancelled,
+    make_backend,
+)
+
+
+async def stream(data: bytes, chunk_size: int = 4) -> AsyncIterator[bytes]:
+    """Yield data in small chunks, like Attachment.read_chunked."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+class CountingBackend(FakeBackend):
+    """FakeBackend that counts calls (thread executor only)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        self.calls += 1
+        return super().transcribe(path, cancelled)
+
+
+class BlockingBackend:
+    """Runs until cancelled, recording that it noticed."""
+
+    version = "blocking-1"
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        self.started.set()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if cancelled():
+                self.stopped.set()
+                raise TranscriptionCancelled(path)
+            time.sleep(0.005)
+        return "never cancelled"
+
+
+class SleepingBackend:
+    """Blocks its worker for a while without ever yielding."""
+
+    version = "sleeping-1"
+
+    def transcribe(self, path: str, cancelled: Callable[[], bool]) -> str:
+        time.sleep(0.5)
+        return "done"
+
+
+class TestTranscriber(unittest.TestCase):
+    """Test Transcriber with thread and process executors."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = Path(self.tmp_dir.name) / 'spool'
+        self.cache = TranscriptCache(str(Path(self.tmp_dir.name) / 'transcripts.db'))
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self) -> None:
+        """Stop workers and remove temp files."""
+        self.executor.shutdown(wait=True)
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def make_transcriber(self, backend, executor=None) -> Transcriber:
+        return Transcriber(backend, self.cache, spool_dir=self.spool_dir, executor=executor or self.executor)
+
+    def test_fake_backend_is_deterministic(self) -> None:
+        """Test the stand-in returns the streamed text, split mid-character."""
+        transcriber = self.make_transcriber(FakeBackend())
+
+        async def run() -> str:
+            return await transcriber.submit('user', stream('Reply: sounds good ✅'.encode(), chunk_size=3))
+
+        self.assertEqual(asyncio.run(run()), 'Reply: sounds good ✅')
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_cached_by_audio_hash(self) -> None:
+        """Test the same audio is transcribed once."""
+        backend = CountingBackend()
+        transcriber = self.make_transcriber(backend)
+
+        async def run() -> list[str]:
+            first = await transcriber.submit('user', stream(b'hello there'))
+            second = await transcriber.submit('user', stream(b'hello there', chunk_size=2))
+            return [first, second]
+
+        self.assertEqual(asyncio.run(run()), ['hello there', 'hello there'])
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_new_job_cancels_running_one(self) -> None:
+        """Test a newer voice note stops the worker on the older one."""
+        blocking = BlockingBackend()
+        transcriber = self.make_transcriber(blocking)
+
+        async def run() -> None:
+            old = transcriber.submit('user', stream(b'long voice note'))
+            while not blocking.started.is_set():
+                await asyncio.sleep(0.005)
+            transcriber.submit('user', stream(b'x'))
+            with self.assertRaises(asyncio.CancelledError):
+                await old
+
+        asyncio.run(run())
+        self.assertTrue(blocking.stopped.wait(1))
+        self.executor.shutdown(wait=True)
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_cancel_unknown_key(self) -> None:
+        """Test cancelling when nothing runs is a no-op."""
+        transcriber = self.make_transcriber(FakeBackend())
+        self.assertFalse(transcriber.cancel('nobody'))
+
+    def test_process_pool_keeps_loop_responsive(self) -> None:
+        """Test the loop keeps ticking while a worker process is busy."""
+        transcriber = Transcriber(SleepingBackend(), self.cache, spool_dir=self.spool_dir, max_workers=1)
+
+        async def run() -> tuple[str, int]:
+            job = transcriber.submit('user', stream(b'voice note'))
+            ticks = 0
+            while not job.done():
+                await asyncio.sleep(0.01)
+                ticks += 1
+            return await job, ticks
+
+        try:
+            text, ticks = asyncio.run(run())
+        finally:
+            transcriber.shutdown()
+        self.assertEqual(text, 'done')
+        # The backend sleeps 0.5s; a blocked loop would barely tick
+        self.assertGreater(ticks, 20)
+
+    def test_make_backend(self) -> None:
+        """Test backends are created by name."""
+        self.assertIsInstance(make_backend('fake'), FakeBackend)
+        with patch('src.transcription.importlib.util.find_spec', return_value=object()):
+            self.assertTrue(make_backend('whisper').version.startswith('whisper-'))
+        with self.assertRaises(ValueError):
+            make_backend('nope')
+
+    def test_make_backend_requires_optional_package(self) -> None:
+        """Test a missing faster-whisper is a clear error at creation."""
+        with patch('src.transcription.importlib.util.find_spec', return_value=None):
+            with self.assertRaisesRegex(ValueError, 'pip install faster-whisper'):
+                make_backend('whisper')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Unit tests for header-only triage."""
+from __future__ import annotations
+
+import unittest
+
+from src.allowlist import Allowlist
+from src.gmail_client import PROJECTIONS
+from src.triage import TRIAGE_HEADERS, HeaderRule, TriageEngine, Verdict
+
+
+def make_message(headers: dict[str, str], labels: list[str] | None = None) -> dict:
+    """Build a metadata-format message with the given headers."""
+    return {
+        'id': 'msg1',
+        'labelIds': labels or ['INBOX'],
+        'payload': {'headers': [{'name': name, 'value': value} for name, value in headers.items()]},
+    }
+
+
+class TestTriageEngine(unittest.TestCase):
+    """Test TriageEngine with the default rules."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.engine = TriageEngine()
+
+    def test_plain_mail_kept(self) -> None:
+        """Test mail without list/bulk headers is kept."""
+        message = make_message({'From': 'friend@example.com', 'Subject': 'Lunch?'})
+        self.assertEqual(self.engine.classify(message), Verdict.KEEP)
+        self.assertTrue(self.engine.keep(message))
+
+    def test_mailing_list(self) -> None:
+        """Test List-Id marks a mailing list."""
+        message = make_message({'From': 'a@lists.dev', 'List-Id': '<dev.lists.dev>'})
+        self.assertEqual(self.engine.classify(message), Verdict.MAILING_LIST)
+
+    def test_bulk_beats_list(self) -> None:
+        """Test the highest verdict wins when several rules match."""
+        message = make_message({
+            'From': 'news@shop.example',
+            'List-Id': '<news.shop.example>',
+            'List-Unsubscribe': '<mailto:unsub@shop.example>',
+        })
+        self.assertEqual(self.engine.classify(message), Verdict.BULK)
+
+    def test_precedence_values(self) -> None:
+        """Test Precedence is matched case-insensitively by value."""
+        self.assertEqual(self.engine.classify(make_message({'Precedence': 'Bulk'})), Verdict.BULK)
+        self.assertEqual(self.engine.classify(make_message({'precedence': 'list'})), Verdict.MAILING_LIST)
+        self.assertEqual(self.engine.classify(make_message({'Precedence': 'first-class'})), Verdict.KEEP)
+
+    def test_automated(self) -> None:
+        """Test Auto-Submitted (except "no") and bounces are automated."""
+        self.assertEqual(self.engine.classify(make_message({'Auto-Submitted': 'auto-replied'})), Verdict.AUTOMATED)
+        self.assertEqual(self.engine.classify(make_message({'Auto-Submitted': 'no'})), Verdict.KEEP)
+        self.assertEqual(self.engine.classify(make_message({'Return-Path': '<>'})), Verdict.AUTOMATED)
+        self.assertEqual(self.engine.classify(make_message({'Return-Path': '<a@b.com>'})), Verdict.KEEP)
+
+    def test_spam(self) -> None:
+        """Test X-Spam-Flag and Gmail's SPAM label."""
+        self.assertEqual(self.engine.classify(make_message({'X-Spam-Flag': 'YES'})), Verdict.SPAM)
+        self.assertEqual(self.engine.classify(make_message({}, labels=['SPAM'])), Verdict.SPAM)
+
+    def test_allowlist_overrides_headers(self) -> None:
+        """Test allowlisted senders are kept even from a list."""
+        engine = TriageEngine(allowlist=Allowlist.from_entries(['bank.com']))
+        allowed = make_message({'From': 'Bank <alerts@mail.bank.com>', 'List-Unsubscribe': '<x>'})
+        other = make_message({'From': 'Shop <news@shop.example>', 'List-Unsubscribe': '<x>'})
+
+        self.assertEqual(engine.classify(allowed), Verdict.KEEP)
+        self.assertEqual(engine.classify(other), Verdict.BULK)
+
+    def test_allowlist_does_not_override_spam_label(self) -> None:
+        """Test the SPAM label wins over the allowlist."""
+        engine = TriageEngine(allowlist=Allowlist.from_entries(['bank.com']))
+        message = make_message({'From': 'alerts@bank.com'}, labels=['SPAM'])
+        self.assertEqual(engine.classify(message), Verdict.SPAM)
+
+    def test_custom_rules(self) -> None:
+        """Test custom rules replace the defaults."""
+        engine = TriageEngine(rules=[HeaderRule('X-Mailer', r'campaign', Verdict.BULK)])
+        self.assertEqual(engine.classify(make_message({'X-Mailer': 'CampaignMonitor'})), Verdict.BULK)
+        self.assertEqual(engine.classify(make_message({'List-Id': '<x>'})), Verdict.KEEP)
+
+    def test_triage_projection_fetches_headers(self) -> None:
+        """Test the 'triage' projection asks Gmail for every header the rules read."""
+        projection = PROJECTIONS['triage']
+        self.assertEqual(projection.format, 'metadata')
+        for header in (*TRIAGE_HEADERS, 'From'):
+            self.assertIn(header, projection.metadata_headers)
+
+
+if __name__ == '__main__':
+    unittest.main()